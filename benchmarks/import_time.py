@@ -0,0 +1,116 @@
+# ----------------------------------------------------------------------------------------------------
+# Benchmark do tempo de importação da lib.
+#
+# Mede, através da opção '-X importtime' do Python, o tempo acumulado de importação dos principais
+# módulos da lib e verifica se dependências pesadas (mlflow, minio, requests) estão sendo importadas
+# antes do primeiro uso. Os resultados podem ser acrescentados a um arquivo JSON Lines, para que sejam
+# acompanhados entre as versões da lib.
+#
+# Uso: python benchmarks/import_time.py [--runs=5] [--output=benchmarks/results/import_time.jsonl]
+# ----------------------------------------------------------------------------------------------------
+import json
+import os
+import subprocess
+import sys
+import tomllib
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+
+RAIZ_REPOSITORIO = Path(__file__).resolve().parent.parent
+MODULOS = ["mllibprodest.interfaces", "mllibprodest.initiators.model_initiator", "mllibprodest.validators.test"]
+DEPENDENCIAS_PESADAS = ["mlflow", "minio", "requests"]
+
+
+def get_lib_version() -> str:
+    """
+    Obtém a versão da lib informada no arquivo 'pyproject.toml'.
+        :return: Versão da lib.
+    """
+    with open(RAIZ_REPOSITORIO / "pyproject.toml", "rb") as arq:
+        return tomllib.load(arq)["project"]["version"]
+
+
+def measure_import(module_name: str) -> tuple:
+    """
+    Importa um módulo em um processo novo utilizando a opção '-X importtime'.
+        :param module_name: Nome do módulo que será importado.
+        :return: Tupla contendo o tempo acumulado de importação do módulo, em microssegundos, e a lista das
+                 dependências pesadas que foram importadas.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(RAIZ_REPOSITORIO / "src"), env.get("PYTHONPATH")]))
+    env["STACK_LOG_OUTPUT"] = "console"
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"], env=env,
+                              capture_output=True, text=True, check=True)
+    tempo_acumulado = None
+    importados = set()
+
+    # Formato das linhas: 'import time: <self [us]> | <cumulative> | <nome do módulo indentado>'
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+
+        partes = linha.split("|")
+
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+
+        nome = partes[2].strip()
+        importados.add(nome.split(".")[0])
+
+        if nome == module_name:
+            tempo_acumulado = int(partes[1])
+
+    return tempo_acumulado, sorted(d for d in DEPENDENCIAS_PESADAS if d in importados)
+
+
+def run(runs: int = 5) -> dict:
+    """
+    Executa o benchmark para todos os módulos.
+        :param runs: Quantidade de execuções por módulo. É utilizada a mediana dos tempos.
+        :return: Dicionário com os resultados do benchmark.
+    """
+    resultados = {}
+
+    for modulo in MODULOS:
+        tempos = []
+        dependencias = []
+
+        for _ in range(runs):
+            tempo, dependencias = measure_import(modulo)
+            tempos.append(tempo)
+
+        resultados[modulo] = {'median_us': median(tempos), 'min_us': min(tempos), 'max_us': max(tempos),
+                              'heavy_dependencies_imported': dependencias}
+
+    return {'benchmark': 'import_time', 'version': get_lib_version(), 'python': sys.version.split()[0],
+            'timestamp': datetime.now(timezone.utc).isoformat(), 'runs': runs, 'results': resultados}
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(RAIZ_REPOSITORIO / "src"))
+    from mllibprodest.utils import validate_params
+
+    params = sys.argv
+    qtd_execucoes = 5
+    caminho_saida = ""
+
+    if len(params) > 1:
+        resultado, retorno = validate_params(params, {'--runs': int, '--output': str})
+
+        if not resultado:
+            print(f"\nERRO: {retorno}")
+            exit(1)
+
+        qtd_execucoes = retorno.get('--runs', qtd_execucoes)
+        caminho_saida = retorno.get('--output', caminho_saida)
+
+    relatorio = run(qtd_execucoes)
+    print(json.dumps(relatorio, indent=2))
+
+    if caminho_saida != "":
+        Path(caminho_saida).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(caminho_saida, "a", encoding="utf-8") as arq:
+            arq.write(json.dumps(relatorio) + "\n")
@@ -0,0 +1,422 @@
+# ----------------------------------------------------------------------------------------------------
+# Benchmark offline dos providers, da conversão de artefatos e da geração de lotes.
+#
+# Executa sem acesso à rede: utiliza um MLflow com 'tracking store' e registro de modelos em arquivos
+# locais, um servidor S3 local (http.server com TLS e certificado autoassinado) no lugar do Minio e
+# datasets/artefatos sintéticos de vários tamanhos. Para cada caso, informa a vazão, os percentis de
+# latência e o pico de memória alocada, em JSON, para que os resultados sejam comparados entre as
+# versões da lib.
+#
+# Uso: python benchmarks/providers.py [--runs=10] [--sizes=0.1,1,10] [--cases=all]
+#                                     [--output=benchmarks/results/providers.jsonl]
+#      Casos: generate_batch_indices, convert_artifact, load_datasets_local, load_datasets_minio e
+#      load_model_mlflow. Os tamanhos são informados em MB.
+# ----------------------------------------------------------------------------------------------------
+import json
+import os
+import pickle
+import random
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tomllib
+import tracemalloc
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import ceil
+from pathlib import Path
+from urllib.parse import urlparse, unquote
+
+RAIZ_REPOSITORIO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ_REPOSITORIO / "src"))
+# Evita que os logs da lib criem a pasta 'logs' no diretório de onde o benchmark foi executado
+os.environ.setdefault("STACK_LOG_OUTPUT", "console")
+
+from mllibprodest.interfaces import ModelPublicationInterfaceRETRAIN  # noqa: E402
+from mllibprodest.providers_types.local_provider import load_datasets_local  # noqa: E402
+from mllibprodest.providers_types.minio_provider import load_datasets_minio  # noqa: E402
+from mllibprodest.providers_types.mlflow_provider import load_model_mlflow  # noqa: E402
+from mllibprodest.shared_classes import CommonMethods  # noqa: E402
+from mllibprodest.utils import validate_params  # noqa: E402
+
+CASOS = ["generate_batch_indices", "convert_artifact", "load_datasets_local", "load_datasets_minio",
+         "load_model_mlflow"]
+BUCKET = "benchmark"
+ACCESS_KEY = "benchmark"
+SECRET_KEY = "benchmark123"
+MB = 1024 * 1024
+
+
+def get_lib_version() -> str:
+    """
+    Obtém a versão da lib informada no arquivo 'pyproject.toml'.
+        :return: Versão da lib.
+    """
+    with open(RAIZ_REPOSITORIO / "pyproject.toml", "rb") as arq:
+        return tomllib.load(arq)["project"]["version"]
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """
+    Calcula um percentil pelo método do 'nearest rank'.
+        :param sorted_values: Lista de valores ordenada.
+        :param p: Percentil desejado (0 a 100).
+        :return: Valor do percentil.
+    """
+    indice = max(ceil(p / 100 * len(sorted_values)) - 1, 0)
+
+    return sorted_values[indice]
+
+
+def measure(function, runs: int, bytes_per_call: int = 0, warmup: int = 1) -> dict:
+    """
+    Mede a latência, a vazão e o pico de memória de uma função. As latências são medidas sem o 'tracemalloc' (que
+    deixa a execução mais lenta); o pico de memória é medido numa chamada adicional.
+        :param function: Função sem parâmetros que será medida.
+        :param runs: Quantidade de chamadas medidas.
+        :param bytes_per_call: Quantidade de bytes processados por chamada, para o cálculo da vazão em MB/s.
+        :param warmup: Quantidade de chamadas de aquecimento, que não são medidas.
+        :return: Dicionário com as estatísticas das chamadas.
+    """
+    for _ in range(warmup):
+        function()
+
+    latencias = []
+
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        function()
+        latencias.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    function()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencias.sort()
+    total = sum(latencias)
+    resultado = {'runs': runs, 'mean_ms': total / runs * 1000, 'p50_ms': percentile(latencias, 50) * 1000,
+                 'p95_ms': percentile(latencias, 95) * 1000, 'p99_ms': percentile(latencias, 99) * 1000,
+                 'ops_per_s': runs / total if total else None, 'peak_memory_mb': pico / MB}
+
+    if bytes_per_call:
+        resultado['mb_per_s'] = bytes_per_call * runs / MB / total if total else None
+
+    return resultado
+
+
+def make_dataset(size_bytes: int) -> bytes:
+    """
+    Gera um dataset sintético no formato CSV com aproximadamente o tamanho informado.
+        :param size_bytes: Tamanho aproximado do dataset, em bytes.
+        :return: Conteúdo do dataset.
+    """
+    gerador = random.Random(42)
+    linhas = ["id,feature_1,feature_2,label"]
+    tamanho = len(linhas[0])
+    i = 0
+
+    while tamanho < size_bytes:
+        linha = f"{i},{gerador.random():.6f},{gerador.random():.6f},{gerador.randint(0, 9)}"
+        linhas.append(linha)
+        tamanho += len(linha) + 1
+        i += 1
+
+    return ("\n".join(linhas) + "\n").encode()
+
+
+def make_artifact(size_bytes: int) -> list:
+    """
+    Gera um artefato sintético (lista de dicionários) que ocupa aproximadamente o tamanho informado no formato pickle.
+        :param size_bytes: Tamanho aproximado do artefato serializado, em bytes.
+        :return: Artefato gerado.
+    """
+    gerador = random.Random(42)
+    # Cada registro ocupa cerca de 60 bytes no formato pickle
+    return [{'id': i, 'score': gerador.random(), 'label': f"classe_{i % 10}"} for i in range(max(size_bytes // 60, 1))]
+
+
+class _S3Handler(BaseHTTPRequestHandler):
+    """
+    Servidor S3 mínimo: responde à consulta da região do bucket e ao download de objetos (GET). Não valida as
+    assinaturas das requisições.
+    """
+    objects = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        partes = unquote(url.path).lstrip("/").split("/", 1)
+
+        if len(partes) == 1 or partes[1] == "":
+            if "location" in url.query:
+                corpo = b'<?xml version="1.0" encoding="UTF-8"?><LocationConstraint ' \
+                        b'xmlns="http://s3.amazonaws.com/doc/2006-03-01/">us-east-1</LocationConstraint>'
+                self.__respond(200, corpo, "application/xml")
+            else:
+                self.__respond(404, b"", "application/xml")
+
+            return
+
+        corpo = self.objects.get(partes[1])
+
+        if corpo is None:
+            corpo = f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>NoSuchKey</Code><Message>Objeto nao ' \
+                    f'encontrado</Message><Key>{partes[1]}</Key><BucketName>{partes[0]}</BucketName>' \
+                    f'<Resource>{url.path}</Resource><RequestId>1</RequestId><HostId>1</HostId></Error>'.encode()
+            self.__respond(404, corpo, "application/xml")
+        else:
+            self.__respond(200, corpo, "application/octet-stream")
+
+    def __respond(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_s3_stub(folder: Path, objects: dict) -> ThreadingHTTPServer:
+    """
+    Inicia o servidor S3 local com TLS, pois o cliente do Minio utilizado pela lib só acessa servidores HTTPS. O
+    certificado autoassinado é gerado com o 'openssl' e informado ao cliente através da variável 'SSL_CERT_FILE'.
+        :param folder: Pasta onde o certificado será gerado.
+        :param objects: Dicionário com o nome de cada objeto como chave e o seu conteúdo como valor.
+        :return: Servidor iniciado.
+    """
+    certificado = folder / "cert.pem"
+    chave = folder / "key.pem"
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", str(chave), "-out",
+                    str(certificado), "-days", "1", "-subj", "/CN=localhost", "-addext",
+                    "subjectAltName=DNS:localhost,IP:127.0.0.1"], check=True, capture_output=True)
+    handler = type("S3Handler", (_S3Handler,), {'objects': objects})
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    contexto.load_cert_chain(str(certificado), str(chave))
+    servidor.socket = contexto.wrap_socket(servidor.socket, server_side=True)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    os.environ["SSL_CERT_FILE"] = str(certificado)
+
+    return servidor
+
+
+def setup_mlflow(folder: Path, sizes: list) -> dict:
+    """
+    Configura um MLflow local (arquivos) e registra, para cada tamanho, um modelo com o alias 'production' e um
+    artefato sintético desse tamanho, além dos artefatos obrigatórios da lib.
+        :param folder: Pasta onde o MLflow guardará os experimentos e o registro de modelos.
+        :param sizes: Lista com os tamanhos dos artefatos, em bytes.
+        :return: Dicionário com o tamanho como chave e o nome do modelo registrado como valor.
+    """
+    import mlflow
+
+    uri = (folder / "mlruns").as_uri()
+    os.environ["MLFLOW_TRACKING_URI"] = uri
+    mlflow.set_tracking_uri(uri)
+    mlflow.set_registry_uri(uri)
+    mlflow.set_experiment("benchmark")
+    cliente = mlflow.MlflowClient()
+    modelos = {}
+
+    class ModeloSintetico(mlflow.pyfunc.PythonModel):
+        def predict(self, context, model_input, params=None):
+            return model_input
+
+    for tamanho in sizes:
+        nome_modelo = f"benchmark_{tamanho}"
+        pasta_artefatos = folder / "artefatos" / nome_modelo
+        pasta_artefatos.mkdir(parents=True, exist_ok=True)
+
+        for nome_arquivo, conteudo in [("TrainingParams.pkl", {}), ("TrainingDatasetsNames.pkl", {}),
+                                       ("BaselineMetrics.pkl", {})]:
+            with open(pasta_artefatos / nome_arquivo, "wb") as arq:
+                pickle.dump(conteudo, arq)
+
+        (pasta_artefatos / "dataset.csv").write_bytes(make_dataset(tamanho))
+
+        with mlflow.start_run():
+            mlflow.log_artifacts(str(pasta_artefatos))
+            info = mlflow.pyfunc.log_model(name="model", python_model=ModeloSintetico(),
+                                           registered_model_name=nome_modelo)
+
+        cliente.set_registered_model_alias(nome_modelo, "production", info.registered_model_version)
+        modelos[tamanho] = nome_modelo
+
+    return modelos
+
+
+def bench_generate_batch_indices(runs: int) -> dict:
+    """
+    Mede a geração dos índices dos lotes para datasets de vários tamanhos.
+        :param runs: Quantidade de chamadas medidas.
+        :return: Dicionário com as estatísticas por tamanho de dataset.
+    """
+    resultados = {}
+
+    for tamanho_dataset in [100_000, 1_000_000, 10_000_000]:
+        resultados[f"{tamanho_dataset}_records"] = measure(
+            lambda: ModelPublicationInterfaceRETRAIN.generate_batch_indices(tamanho_dataset, 10000), runs)
+
+    return resultados
+
+
+def bench_convert_artifact(folder: Path, runs: int, sizes: list) -> dict:
+    """
+    Mede a conversão de artefatos para o formato pickle e de volta para o objeto de origem.
+        :param folder: Pasta de trabalho do benchmark.
+        :param runs: Quantidade de chamadas medidas.
+        :param sizes: Lista com os tamanhos dos artefatos, em bytes.
+        :return: Dicionário com as estatísticas por operação e tamanho.
+    """
+    resultados = {}
+    (folder / "bench_artifact").mkdir(exist_ok=True)
+
+    for tamanho in sizes:
+        artefato = make_artifact(tamanho)
+        CommonMethods.convert_artifact_to_pickle("bench_artifact", artefato, "artefato.pkl", path=str(folder))
+        tamanho_real = (folder / "bench_artifact" / "artefato.pkl").stat().st_size
+        resultados[f"to_pickle_{tamanho}"] = measure(
+            lambda: CommonMethods.convert_artifact_to_pickle("bench_artifact", artefato, "artefato.pkl",
+                                                             path=str(folder)), runs, tamanho_real)
+        resultados[f"to_object_{tamanho}"] = measure(
+            lambda: CommonMethods.convert_artifact_to_object("bench_artifact", "artefato.pkl", path=str(folder)),
+            runs, tamanho_real)
+
+    return resultados
+
+
+def bench_load_datasets_local(folder: Path, runs: int, sizes: list) -> dict:
+    """
+    Mede o carregamento de datasets da área de armazenamento local.
+        :param folder: Pasta de trabalho do benchmark.
+        :param runs: Quantidade de chamadas medidas.
+        :param sizes: Lista com os tamanhos dos datasets, em bytes.
+        :return: Dicionário com as estatísticas por tamanho.
+    """
+    pasta_datasets = folder / "datasets"
+    pasta_datasets.mkdir(exist_ok=True)
+    os.environ["LOCAL_PATH"] = str(pasta_datasets)
+    resultados = {}
+
+    for tamanho in sizes:
+        nome_arquivo = f"dataset_{tamanho}.csv"
+        (pasta_datasets / nome_arquivo).write_bytes(make_dataset(tamanho))
+        resultados[str(tamanho)] = measure(lambda: load_datasets_local({'features': nome_arquivo}), runs, tamanho)
+
+    return resultados
+
+
+def bench_load_datasets_minio(folder: Path, runs: int, sizes: list) -> dict:
+    """
+    Mede o carregamento de datasets através do provider do Minio, utilizando o servidor S3 local.
+        :param folder: Pasta de trabalho do benchmark.
+        :param runs: Quantidade de chamadas medidas.
+        :param sizes: Lista com os tamanhos dos datasets, em bytes.
+        :return: Dicionário com as estatísticas por tamanho.
+    """
+    objetos = {f"dataset_{tamanho}.csv": make_dataset(tamanho) for tamanho in sizes}
+    servidor = start_s3_stub(folder, objetos)
+    os.environ.update({'MINIO': f"localhost:{servidor.server_address[1]}", 'ACCESS_KEY': ACCESS_KEY,
+                       'SECRET_KEY': SECRET_KEY, 'BUCKET': BUCKET})
+    resultados = {}
+
+    try:
+        for tamanho in sizes:
+            nome_arquivo = f"dataset_{tamanho}.csv"
+            resultados[str(tamanho)] = measure(lambda: load_datasets_minio({'features': nome_arquivo}), runs,
+                                               tamanho)
+    finally:
+        servidor.shutdown()
+
+    return resultados
+
+
+def bench_load_model_mlflow(folder: Path, runs: int, sizes: list) -> dict:
+    """
+    Mede o carregamento de modelos e o download dos artefatos através do provider do MLflow, utilizando o MLflow
+    local.
+        :param folder: Pasta de trabalho do benchmark.
+        :param runs: Quantidade de chamadas medidas.
+        :param sizes: Lista com os tamanhos dos artefatos, em bytes.
+        :return: Dicionário com as estatísticas por tamanho.
+    """
+    modelos = setup_mlflow(folder, sizes)
+    destino = str(folder / "temp_area_mlflow")
+    resultados = {}
+
+    for tamanho, nome_modelo in modelos.items():
+        resultados[str(tamanho)] = measure(lambda: load_model_mlflow(nome_modelo, destino), runs, tamanho)
+
+    return resultados
+
+
+def run(runs: int = 10, sizes_mb: list = None, cases: list = None) -> dict:
+    """
+    Executa o benchmark numa pasta temporária.
+        :param runs: Quantidade de chamadas medidas por caso.
+        :param sizes_mb: Lista com os tamanhos dos datasets e artefatos, em MB (padrão: [0.1, 1, 10]).
+        :param cases: Lista com os casos que serão executados (padrão: todos).
+        :return: Dicionário com os resultados do benchmark.
+    """
+    sizes_mb = sizes_mb if sizes_mb is not None else [0.1, 1, 10]
+    cases = cases if cases is not None else CASOS
+    tamanhos = [int(tamanho * MB) for tamanho in sizes_mb]
+    resultados = {}
+
+    with tempfile.TemporaryDirectory(prefix="mllib_benchmark_") as pasta_temp:
+        pasta = Path(pasta_temp)
+
+        for caso in cases:
+            if caso == "generate_batch_indices":
+                resultados[caso] = bench_generate_batch_indices(runs)
+            elif caso == "convert_artifact":
+                resultados[caso] = bench_convert_artifact(pasta, runs, tamanhos)
+            elif caso == "load_datasets_local":
+                resultados[caso] = bench_load_datasets_local(pasta, runs, tamanhos)
+            elif caso == "load_datasets_minio":
+                resultados[caso] = bench_load_datasets_minio(pasta, runs, tamanhos)
+            elif caso == "load_model_mlflow":
+                resultados[caso] = bench_load_model_mlflow(pasta, runs, tamanhos)
+            else:
+                raise ValueError(f"O caso '{caso}' não existe. Os possíveis casos são: {CASOS}.")
+
+    return {'benchmark': 'providers', 'version': get_lib_version(), 'python': sys.version.split()[0],
+            'timestamp': datetime.now(timezone.utc).isoformat(), 'runs': runs, 'sizes_mb': sizes_mb,
+            'results': resultados}
+
+
+if __name__ == "__main__":
+    params = sys.argv
+    qtd_execucoes = 10
+    tamanhos_mb = "0.1,1,10"
+    casos = "all"
+    caminho_saida = ""
+
+    if len(params) > 1:
+        resultado, retorno = validate_params(params, {'--runs': int, '--sizes': str, '--cases': str,
+                                                      '--output': str})
+
+        if not resultado:
+            print(f"\nERRO: {retorno}")
+            exit(1)
+
+        qtd_execucoes = retorno.get('--runs', qtd_execucoes)
+        tamanhos_mb = retorno.get('--sizes', tamanhos_mb)
+        casos = retorno.get('--cases', casos)
+        caminho_saida = retorno.get('--output', caminho_saida)
+
+    relatorio = run(qtd_execucoes, [float(t) for t in tamanhos_mb.split(",")],
+                    None if casos == "all" else casos.split(","))
+    print(json.dumps(relatorio, indent=2))
+
+    if caminho_saida != "":
+        Path(caminho_saida).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(caminho_saida, "a", encoding="utf-8") as arq:
+            arq.write(json.dumps(relatorio) + "\n")
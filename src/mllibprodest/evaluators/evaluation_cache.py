@@ -0,0 +1,260 @@
+# ----------------------------------------------------------------------------------------------------
+# Cache persistente para os resultados do método 'evaluate' dos modelos publicados através da interface
+# ModelPublicationInterfaceRETRAIN.
+#
+# Uso: Envolva um modelo já instanciado (ex.: obtido através do 'InitModels.init_models') com a classe
+# 'EvaluationCache' e chame o método 'evaluate' do cache no lugar do método do modelo. Se o modelo em
+# produção, os datasets, o baseline, os parâmetros de treinamento e o código da avaliação não mudaram
+# desde a última avaliação, o resultado guardado é retornado sem executar a avaliação novamente.
+# ----------------------------------------------------------------------------------------------------
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from ..monitors.metrics import EVALUATION_CACHE_REQUESTS
+from ..predictors.prediction_cache import make_record_key
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+def fingerprint_dataset(dataset) -> str:
+    """
+    Gera a impressão digital (hash) de um dataset carregado. Para datasets em bytes (ex.: retornados pelo
+    'load_datasets'), calcula o hash do conteúdo, sem alterar a posição de leitura. Para os demais objetos, utiliza a
+    mesma serialização das chaves do cache de predições (JSON ou Pickle).
+        :param dataset: Dataset carregado.
+        :return: String contendo o hash (blake2b) do dataset.
+    """
+    if isinstance(dataset, BytesIO):
+        return hashlib.blake2b(dataset.getbuffer(), digest_size=32).hexdigest()
+
+    if isinstance(dataset, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(dataset, digest_size=32).hexdigest()
+
+    return make_record_key(dataset)
+
+
+def fingerprint_datasets(datasets: dict) -> dict:
+    """
+    Gera as impressões digitais de vários datasets.
+        :param datasets: Dicionário com os tipos de datasets como chave e os datasets carregados como valor.
+        :return: Dicionário com os tipos de datasets como chave e as impressões digitais como valor.
+    """
+    return {tipo: fingerprint_dataset(dataset) for tipo, dataset in datasets.items()}
+
+
+def get_loaded_model_version(model) -> str:
+    """
+    Obtém a identificação da versão de um modelo carregado pelo 'load_model' (o 'run_id' do MLflow).
+        :param model: Modelo carregado.
+        :return: Identificação da versão ou None, se não for possível obtê-la.
+    """
+    metadados = getattr(model, "metadata", None)
+    run_id = getattr(metadados, "run_id", None)
+
+    return str(run_id) if run_id else None
+
+
+def get_evaluator_fingerprint(model) -> str:
+    """
+    Gera a identificação do código que faz a avaliação: a classe do modelo, o conteúdo do arquivo onde ela foi definida
+    e, se o modelo possuir o método 'get_model_version', a versão informada por ele. Assim, uma alteração no código da
+    avaliação invalida os resultados guardados.
+        :param model: Modelo instanciado que implementa a interface ModelPublicationInterfaceRETRAIN.
+        :return: String contendo o hash (blake2b) da identificação.
+    """
+    cls = type(model)
+    partes = [f"{cls.__module__}.{cls.__qualname__}".encode()]
+
+    try:
+        with open(inspect.getsourcefile(cls), "rb") as arq:
+            partes.append(arq.read())
+    except (OSError, TypeError):
+        # Sem o código fonte (ex.: classe definida dinamicamente), utiliza o bytecode do 'evaluate'
+        codigo = getattr(getattr(cls, "evaluate", None), "__code__", None)
+        partes.append(codigo.co_code if codigo is not None else b"")
+
+    get_version = getattr(model, "get_model_version", None)
+
+    if callable(get_version):
+        try:
+            partes.append(str(get_version()).encode())
+        except Exception:
+            pass
+
+    return hashlib.blake2b(b"\x00".join(partes), digest_size=32).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Cache persistente para os resultados do método 'evaluate' de um modelo que implementa a interface
+    ModelPublicationInterfaceRETRAIN. Os resultados são guardados em arquivos (Pickle), um por avaliação, e
+    identificados pelo nome do modelo, pela versão do modelo em produção, pelas impressões digitais dos datasets, pelo
+    baseline, pelos parâmetros de treinamento, pelo tamanho do lote e pela identificação do código da avaliação (ver
+    'get_evaluator_fingerprint'). Assim, os resultados sobrevivem ao reinício do worker e podem ser compartilhados entre os processos
+    que utilizarem a mesma pasta.
+    """
+    def __init__(self, model, path: str = "evaluation_cache", ttl: float = 86400.0):
+        """
+        Cria o cache para as avaliações do modelo.
+            :param model: Modelo instanciado que implementa a interface ModelPublicationInterfaceRETRAIN.
+            :param path: Pasta onde os resultados serão guardados.
+            :param ttl: Tempo, em segundos, que um resultado permanece válido no cache (padrão: 1 dia). Utilize 0
+                        (zero) para que os resultados não expirem.
+        """
+        if not (hasattr(model, 'evaluate') and callable(model.evaluate) and hasattr(model, 'get_model_name') and
+                callable(model.get_model_name)):
+            msg = f"Não foi possível criar o cache de avaliações. O modelo informado ('{type(model).__name__}') não " \
+                  f"possui os métodos 'evaluate' e 'get_model_name'."
+            LOGGER.error(msg)
+            raise TypeError(msg)
+
+        if ttl < 0:
+            msg = f"O parâmetro 'ttl' não pode ser negativo, porém recebeu '{ttl}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.__model = model
+        self.__path = Path(path) / model.get_model_name()
+        self.__ttl = ttl
+        self.__evaluator = get_evaluator_fingerprint(model)
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def make_key(self, model_version: str, datasets: dict, baseline_metrics: dict, training_params: dict = None,
+                 batch_size: int = 100000) -> str:
+        """
+        Gera a chave de uma avaliação.
+            :param model_version: Versão do modelo em produção.
+            :param datasets: Dicionário com os datasets que serão utilizados na avaliação.
+            :param baseline_metrics: Dicionário com as métricas de baseline.
+            :param training_params: Dicionário com os parâmetros utilizados no treinamento do modelo em produção.
+            :param batch_size: Tamanho do lote.
+            :return: String contendo o hash (sha256) da chave.
+        """
+        return make_record_key({'model_name': self.__model.get_model_name(), 'model_version': model_version,
+                                'datasets': fingerprint_datasets(datasets),
+                                'baseline': make_record_key(baseline_metrics),
+                                'training_params': make_record_key(training_params),
+                                'batch_size': batch_size, 'evaluator': self.__evaluator})
+
+    def __read(self, key: str):
+        """
+        Lê uma avaliação guardada.
+            :param key: Chave da avaliação.
+            :return: Resultado da avaliação ou None, se não existir, estiver expirado ou não puder ser lido.
+        """
+        arquivo = self.__path / f"{key}.pkl"
+
+        try:
+            with open(arquivo, "rb") as arq:
+                entrada = pickle.load(arq)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            LOGGER.warning(f"Não foi possível ler a avaliação guardada no arquivo '{arquivo}': {e}")
+            return None
+
+        if self.__ttl != 0 and time.time() - entrada['created_at'] > self.__ttl:
+            return None
+
+        return entrada['result']
+
+    def __write(self, key: str, result: tuple):
+        """
+        Guarda uma avaliação. O arquivo é gravado com outro nome e renomeado, para que os outros processos nunca
+        leiam um arquivo incompleto.
+            :param key: Chave da avaliação.
+            :param result: Resultado da avaliação.
+        """
+        arquivo = self.__path / f"{key}.pkl"
+        temporario = self.__path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            self.__path.mkdir(parents=True, exist_ok=True)
+
+            with open(temporario, "wb") as arq:
+                pickle.dump({'created_at': time.time(), 'result': result}, arq, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temporario, arquivo)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # O cache não pode interromper a avaliação
+            Path.unlink(temporario, missing_ok=True)
+            LOGGER.warning(f"Não foi possível guardar a avaliação no arquivo '{arquivo}': {e}")
+
+    def evaluate(self, model, datasets: dict, baseline_metrics: dict, training_params: dict,
+                 artifacts_path: str = "temp_area", batch_size: int = 100000, model_version: str = None) -> \
+            (bool, dict):
+        """
+        Faz a avaliação do modelo utilizando o cache. Os parâmetros são os mesmos do método 'evaluate' da interface
+        ModelPublicationInterfaceRETRAIN.
+            :param model: Modelo que está em produção.
+            :param datasets: Dicionário com os datasets que serão utilizados na avaliação.
+            :param baseline_metrics: Dicionário com as métricas do modelo em produção que servirão de baseline.
+            :param training_params: Dicionário com os parâmetros utilizados no treinamento do modelo em produção.
+            :param artifacts_path: Caminho local para a obtenção dos artefatos do modelo.
+            :param batch_size: Tamanho do lote.
+            :param model_version: Versão do modelo em produção. Se não for informada, utiliza o 'run_id' do modelo
+                                  carregado pelo 'load_model'. Se não for possível obtê-la, o cache não é utilizado.
+            :return: O mesmo retorno do método 'evaluate' do modelo.
+        """
+        versao = model_version if model_version is not None else get_loaded_model_version(model)
+
+        if versao is None:
+            LOGGER.warning("Não foi possível obter a versão do modelo em produção. A avaliação será feita sem o cache.")
+            return self.__model.evaluate(model, datasets, baseline_metrics, training_params, artifacts_path,
+                                         batch_size)
+
+        chave = self.make_key(versao, datasets, baseline_metrics, training_params, batch_size)
+
+        with self.__lock:
+            resultado = self.__read(chave)
+
+            if resultado is not None:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+
+        if resultado is not None:
+            EVALUATION_CACHE_REQUESTS.inc(result="hit")
+            LOGGER.info("Modelo: %s. O modelo em produção, os datasets, o baseline, os parâmetros e o código da "
+                        "avaliação não mudaram. Utilizando a avaliação guardada no cache.",
+                        self.__model.get_model_name(), extra={'model_name': self.__model.get_model_name(), 'model_version': versao})
+            return resultado
+
+        EVALUATION_CACHE_REQUESTS.inc(result="miss")
+        resultado = self.__model.evaluate(model, datasets, baseline_metrics, training_params, artifacts_path,
+                                          batch_size)
+
+        # Repassa a mensagem de erro do modelo sem guardar nada no cache
+        if type(resultado) is str:
+            return resultado
+
+        with self.__lock:
+            self.__write(chave, resultado)
+
+        return resultado
+
+    def invalidate(self):
+        """
+        Remove todas as avaliações guardadas no cache do modelo.
+        """
+        with self.__lock:
+            for arquivo in self.__path.glob("*.pkl"):
+                Path.unlink(arquivo, missing_ok=True)
+
+    def get_stats(self) -> dict:
+        """
+        Obtém as estatísticas de uso do cache.
+            :return: Dicionário com a quantidade de acertos ('hits'), falhas ('misses') e avaliações guardadas
+                     ('size').
+        """
+        with self.__lock:
+            return {'hits': self.__hits, 'misses': self.__misses, 'size': len(list(self.__path.glob("*.pkl")))}
@@ -0,0 +1,117 @@
+# ----------------------------------------------------------------------------------------------------
+# Baseline de desempenho dos modelos (artefato opcional 'BaselineLatency.pkl').
+#
+# Assim como o 'BaselineMetrics.pkl' guarda as métricas de qualidade, o 'BaselineLatency.pkl' guarda a
+# vazão, a latência (percentil 95) do 'predict' e o tamanho do modelo medidos no treinamento.
+#
+# Uso: No treinamento, gere o baseline com 'measure_latency_baseline', persista-o com
+# 'convert_artifact_to_pickle' e salve-o com 'mlflow.log_artifact'. No 'evaluate', carregue o baseline
+# de produção com 'load_production_latency_baseline' e compare com o do modelo candidato através de
+# 'compare_latency_baseline', para rejeitar candidatos mais lentos.
+# ----------------------------------------------------------------------------------------------------
+import time
+from math import ceil
+from pathlib import Path
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+NOME_ARTEFATO_LATENCIA = "BaselineLatency.pkl"
+
+
+def get_model_size(path: str) -> int:
+    """
+    Obtém o tamanho em disco de um modelo.
+        :param path: Caminho do arquivo ou da pasta onde o modelo foi gravado.
+        :return: Tamanho em bytes (soma dos tamanhos dos arquivos, no caso de uma pasta).
+    """
+    caminho = Path(path)
+
+    if caminho.is_file():
+        return caminho.stat().st_size
+
+    if caminho.is_dir():
+        return sum(arq.stat().st_size for arq in caminho.rglob("*") if arq.is_file())
+
+    msg = f"Não foi possível obter o tamanho do modelo. O caminho '{path}' não foi encontrado."
+    LOGGER.error(msg)
+    raise FileNotFoundError(msg)
+
+
+def measure_latency_baseline(predict_function, sample: list, runs: int = 50, model_path: str = "") -> dict:
+    """
+    Mede o desempenho do 'predict' de um modelo para compor o baseline de desempenho.
+        :param predict_function: Função que recebe a amostra e retorna as predições (ex.: o método 'predict' do
+                                 modelo treinado).
+        :param sample: Amostra de registros, no formato aceito pela função de predição.
+        :param runs: Quantidade de chamadas medidas (uma chamada adicional, não medida, é feita antes das medições).
+        :param model_path: Caminho do arquivo ou da pasta onde o modelo foi gravado. Se não for informado, o tamanho do
+                           modelo não será registrado.
+        :return: Dicionário com a vazão em registros por segundo ('throughput_per_s'), a latência de cada chamada no
+                 percentil 95 em milissegundos ('p95_latency_ms'), o tamanho do modelo em bytes ('model_size_bytes'),
+                 o tamanho da amostra ('sample_size') e a quantidade de chamadas medidas ('runs').
+    """
+    if runs <= 0 or len(sample) == 0:
+        msg = "A quantidade de chamadas deve ser maior que 0 (zero) e a amostra não pode estar vazia."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    predict_function(sample)
+    latencias = []
+
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        predict_function(sample)
+        latencias.append(time.perf_counter() - inicio)
+
+    latencias.sort()
+
+    return {'throughput_per_s': len(sample) * runs / sum(latencias),
+            'p95_latency_ms': latencias[ceil(0.95 * runs) - 1] * 1000,
+            'model_size_bytes': get_model_size(model_path) if model_path != "" else None,
+            'sample_size': len(sample), 'runs': runs}
+
+
+def compare_latency_baseline(candidate: dict, baseline: dict, max_latency_ratio: float = 1.2,
+                             min_throughput_ratio: float = 0.8, max_size_ratio: float = None) -> tuple:
+    """
+    Compara o desempenho de um modelo candidato com o baseline de desempenho do modelo em produção.
+        :param candidate: Baseline de desempenho do candidato (retorno de 'measure_latency_baseline').
+        :param baseline: Baseline de desempenho do modelo em produção (retorno de 'load_production_latency_baseline').
+                         Se for None, o candidato é aprovado.
+        :param max_latency_ratio: Razão máxima permitida entre a latência p95 do candidato e a do baseline.
+        :param min_throughput_ratio: Razão mínima permitida entre a vazão do candidato e a do baseline.
+        :param max_size_ratio: Razão máxima permitida entre o tamanho do candidato e o do baseline. Se não for
+                               informada, o tamanho não é comparado.
+        :return: Tupla com o resultado da comparação (True, se o candidato foi aprovado) e uma lista com os motivos
+                 da reprovação.
+    """
+    if baseline is None:
+        return True, []
+
+    motivos = []
+    latencia_base = baseline.get('p95_latency_ms')
+    vazao_base = baseline.get('throughput_per_s')
+    tamanho_base = baseline.get('model_size_bytes')
+
+    if latencia_base and candidate['p95_latency_ms'] > latencia_base * max_latency_ratio:
+        motivos.append(f"Latência p95 de {candidate['p95_latency_ms']:.3f} ms, acima do limite de "
+                       f"{latencia_base * max_latency_ratio:.3f} ms ({max_latency_ratio}x o baseline de "
+                       f"{latencia_base:.3f} ms).")
+
+    if vazao_base and candidate['throughput_per_s'] < vazao_base * min_throughput_ratio:
+        motivos.append(f"Vazão de {candidate['throughput_per_s']:.1f} registros/s, abaixo do limite de "
+                       f"{vazao_base * min_throughput_ratio:.1f} registros/s ({min_throughput_ratio}x o baseline de "
+                       f"{vazao_base:.1f} registros/s).")
+
+    if max_size_ratio is not None and tamanho_base and candidate.get('model_size_bytes') is not None and \
+            candidate['model_size_bytes'] > tamanho_base * max_size_ratio:
+        motivos.append(f"Tamanho de {candidate['model_size_bytes']} bytes, acima do limite de "
+                       f"{tamanho_base * max_size_ratio:.0f} bytes ({max_size_ratio}x o baseline de {tamanho_base} "
+                       f"bytes).")
+
+    for motivo in motivos:
+        LOGGER.warning(f"Modelo candidato reprovado no baseline de desempenho: {motivo}")
+
+    return len(motivos) == 0, motivos
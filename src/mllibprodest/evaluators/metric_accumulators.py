@@ -0,0 +1,321 @@
+# ----------------------------------------------------------------------------------------------------
+# Acumuladores incrementais de métricas para avaliação de modelos.
+#
+# Os acumuladores são atualizados lote a lote (ex.: dentro do laço que percorre os índices gerados
+# por 'generate_batch_indices') e podem ser combinados entre processos através do método 'merge',
+# de forma que as métricas sejam calculadas em uma única passagem pelos dados, sem a necessidade de
+# manter todas as predições na memória.
+#
+# Uso: Utilize estes acumuladores nas implementações dos métodos 'evaluate' e 'get_feedback'.
+# ----------------------------------------------------------------------------------------------------
+import abc
+from math import log, sqrt
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+class MetricAccumulator(metaclass=abc.ABCMeta):
+    """
+    Interface comum para os acumuladores de métricas.
+    """
+    @abc.abstractmethod
+    def update(self, y_pred: list, y_true: list):
+        """
+        Atualiza o acumulador com um lote de predições.
+            :param y_pred: Lista com os valores preditos do lote.
+            :param y_true: Lista com os valores verdadeiros do lote.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def merge(self, other):
+        """
+        Combina o estado de outro acumulador do mesmo tipo com o estado deste acumulador. Útil para juntar os
+        resultados calculados em processos diferentes (os acumuladores podem ser serializados com o Pickle).
+            :param other: Acumulador do mesmo tipo.
+            :return: O próprio acumulador, já combinado.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def result(self) -> dict:
+        """
+        Calcula as métricas com base no estado acumulado.
+            :return: Dicionário com as métricas calculadas.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _check_sizes(y_pred: list, y_true: list):
+        """
+        Verifica se as listas de valores preditos e verdadeiros possuem o mesmo tamanho.
+            :param y_pred: Lista com os valores preditos.
+            :param y_true: Lista com os valores verdadeiros.
+        """
+        if len(y_pred) != len(y_true):
+            msg = f"As listas 'y_pred' ({len(y_pred)} elementos) e 'y_true' ({len(y_true)} elementos) devem ter o " \
+                  f"mesmo tamanho."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+    def _check_merge(self, other):
+        """
+        Verifica se o acumulador recebido é do mesmo tipo deste acumulador.
+            :param other: Acumulador que será combinado.
+        """
+        if type(other) is not type(self):
+            msg = f"Não é possível combinar um acumulador do tipo '{type(self).__name__}' com um do tipo " \
+                  f"'{type(other).__name__}'."
+            LOGGER.error(msg)
+            raise TypeError(msg)
+
+
+class ClassificationAccumulator(MetricAccumulator):
+    """
+    Acumula a matriz de confusão e calcula as métricas de classificação: acurácia e precisão, revocação (recall) e F1
+    por classe e com as médias 'macro', 'micro' e 'weighted'. A memória utilizada depende somente da quantidade de
+    classes.
+    """
+    def __init__(self):
+        self.__matrix = {}  # label verdadeiro -> {label predito: quantidade}
+        self.__total = 0
+
+    def update(self, y_pred: list, y_true: list):
+        self._check_sizes(y_pred, y_true)
+
+        for predito, verdadeiro in zip(y_pred, y_true):
+            linha = self.__matrix.setdefault(verdadeiro, {})
+            linha[predito] = linha.get(predito, 0) + 1
+
+        self.__total += len(y_true)
+
+    def merge(self, other):
+        self._check_merge(other)
+
+        for verdadeiro, linha_outro in other.get_confusion_matrix().items():
+            linha = self.__matrix.setdefault(verdadeiro, {})
+
+            for predito, quantidade in linha_outro.items():
+                linha[predito] = linha.get(predito, 0) + quantidade
+
+        self.__total += other.get_total()
+
+        return self
+
+    def get_total(self) -> int:
+        """
+        Obtém a quantidade de registros acumulados.
+            :return: Quantidade de registros acumulados.
+        """
+        return self.__total
+
+    def get_labels(self) -> list:
+        """
+        Obtém os labels encontrados até o momento (verdadeiros e preditos), ordenados quando possível.
+            :return: Lista com os labels.
+        """
+        labels = set(self.__matrix.keys())
+
+        for linha in self.__matrix.values():
+            labels.update(linha.keys())
+
+        try:
+            return sorted(labels)
+        except TypeError:
+            return sorted(labels, key=str)
+
+    def get_confusion_matrix(self) -> dict:
+        """
+        Obtém a matriz de confusão acumulada.
+            :return: Dicionário no formato {label verdadeiro: {label predito: quantidade}}.
+        """
+        return {verdadeiro: dict(linha) for verdadeiro, linha in self.__matrix.items()}
+
+    def result(self) -> dict:
+        labels = self.get_labels()
+        acertos_total = 0
+        por_classe = {}
+        soma_precisao = soma_recall = soma_f1 = 0.0
+        soma_precisao_pond = soma_recall_pond = soma_f1_pond = 0.0
+
+        # Total de predições por label (soma das colunas da matriz)
+        preditos_por_label = {}
+
+        for linha in self.__matrix.values():
+            for predito, quantidade in linha.items():
+                preditos_por_label[predito] = preditos_por_label.get(predito, 0) + quantidade
+
+        for label in labels:
+            linha = self.__matrix.get(label, {})
+            vp = linha.get(label, 0)
+            suporte = sum(linha.values())
+            preditos = preditos_por_label.get(label, 0)
+            precisao = vp / preditos if preditos else 0.0
+            recall = vp / suporte if suporte else 0.0
+            f1 = 2 * precisao * recall / (precisao + recall) if precisao + recall else 0.0
+            acertos_total += vp
+            por_classe[label] = {'precision': precisao, 'recall': recall, 'f1': f1, 'support': suporte}
+            soma_precisao += precisao
+            soma_recall += recall
+            soma_f1 += f1
+            soma_precisao_pond += precisao * suporte
+            soma_recall_pond += recall * suporte
+            soma_f1_pond += f1 * suporte
+
+        qtd_labels = len(labels)
+        total = self.__total
+        # Em classificação de um label por registro, precisão, revocação e F1 'micro' são iguais à acurácia
+        acuracia = acertos_total / total if total else 0.0
+
+        return {
+            'accuracy': acuracia,
+            'per_class': por_classe,
+            'macro': {'precision': soma_precisao / qtd_labels if qtd_labels else 0.0,
+                      'recall': soma_recall / qtd_labels if qtd_labels else 0.0,
+                      'f1': soma_f1 / qtd_labels if qtd_labels else 0.0},
+            'micro': {'precision': acuracia, 'recall': acuracia, 'f1': acuracia},
+            'weighted': {'precision': soma_precisao_pond / total if total else 0.0,
+                         'recall': soma_recall_pond / total if total else 0.0,
+                         'f1': soma_f1_pond / total if total else 0.0},
+            'support': total
+        }
+
+
+class LogLossAccumulator(MetricAccumulator):
+    """
+    Acumula a perda logarítmica (log-loss / entropia cruzada). Os valores preditos devem ser as probabilidades de
+    cada classe, informadas como um dicionário {label: probabilidade} por registro ou como uma lista de
+    probabilidades na ordem definida pelo parâmetro 'labels'.
+    """
+    def __init__(self, labels: list = None, eps: float = 1e-15):
+        """
+        Cria o acumulador de log-loss.
+            :param labels: Lista com os labels na ordem das probabilidades, caso as probabilidades preditas sejam
+                           informadas como listas. Não é necessário se forem informadas como dicionários.
+            :param eps: Valor utilizado para limitar as probabilidades ao intervalo [eps, 1 - eps] e evitar log(0).
+        """
+        self.__labels = list(labels) if labels is not None else None
+        self.__eps = eps
+        self.__soma = 0.0
+        self.__total = 0
+
+    def update(self, y_pred: list, y_true: list):
+        self._check_sizes(y_pred, y_true)
+
+        for probabilidades, verdadeiro in zip(y_pred, y_true):
+            if isinstance(probabilidades, dict):
+                p = probabilidades.get(verdadeiro, 0.0)
+            else:
+                if self.__labels is None:
+                    msg = "As probabilidades foram informadas como listas, mas o parâmetro 'labels' não foi " \
+                          "informado na criação do acumulador."
+                    LOGGER.error(msg)
+                    raise ValueError(msg)
+
+                try:
+                    p = probabilidades[self.__labels.index(verdadeiro)]
+                except ValueError:
+                    msg = f"O label '{verdadeiro}' não foi encontrado na lista de labels: {self.__labels}."
+                    LOGGER.error(msg)
+                    raise ValueError(msg) from None
+
+            p = min(max(p, self.__eps), 1 - self.__eps)
+            self.__soma -= log(p)
+
+        self.__total += len(y_true)
+
+    def merge(self, other):
+        self._check_merge(other)
+        estado = other.get_state()
+        self.__soma += estado['sum']
+        self.__total += estado['count']
+
+        return self
+
+    def get_state(self) -> dict:
+        """
+        Obtém o estado acumulado.
+            :return: Dicionário com a soma das perdas ('sum') e a quantidade de registros ('count').
+        """
+        return {'sum': self.__soma, 'count': self.__total}
+
+    def result(self) -> dict:
+        return {'log_loss': self.__soma / self.__total if self.__total else 0.0, 'support': self.__total}
+
+
+class RegressionAccumulator(MetricAccumulator):
+    """
+    Acumula os erros de regressão e calcula: erro absoluto médio (MAE), erro quadrático médio (MSE), raiz do erro
+    quadrático médio (RMSE), erro máximo e coeficiente de determinação (R²). A memória utilizada é constante. A média
+    e a soma dos quadrados dos desvios dos valores verdadeiros são acumuladas pelo método de Welford (e combinadas pela
+    fórmula paralela de Chan), para que o R² não perca precisão quando os valores possuem um deslocamento grande em
+    relação à variação (ex.: 1e9 + 0.01 * i).
+    """
+    def __init__(self):
+        self.__total = 0
+        self.__soma_abs = 0.0
+        self.__soma_quad = 0.0
+        self.__erro_max = 0.0
+        self.__media_y = 0.0
+        self.__m2_y = 0.0
+
+    def update(self, y_pred: list, y_true: list):
+        self._check_sizes(y_pred, y_true)
+
+        for predito, verdadeiro in zip(y_pred, y_true):
+            erro = verdadeiro - predito
+            self.__soma_abs += abs(erro)
+            self.__soma_quad += erro * erro
+            self.__erro_max = max(self.__erro_max, abs(erro))
+
+            # Método de Welford
+            self.__total += 1
+            delta = verdadeiro - self.__media_y
+            self.__media_y += delta / self.__total
+            self.__m2_y += delta * (verdadeiro - self.__media_y)
+
+    def merge(self, other):
+        self._check_merge(other)
+        estado = other.get_state()
+        n_a = self.__total
+        n_b = estado['count']
+
+        if n_b == 0:
+            return self
+
+        # Fórmula paralela de Chan
+        n = n_a + n_b
+        delta = estado['mean_y'] - self.__media_y
+        self.__media_y += delta * n_b / n
+        self.__m2_y += estado['m2_y'] + delta * delta * n_a * n_b / n
+        self.__total = n
+        self.__soma_abs += estado['sum_abs_error']
+        self.__soma_quad += estado['sum_squared_error']
+        self.__erro_max = max(self.__erro_max, estado['max_error'])
+
+        return self
+
+    def get_state(self) -> dict:
+        """
+        Obtém o estado acumulado.
+            :return: Dicionário com a quantidade de registros ('count'), as somas dos erros, o erro máximo, a média dos
+                     valores verdadeiros ('mean_y') e a soma dos quadrados dos desvios deles em relação à média
+                     ('m2_y').
+        """
+        return {'count': self.__total, 'sum_abs_error': self.__soma_abs, 'sum_squared_error': self.__soma_quad,
+                'max_error': self.__erro_max, 'mean_y': self.__media_y, 'm2_y': self.__m2_y}
+
+    def result(self) -> dict:
+        n = self.__total
+
+        if n == 0:
+            return {'mae': 0.0, 'mse': 0.0, 'rmse': 0.0, 'max_error': 0.0, 'r2': 0.0, 'support': 0}
+
+        mse = self.__soma_quad / n
+        # O M2 de Welford é a soma total dos quadrados: sum((y - média)²)
+        r2 = 1 - self.__soma_quad / self.__m2_y if self.__m2_y > 0 else 0.0
+
+        return {'mae': self.__soma_abs / n, 'mse': mse, 'rmse': sqrt(mse), 'max_error': self.__erro_max, 'r2': r2,
+                'support': n}
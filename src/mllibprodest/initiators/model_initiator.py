@@ -2,10 +2,39 @@
 # Classes e funções para inicialização de modelos de ML (Machine Learning).
 # ---------------------------------------------------------------------------------------------------------
 import importlib
-from ..utils import get_models_params, make_log
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .model_warmup import warm_up_model
+from ..monitors.metrics import MODEL_INIT_SECONDS, MODELS_LOADED
+from ..monitors.profiling import ModelProfiler
+from ..monitors.resources import record_model_load, track_model_usage, forget_model
+from ..monitors.tracing import start_span, trace_model, is_tracing_enabled
+from ..providers_types.mlflow_snapshot import activate_snapshot, start_background_reconcile
+from ..utils import get_models_params, LazyLogger
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+def diff_models_params(old_params: dict, new_params: dict) -> dict:
+    """
+    Compara dois conjuntos de parâmetros de modelos (retornos do 'get_models_params').
+        :param old_params: Parâmetros anteriores.
+        :param new_params: Parâmetros novos.
+        :return: Dicionário com as listas de modelos adicionados ('added'), removidos ('removed'), alterados
+                 ('reloaded') e inalterados ('unchanged').
+    """
+    mantidos = [nome for nome in new_params.keys() if nome in old_params]
+
+    return {
+        'added': [nome for nome in new_params.keys() if nome not in old_params],
+        'removed': [nome for nome in old_params.keys() if nome not in new_params],
+        'reloaded': [nome for nome in mantidos if new_params[nome] != old_params[nome]],
+        'unchanged': [nome for nome in mantidos if new_params[nome] == old_params[nome]]
+    }
 
 
 class InitModels:
@@ -13,86 +42,452 @@ class InitModels:
     Classe utilizada para instanciar os modelos de ML (Machine Learning).
     """
     @staticmethod
-    def init_models(path: str = "") -> dict:
+    def import_model_class(model_name: str, model_params: dict) -> type:
         """
-        Inicia os modelos de ML (Machine Learning) utilizando os parâmetros configurados no arquivo 'params.conf'.
-            :param path: Caminho onde se encontra o arquivo de parâmetros. O padrão é estar na pasta local.
-            :return: Dicionário contendo como chave os nomes dos modelos e como valor os modelos instanciados.
+        Importa o módulo 'models.<source_file>' de um modelo e obtém a classe definida no parâmetro 'model_class'.
+            :param model_name: Nome do modelo (seção do arquivo 'params.conf').
+            :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :return: Classe do modelo ('ModeloCLF' ou 'ModeloRETRAIN').
         """
-        modelos = {}
-        models_params = get_models_params(path)
+        with MODEL_INIT_SECONDS.time(model=model_name, stage="import"):
+            return InitModels.__import_model_class(model_name, model_params)
 
-        for model_name in models_params.keys():
-            caminho_import = f"models.{models_params[model_name]['source_file']}"
+    @staticmethod
+    def __import_model_class(model_name: str, model_params: dict) -> type:
+        """
+        Implementação do método 'import_model_class'.
+        """
+        caminho_import = f"models.{model_params['source_file']}"
 
-            try:
-                modulo = importlib.import_module(caminho_import, package=None)
-            except ModuleNotFoundError as e:
-                msg_erro = str(e)
-
-                if caminho_import in msg_erro:
-                    msg = f"Modelo: {model_name}. O módulo '{caminho_import}' não foi encontrado. Verifique no " \
-                          f"arquivo 'params.conf' se o parâmetro 'source_file' foi informado corretamente e/ou se " \
-                          f"este módulo está dentro da pasta 'models'."
-                    LOGGER.error(msg)
-                    raise ModuleNotFoundError(msg) from None
-                else:
-                    msg = f"Modelo: {model_name}. Erro ao importar os módulos necessários para o módulo " \
-                          f"'{caminho_import}'. Mensagem do Import: {msg_erro}"
-                    LOGGER.error(msg)
-                    # Não utilizei o 'from None' para preservar o traceback
-                    raise ModuleNotFoundError(msg)
-            except ImportError as e:
+        try:
+            modulo = importlib.import_module(caminho_import, package=None)
+        except ModuleNotFoundError as e:
+            msg_erro = str(e)
+
+            if caminho_import in msg_erro:
+                msg = f"Modelo: {model_name}. O módulo '{caminho_import}' não foi encontrado. Verifique no " \
+                      f"arquivo 'params.conf' se o parâmetro 'source_file' foi informado corretamente e/ou se " \
+                      f"este módulo está dentro da pasta 'models'."
+                LOGGER.error(msg)
+                raise ModuleNotFoundError(msg) from None
+            else:
                 msg = f"Modelo: {model_name}. Erro ao importar os módulos necessários para o módulo " \
-                      f"'{caminho_import}'. Mensagem do Import: {str(e)}"
+                      f"'{caminho_import}'. Mensagem do Import: {msg_erro}"
                 LOGGER.error(msg)
                 # Não utilizei o 'from None' para preservar o traceback
-                raise ImportError(msg)
-
-            if models_params[model_name]['model_class'] == "ModeloCLF":
-                cls = getattr(modulo, "ModeloCLF")
-
-                if callable(cls) and type(cls).__name__ == 'ABCMeta':
-                    try:
-                        modelos[model_name] = cls(model_name=model_name,
-                                                  model_provider_name=models_params[model_name]['model_provider_name'])
-                    except TypeError as e:
-                        msg = f"Faltou a implementação do(s) seguinte(s) método(s) para o modelo '{model_name}' " \
-                              f"(classe 'ModeloCLF'): {str(e)[64:]}."
-                        LOGGER.error(msg)
-                        raise TypeError(msg) from None
-                else:
-                    msg = f"Modelo: {model_name}. O tipo do 'ModeloCLF' está incorreto: '{type(cls).__name__}'. " \
-                          f"'ModeloCLF' deve ser uma classe que herda os métodos da interface " \
-                          f"'ModelPublicationInterfaceCLF' e possua as implementações para os métodos abstratos dela."
-                    LOGGER.error(msg)
-                    raise TypeError(msg)
-            elif models_params[model_name]['model_class'] == "ModeloRETRAIN":
-                cls = getattr(modulo, "ModeloRETRAIN")
-
-                if callable(cls) and type(cls).__name__ == 'ABCMeta':
-                    try:
-                        modelos[model_name] = cls(model_name=model_name,
-                                                  model_provider_name=models_params[model_name]['model_provider_name'],
-                                                  experiment_name=models_params[model_name]['experiment_name'],
-                                                  dataset_provider_name=models_params[model_name]['dataset_provider_name'])
-                    except TypeError as e:
-                        msg = f"Faltou a implementação do(s) seguinte(s) método(s) para o modelo '{model_name}' " \
-                              f"(classe 'ModeloRETRAIN'): {str(e)[68:]}."
-                        LOGGER.error(msg)
-                        raise TypeError(msg) from None
-                else:
-                    msg = f"Modelo: {model_name}. O tipo do 'ModeloRETRAIN' está incorreto: '{type(cls).__name__}'. " \
-                          f"'ModeloRETRAIN' deve ser uma classe que herda os métodos da interface " \
-                          f"'ModelPublicationInterfaceRETRAIN' e possua as implementações para os métodos " \
-                          f"abstratos dela."
-                    LOGGER.error(msg)
-                    raise TypeError(msg)
-            else:
-                msg = f"Modelo: {model_name}. O valor do parâmetro 'model_class' está incorreto. Foi informado " \
-                      f"'{models_params[model_name]['model_class']}' no arquivo 'params.conf', porém deve ser " \
-                      f"'ModeloCLF' ou 'ModeloRETRAIN'."
+                raise ModuleNotFoundError(msg)
+        except ImportError as e:
+            msg = f"Modelo: {model_name}. Erro ao importar os módulos necessários para o módulo " \
+                  f"'{caminho_import}'. Mensagem do Import: {str(e)}"
+            LOGGER.error(msg)
+            # Não utilizei o 'from None' para preservar o traceback
+            raise ImportError(msg)
+
+        if model_params['model_class'] == "ModeloCLF":
+            cls = getattr(modulo, "ModeloCLF")
+
+            if not (callable(cls) and type(cls).__name__ == 'ABCMeta'):
+                msg = f"Modelo: {model_name}. O tipo do 'ModeloCLF' está incorreto: '{type(cls).__name__}'. " \
+                      f"'ModeloCLF' deve ser uma classe que herda os métodos da interface " \
+                      f"'ModelPublicationInterfaceCLF' e possua as implementações para os métodos abstratos dela."
                 LOGGER.error(msg)
-                raise ValueError(msg)
+                raise TypeError(msg)
+        elif model_params['model_class'] == "ModeloRETRAIN":
+            cls = getattr(modulo, "ModeloRETRAIN")
+
+            if not (callable(cls) and type(cls).__name__ == 'ABCMeta'):
+                msg = f"Modelo: {model_name}. O tipo do 'ModeloRETRAIN' está incorreto: '{type(cls).__name__}'. " \
+                      f"'ModeloRETRAIN' deve ser uma classe que herda os métodos da interface " \
+                      f"'ModelPublicationInterfaceRETRAIN' e possua as implementações para os métodos " \
+                      f"abstratos dela."
+                LOGGER.error(msg)
+                raise TypeError(msg)
+        else:
+            msg = f"Modelo: {model_name}. O valor do parâmetro 'model_class' está incorreto. Foi informado " \
+                  f"'{model_params['model_class']}' no arquivo 'params.conf', porém deve ser " \
+                  f"'ModeloCLF' ou 'ModeloRETRAIN'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        return cls
+
+    @staticmethod
+    def instantiate_model(model_name: str, model_params: dict, cls: type):
+        """
+        Instancia um modelo utilizando a classe obtida através do método 'import_model_class'.
+            :param model_name: Nome do modelo (seção do arquivo 'params.conf').
+            :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :param cls: Classe do modelo ('ModeloCLF' ou 'ModeloRETRAIN').
+            :return: Modelo instanciado.
+        """
+        inicio = time.perf_counter()
+
+        with MODEL_INIT_SECONDS.time(model=model_name, stage="instantiate"), \
+                start_span("InitModels.instantiate_model", model__name=model_name):
+            modelo = InitModels.__instantiate_model(model_name, model_params, cls)
+
+        # Contabilização dos recursos do modelo (ver 'monitors.resources.get_models_resources')
+        record_model_load(model_name, time.perf_counter() - inicio)
+        track_model_usage(model_name, modelo)
+
+        # Rastreamento opcional dos métodos do modelo, habilitado pela variável de ambiente 'STACK_TRACE_FILE' ou
+        # pelo 'monitors.tracing.set_span_exporter'
+        if is_tracing_enabled():
+            trace_model(model_name, modelo)
+
+        # Perfilamento opcional dos métodos do modelo, habilitado pela variável de ambiente 'STACK_PROFILE'
+        profiler = ModelProfiler.from_env()
+
+        if profiler is not None:
+            profiler.wrap_model(model_name, modelo)
+
+        return modelo
+
+    @staticmethod
+    def __instantiate_model(model_name: str, model_params: dict, cls: type):
+        """
+        Implementação do método 'instantiate_model'.
+        """
+        if model_params['model_class'] == "ModeloCLF":
+            try:
+                return cls(model_name=model_name, model_provider_name=model_params['model_provider_name'])
+            except TypeError as e:
+                msg = f"Faltou a implementação do(s) seguinte(s) método(s) para o modelo '{model_name}' " \
+                      f"(classe 'ModeloCLF'): {str(e)[64:]}."
+                LOGGER.error(msg)
+                raise TypeError(msg) from None
+        else:
+            try:
+                return cls(model_name=model_name, model_provider_name=model_params['model_provider_name'],
+                           experiment_name=model_params['experiment_name'],
+                           dataset_provider_name=model_params['dataset_provider_name'])
+            except TypeError as e:
+                msg = f"Faltou a implementação do(s) seguinte(s) método(s) para o modelo '{model_name}' " \
+                      f"(classe 'ModeloRETRAIN'): {str(e)[68:]}."
+                LOGGER.error(msg)
+                raise TypeError(msg) from None
+
+    @staticmethod
+    def init_model(model_name: str, model_params: dict, path: str = "", warmup: bool = True):
+        """
+        Inicia um único modelo de ML (Machine Learning): importa o módulo, instancia a classe e, se configurado, faz o
+        aquecimento.
+            :param model_name: Nome do modelo (seção do arquivo 'params.conf').
+            :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :param path: Caminho onde se encontra o arquivo de parâmetros.
+            :param warmup: Se True, faz o aquecimento do modelo caso o parâmetro 'warmup_iterations' tenha sido
+                           informado.
+            :return: Modelo instanciado.
+        """
+        cls = InitModels.import_model_class(model_name, model_params)
+        modelo = InitModels.instantiate_model(model_name, model_params, cls)
+
+        if warmup:
+            warm_up_model(model_name, modelo, model_params, path)
+
+        return modelo
+
+    @staticmethod
+    def __init_models_parallel(models_params: dict, path: str, warmup: bool, max_workers: int) -> dict:
+        """
+        Inicia os modelos de forma paralela. Os módulos são importados um de cada vez (o import do Python não é
+        paralelizável), mas os construtores, que normalmente fazem o 'load_model' e baixam os artefatos, e o
+        aquecimento rodam concorrentemente. Todos os erros são reunidos em uma única mensagem.
+            :param models_params: Dicionário com os parâmetros dos modelos (retorno do 'get_models_params').
+            :param path: Caminho onde se encontra o arquivo de parâmetros.
+            :param warmup: Se True, faz o aquecimento dos modelos configurados para isso.
+            :param max_workers: Quantidade máxima de modelos instanciados ao mesmo tempo.
+            :return: Dicionário contendo como chave os nomes dos modelos e como valor os modelos instanciados.
+        """
+        if type(max_workers) is not int or max_workers <= 0:
+            msg = f"O parâmetro 'max_workers' deve ser um inteiro maior que 0 (zero), porém recebeu '{max_workers}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        classes = {}
+        erros = {}
+
+        for model_name, model_params in models_params.items():
+            try:
+                classes[model_name] = InitModels.import_model_class(model_name, model_params)
+            except (ImportError, TypeError, ValueError, AttributeError) as e:
+                erros[model_name] = f"{type(e).__name__}: {e}"
+
+        def instanciar(model_name: str):
+            modelo = InitModels.instantiate_model(model_name, models_params[model_name], classes[model_name])
+
+            if warmup:
+                warm_up_model(model_name, modelo, models_params[model_name], path)
+
+            return modelo
+
+        modelos = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="init_models") as pool:
+            futuros = {model_name: pool.submit(instanciar, model_name) for model_name in classes.keys()}
+
+            for model_name, futuro in futuros.items():
+                try:
+                    modelos[model_name] = futuro.result()
+                except Exception as e:
+                    erros[model_name] = f"{type(e).__name__}: {e}"
+
+        if erros:
+            detalhes = "\n".join(f"  - {model_name}: {erro}" for model_name, erro in erros.items())
+            msg = f"Não foi possível iniciar {len(erros)} de {len(models_params)} modelo(s):\n{detalhes}"
+            LOGGER.error(msg)
+            raise RuntimeError(msg)
+
+        # Mantém a mesma ordem das seções do arquivo 'params.conf'
+        return {model_name: modelos[model_name] for model_name in models_params.keys()}
+
+    @staticmethod
+    def __check_snapshot_params(snapshot_path: str, path: str):
+        """
+        Compara o arquivo 'params.conf' guardado no snapshot com o arquivo 'params.conf' atual e registra um aviso no
+        log caso sejam diferentes.
+            :param snapshot_path: Caminho do snapshot.
+            :param path: Caminho onde se encontra o arquivo 'params.conf' atual.
+        """
+        try:
+            params_snapshot = (Path(snapshot_path) / "params.conf").read_text(encoding='utf-8')
+            params_atual = (Path(path) / "params.conf").read_text(encoding='utf-8')
+        except OSError:
+            return
+
+        if params_snapshot != params_atual:
+            LOGGER.warning(f"O arquivo 'params.conf' atual é diferente do arquivo guardado no snapshot "
+                           f"'{snapshot_path}'. Os modelos que não estão no snapshot serão carregados do provider.")
+
+    @staticmethod
+    def init_models(path: str = "", warmup: bool = True, lazy: bool = False, parallel: bool = False,
+                    max_workers: int = 4, snapshot_path: str = "", reconcile_snapshot: bool = True) -> dict:
+        """
+        Inicia os modelos de ML (Machine Learning) utilizando os parâmetros configurados no arquivo 'params.conf'.
+            :param path: Caminho onde se encontra o arquivo de parâmetros. O padrão é estar na pasta local.
+            :param warmup: Se True, faz o aquecimento dos modelos que possuem o parâmetro 'warmup_iterations' no
+                           arquivo 'params.conf' antes de retorná-los.
+            :param lazy: Se True, os modelos não são instanciados agora. Retorna um 'LazyModels', que importa e
+                         instancia cada modelo somente no primeiro acesso a ele.
+            :param parallel: Se True, instancia os modelos concorrentemente (útil quando cada modelo precisa baixar
+                             artefatos do provider). Em caso de erro, reúne os erros de todos os modelos em uma
+                             única exceção 'RuntimeError'. Ignorado se 'lazy' for True.
+            :param max_workers: Quantidade máxima de modelos instanciados ao mesmo tempo no modo 'parallel'.
+            :param snapshot_path: Caminho de um snapshot gerado pelo 'save_snapshot' (módulo
+                                  'providers_types.mlflow_snapshot'). Se informado, os modelos que estão no snapshot
+                                  são carregados a partir dele, sem acessar o servidor do MLflow.
+            :param reconcile_snapshot: Se True e 'snapshot_path' for informado, compara o snapshot com o registro do
+                                       MLflow em segundo plano e baixa as versões que estiverem desatualizadas.
+            :return: Dicionário contendo como chave os nomes dos modelos e como valor os modelos instanciados.
+        """
+        models_params = get_models_params(path)
+
+        if snapshot_path != "":
+            activate_snapshot(snapshot_path)
+            InitModels.__check_snapshot_params(snapshot_path, path)
+
+        if lazy:
+            modelos = LazyModels(models_params, path=path, warmup=warmup)
+        elif parallel:
+            modelos = InitModels.__init_models_parallel(models_params, path, warmup, max_workers)
+        else:
+            modelos = {}
+
+            for model_name in models_params.keys():
+                cls = InitModels.import_model_class(model_name, models_params[model_name])
+                modelos[model_name] = InitModels.instantiate_model(model_name, models_params[model_name], cls)
+
+            if warmup:
+                for model_name, modelo in modelos.items():
+                    warm_up_model(model_name, modelo, models_params[model_name], path)
+
+        # A reconciliação só começa depois que os modelos foram carregados, para não disputar o snapshot com eles
+        if snapshot_path != "" and reconcile_snapshot:
+            start_background_reconcile()
+
+        MODELS_LOADED.set(len(modelos) if not lazy else 0)
 
         return modelos
+
+
+    @staticmethod
+    def __get_current_params(model) -> dict:
+        """
+        Obtém os parâmetros padrões de um modelo já instanciado, através da classe e dos métodos 'get' dele.
+            :param model: Modelo instanciado.
+            :return: Dicionário com os parâmetros padrões do modelo.
+        """
+        parametros = {'source_file': type(model).__module__.removeprefix("models."),
+                      'model_class': type(model).__name__,
+                      'model_provider_name': model.get_model_provider_name()}
+
+        if parametros['model_class'] == "ModeloRETRAIN":
+            parametros['experiment_name'] = model.get_experiment_name()
+            parametros['dataset_provider_name'] = model.get_dataset_provider_name()
+
+        return parametros
+
+    @staticmethod
+    def reload_models(models: dict, path: str = "", warmup: bool = True) -> dict:
+        """
+        Lê novamente o arquivo 'params.conf' e aplica as diferenças nos modelos já iniciados, sem reiniciar o worker:
+        instancia os modelos novos, instancia novamente os modelos cujos parâmetros mudaram e remove os modelos que
+        saíram do arquivo. Os modelos inalterados continuam carregados. Um modelo alterado só é substituído depois que a
+        nova instância estiver pronta; se ela falhar, a instância antiga continua em uso.
+            :param models: Dicionário retornado pelo 'init_models' (alterado no próprio objeto).
+            :param path: Caminho onde se encontra o arquivo de parâmetros.
+            :param warmup: Se True, faz o aquecimento dos modelos instanciados, caso configurado.
+            :return: Dicionário com as listas de modelos 'added', 'removed', 'reloaded' e 'unchanged' e um dicionário
+                     'errors' com os modelos que não puderam ser instanciados e as respectivas mensagens de erro.
+        """
+        models_params = get_models_params(path)
+
+        if isinstance(models, LazyModels):
+            diferencas = models.update_params(models_params)
+            diferencas['errors'] = {}
+            LOGGER.info(f"Parâmetros dos modelos recarregados (modo 'lazy'): {diferencas}")
+
+            return diferencas
+
+        # Para os modelos já instanciados, compara somente os parâmetros padrões (os opcionais, como os de
+        # aquecimento, não alteram a instância do modelo)
+        parametros_atuais = {}
+
+        for model_name, modelo in models.items():
+            parametros_atuais[model_name] = InitModels.__get_current_params(modelo)
+
+        parametros_novos = {}
+
+        for model_name, params in models_params.items():
+            parametros_novos[model_name] = {p: params[p] for p in parametros_atuais.get(model_name, params).keys()
+                                            if p in params}
+
+        diferencas = diff_models_params(parametros_atuais, parametros_novos)
+        diferencas['errors'] = {}
+
+        for model_name in diferencas['added'] + diferencas['reloaded']:
+            try:
+                models[model_name] = InitModels.init_model(model_name, models_params[model_name], path=path,
+                                                           warmup=warmup)
+            except Exception as e:
+                diferencas['errors'][model_name] = f"{type(e).__name__}: {e}"
+
+        for model_name in diferencas['removed']:
+            del models[model_name]
+            forget_model(model_name)
+
+        MODELS_LOADED.set(len(models))
+
+        if diferencas['errors']:
+            LOGGER.error(f"Não foi possível instanciar os modelos durante o recarregamento do 'params.conf': "
+                         f"{diferencas['errors']}")
+
+        LOGGER.info(f"Modelos recarregados. Adicionados: {diferencas['added']}. Removidos: {diferencas['removed']}. "
+                    f"Alterados: {diferencas['reloaded']}. Inalterados: {len(diferencas['unchanged'])}.")
+
+        return diferencas
+
+
+class LazyModels(Mapping):
+    """
+    Dicionário (somente leitura) de modelos que são importados e instanciados somente no primeiro acesso. Cada modelo
+    é instanciado uma única vez, mesmo com acessos simultâneos de várias threads. Obs.: Percorrer os valores (ex.:
+    'items()' ou 'values()') instancia todos os modelos.
+    """
+    def __init__(self, models_params: dict, path: str = "", warmup: bool = True):
+        """
+        Cria o dicionário de modelos com instanciação tardia.
+            :param models_params: Dicionário com os parâmetros dos modelos (retorno do 'get_models_params').
+            :param path: Caminho onde se encontra o arquivo de parâmetros.
+            :param warmup: Se True, faz o aquecimento de cada modelo configurado para isso ao instanciá-lo.
+        """
+        self.__models_params = models_params
+        self.__path = path
+        self.__warmup = warmup
+        self.__modelos = {}
+        self.__locks = {model_name: threading.Lock() for model_name in models_params.keys()}
+
+    def __getitem__(self, model_name: str):
+        if model_name in self.__modelos:
+            return self.__modelos[model_name]
+
+        if model_name not in self.__locks:
+            raise KeyError(model_name)
+
+        with self.__locks[model_name]:
+            # Outra thread pode ter instanciado o modelo enquanto esta esperava pelo 'lock'
+            if model_name not in self.__modelos:
+                LOGGER.info("Modelo: %s. Instanciando o modelo no primeiro acesso.", model_name,
+                            extra={'model_name': model_name})
+                self.__modelos[model_name] = InitModels.init_model(model_name, self.__models_params[model_name],
+                                                                   path=self.__path, warmup=self.__warmup)
+                MODELS_LOADED.set(len(self.__modelos))
+
+        return self.__modelos[model_name]
+
+    def __iter__(self):
+        return iter(self.__models_params)
+
+    def __len__(self) -> int:
+        return len(self.__models_params)
+
+    def __contains__(self, model_name) -> bool:
+        return model_name in self.__models_params
+
+    def preload(self, models_names: list = None):
+        """
+        Instancia antecipadamente os modelos mais utilizados, para que o primeiro acesso a eles não seja lento.
+            :param models_names: Lista com os nomes dos modelos que serão instanciados. Se não for informada,
+                                 instancia todos os modelos.
+        """
+        if models_names is None:
+            models_names = list(self.__models_params.keys())
+
+        for model_name in models_names:
+            self[model_name]
+
+    def is_loaded(self, model_name: str) -> bool:
+        """
+        Verifica se um modelo já foi instanciado.
+            :param model_name: Nome do modelo.
+            :return: True, se o modelo já foi instanciado. False, caso contrário.
+        """
+        return model_name in self.__modelos
+
+    def get_loaded_models(self) -> dict:
+        """
+        Obtém somente os modelos que já foram instanciados, sem instanciar os demais.
+            :return: Dicionário com os nomes dos modelos como chave e os modelos instanciados como valor.
+        """
+        return dict(self.__modelos)
+
+    def get_models_params(self) -> dict:
+        """
+        Obtém os parâmetros dos modelos utilizados por este dicionário.
+            :return: Dicionário com os parâmetros dos modelos.
+        """
+        return dict(self.__models_params)
+
+    def update_params(self, models_params: dict) -> dict:
+        """
+        Atualiza os parâmetros dos modelos. Os modelos cujos parâmetros não mudaram continuam carregados; os modelos
+        alterados são descartados e serão instanciados novamente no próximo acesso; os modelos removidos são
+        descartados.
+            :param models_params: Dicionário com os novos parâmetros dos modelos (retorno do 'get_models_params').
+            :return: Dicionário com as listas de modelos 'added', 'removed', 'reloaded' e 'unchanged'.
+        """
+        diferencas = diff_models_params(self.__models_params, models_params)
+        descartados = set(diferencas['removed']) | set(diferencas['reloaded'])
+        locks = {model_name: self.__locks.get(model_name, threading.Lock()) for model_name in models_params.keys()}
+        modelos = {model_name: modelo for model_name, modelo in self.__modelos.items()
+                   if model_name not in descartados and model_name in models_params}
+
+        self.__locks = locks
+        self.__models_params = models_params
+        self.__modelos = modelos
+
+        for model_name in descartados:
+            forget_model(model_name)
+        MODELS_LOADED.set(len(modelos))
+
+        return diferencas
@@ -0,0 +1,109 @@
+# ---------------------------------------------------------------------------------------------------------
+# Funções para o aquecimento (warm-up) dos modelos de ML (Machine Learning) na inicialização.
+#
+# A primeira predição após o carregamento do modelo costuma ser bem mais lenta que as demais (imports
+# tardios, alocação de memória, caches dos estimadores, etc.). O aquecimento faz algumas predições antes
+# do worker ficar pronto, para que esse custo não seja pago pela primeira requisição real.
+# ---------------------------------------------------------------------------------------------------------
+import time
+from pathlib import Path
+from statistics import median
+from ..monitors.metrics import MODEL_INIT_SECONDS
+from ..predictors.stream_predict import read_jsonl
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+def get_warmup_dataset(model_name: str, model, model_params: dict, path: str = "") -> list:
+    """
+    Obtém os registros utilizados no aquecimento do modelo. Se o parâmetro 'warmup_file' foi informado no arquivo
+    'params.conf', lê os registros desse arquivo (formato JSON Lines, um registro por linha). Caso contrário, utiliza o
+    método opcional 'get_warmup_dataset' do modelo, que deve retornar uma lista com registros sintéticos.
+        :param model_name: Nome do modelo.
+        :param model: Modelo instanciado.
+        :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+        :param path: Caminho onde se encontra o arquivo de parâmetros. O caminho do 'warmup_file' é relativo a ele.
+        :return: Lista com os registros para o aquecimento.
+    """
+    if 'warmup_file' in model_params:
+        caminho = str(Path(path) / model_params['warmup_file'])
+        dataset = list(read_jsonl(caminho))
+    elif hasattr(model, 'get_warmup_dataset') and callable(model.get_warmup_dataset):
+        dataset = model.get_warmup_dataset()
+    else:
+        msg = f"Modelo: {model_name}. Não foi possível obter os registros para o aquecimento. Informe o parâmetro " \
+              f"'warmup_file' no arquivo 'params.conf' ou implemente o método 'get_warmup_dataset' no modelo."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    if type(dataset) is not list or len(dataset) == 0:
+        msg = f"Modelo: {model_name}. Os registros para o aquecimento devem ser uma lista não vazia."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    return dataset
+
+
+def warm_up_model(model_name: str, model, model_params: dict, path: str = "") -> dict:
+    """
+    Faz o aquecimento de um modelo da classe 'ModeloCLF', realizando a quantidade de predições definida no parâmetro
+    'warmup_iterations' do arquivo 'params.conf', e registra no log a latência da primeira chamada (fria) e a mediana
+    das chamadas seguintes (aquecidas).
+        :param model_name: Nome do modelo.
+        :param model: Modelo instanciado.
+        :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+        :param path: Caminho onde se encontra o arquivo de parâmetros.
+        :return: Dicionário com a quantidade de predições realizadas ('iterations'), a latência da primeira chamada
+                 ('first_call') e a mediana das latências das demais chamadas ('steady_state'), em segundos. O
+                 dicionário fica vazio se o aquecimento não foi configurado para o modelo.
+    """
+    if 'warmup_iterations' not in model_params:
+        return {}
+
+    try:
+        iteracoes = int(model_params['warmup_iterations'])
+    except ValueError:
+        iteracoes = 0
+
+    if iteracoes <= 0:
+        msg = f"Modelo: {model_name}. O parâmetro 'warmup_iterations' do arquivo 'params.conf' deve ser um inteiro " \
+              f"maior que 0 (zero), porém foi informado '{model_params['warmup_iterations']}'."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    if not (hasattr(model, 'predict') and callable(model.predict)):
+        LOGGER.warning(f"Modelo: {model_name}. O aquecimento foi ignorado porque o modelo não possui o método "
+                       f"'predict'.")
+        return {}
+
+    dataset = get_warmup_dataset(model_name, model, model_params, path)
+    latencias = []
+
+    for _ in range(iteracoes):
+        inicio = time.perf_counter()
+        retorno = model.predict(dataset)
+        latencias.append(time.perf_counter() - inicio)
+
+        if type(retorno) is str:
+            msg = f"Modelo: {model_name}. O método 'predict' retornou um erro durante o aquecimento: {retorno}"
+            LOGGER.error(msg)
+            raise RuntimeError(msg)
+
+    MODEL_INIT_SECONDS.observe(sum(latencias), model=model_name, stage="warmup")
+    relatorio = {'iterations': iteracoes, 'first_call': latencias[0],
+                 'steady_state': median(latencias[1:]) if iteracoes > 1 else None}
+
+    campos = {'model_name': model_name, 'duration': sum(latencias), 'iterations': iteracoes,
+              'first_call': relatorio['first_call'], 'steady_state': relatorio['steady_state']}
+
+    if relatorio['steady_state'] is not None:
+        LOGGER.info("Modelo: %s. Aquecimento concluído com %d predição(ões) de %d registro(s). Primeira chamada: "
+                    "%.2f ms. Chamadas seguintes (mediana): %.2f ms.", model_name, iteracoes, len(dataset),
+                    relatorio['first_call'] * 1000, relatorio['steady_state'] * 1000, extra=campos)
+    else:
+        LOGGER.info("Modelo: %s. Aquecimento concluído com 1 predição de %d registro(s). Primeira chamada: %.2f ms.",
+                    model_name, len(dataset), relatorio['first_call'] * 1000, extra=campos)
+
+    return relatorio
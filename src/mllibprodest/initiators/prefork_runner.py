@@ -0,0 +1,257 @@
+# ---------------------------------------------------------------------------------------------------------
+# Execução de workers no modelo 'pre-fork': os modelos são iniciados uma única vez no processo pai e
+# compartilhados (copy-on-write) com os processos filhos criados através do 'fork'.
+#
+# Obs.: Disponível somente em sistemas que suportam o 'os.fork' (Linux, macOS, etc.).
+# ---------------------------------------------------------------------------------------------------------
+import gc
+import os
+import signal
+import time
+from multiprocessing import RawArray
+from .model_initiator import InitModels
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+class PreforkRunner:
+    """
+    Inicia os modelos no processo pai, congela os objetos já criados no coletor de lixo ('gc.freeze'), para evitar que
+    as páginas de memória compartilhadas sejam copiadas quando o coletor percorrer os objetos, e cria N processos
+    filhos que compartilham a memória dos modelos. O processo pai monitora os filhos e recria os que terminarem de
+    forma inesperada ou que pararem de enviar sinais de vida ('heartbeat').
+    """
+    def __init__(self, worker_function, workers: int = 2, path: str = "", init_params: dict = None,
+                 heartbeat_timeout: float = None, max_restarts: int = 10, poll_interval: float = 0.5):
+        """
+        Configura o 'runner'.
+            :param worker_function: Função executada em cada processo filho. Deve receber os parâmetros 'models'
+                                    (dicionário com os modelos iniciados), 'worker_id' (número do filho, de 0 a
+                                    workers - 1) e 'heartbeat' (função sem parâmetros que o filho deve chamar
+                                    periodicamente, se o parâmetro 'heartbeat_timeout' for utilizado). Se a função
+                                    retornar, o filho termina com sucesso e não é recriado.
+            :param workers: Quantidade de processos filhos.
+            :param path: Caminho onde se encontra o arquivo 'params.conf'.
+            :param init_params: Parâmetros adicionais repassados ao 'InitModels.init_models' (ex.: {'parallel': True}).
+            :param heartbeat_timeout: Tempo máximo, em segundos, sem chamadas à função 'heartbeat' para que o filho seja
+                                      considerado travado e seja recriado. Se não for informado, somente o término dos
+                                      processos é monitorado.
+            :param max_restarts: Quantidade máxima de vezes que cada filho pode ser recriado.
+            :param poll_interval: Intervalo, em segundos, entre as verificações dos filhos.
+        """
+        if not hasattr(os, "fork"):
+            msg = "O 'PreforkRunner' não é suportado neste sistema operacional, pois ele não possui o 'os.fork'."
+            LOGGER.error(msg)
+            raise RuntimeError(msg)
+
+        if type(workers) is not int or workers <= 0:
+            msg = f"O parâmetro 'workers' deve ser um inteiro maior que 0 (zero), porém recebeu '{workers}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.__worker_function = worker_function
+        self.__workers = workers
+        self.__path = path
+        self.__init_params = init_params if init_params is not None else {}
+        self.__heartbeat_timeout = heartbeat_timeout
+        self.__max_restarts = max_restarts
+        self.__poll_interval = poll_interval
+        self.__models = None
+        self.__running = False
+        self.__children = {}  # pid -> worker_id
+        self.__restarts = [0] * workers
+        self.__finished = [False] * workers
+        # Memória compartilhada com o instante do último 'heartbeat' de cada filho
+        self.__heartbeats = RawArray('d', workers)
+
+    def __spawn(self, worker_id: int):
+        """
+        Cria um processo filho através do 'fork'.
+            :param worker_id: Número do filho.
+        """
+        self.__heartbeats[worker_id] = time.time()
+        pid = os.fork()
+
+        if pid == 0:
+            # Processo filho
+            codigo_saida = 0
+
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                gc.enable()
+
+                def heartbeat():
+                    self.__heartbeats[worker_id] = time.time()
+
+                self.__worker_function(models=self.__models, worker_id=worker_id, heartbeat=heartbeat)
+            except BaseException as e:
+                LOGGER.error(f"Worker {worker_id} (pid {os.getpid()}) terminou com erro: {type(e).__name__}: {e}")
+                codigo_saida = 1
+            finally:
+                # Termina sem executar as rotinas de finalização herdadas do processo pai
+                os._exit(codigo_saida)
+
+        self.__children[pid] = worker_id
+        LOGGER.info(f"Worker {worker_id} iniciado (pid {pid}).")
+
+    def __handle_exit(self, pid: int, status: int):
+        """
+        Trata o término de um processo filho, recriando-o se necessário.
+            :param pid: Identificador do processo que terminou.
+            :param status: Status de término retornado pelo 'os.waitpid'.
+        """
+        worker_id = self.__children.pop(pid, None)
+
+        if worker_id is None:
+            return
+
+        codigo_saida = os.waitstatus_to_exitcode(status)
+
+        if codigo_saida == 0:
+            LOGGER.info(f"Worker {worker_id} (pid {pid}) terminou com sucesso.")
+            self.__finished[worker_id] = True
+            return
+
+        if not self.__running:
+            return
+
+        if self.__restarts[worker_id] >= self.__max_restarts:
+            LOGGER.error(f"Worker {worker_id} (pid {pid}) terminou com o código {codigo_saida} e atingiu o limite de "
+                         f"{self.__max_restarts} reinício(s). Ele não será recriado.")
+            self.__finished[worker_id] = True
+            return
+
+        self.__restarts[worker_id] += 1
+        LOGGER.warning(f"Worker {worker_id} (pid {pid}) terminou com o código {codigo_saida}. Recriando (reinício "
+                       f"{self.__restarts[worker_id]} de {self.__max_restarts}).")
+        self.__spawn(worker_id)
+
+    def __check_heartbeats(self):
+        """
+        Finaliza os filhos que pararam de enviar sinais de vida. Eles serão recriados ao terem o término detectado.
+        """
+        if self.__heartbeat_timeout is None:
+            return
+
+        agora = time.time()
+
+        for pid, worker_id in list(self.__children.items()):
+            if agora - self.__heartbeats[worker_id] > self.__heartbeat_timeout:
+                LOGGER.warning(f"Worker {worker_id} (pid {pid}) não enviou sinal de vida nos últimos "
+                               f"{self.__heartbeat_timeout} segundo(s). Finalizando o processo.")
+                self.__heartbeats[worker_id] = agora
+
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def __stop_signal(self, signum, frame):
+        """
+        Trata os sinais de término recebidos pelo processo pai.
+        """
+        LOGGER.info(f"Sinal {signal.Signals(signum).name} recebido. Finalizando os workers.")
+        self.__running = False
+
+    def __terminate_children(self, timeout: float = 10.0):
+        """
+        Envia o sinal SIGTERM para os filhos e, se não terminarem dentro do tempo limite, envia o SIGKILL.
+            :param timeout: Tempo, em segundos, para esperar os filhos terminarem.
+        """
+        for pid in list(self.__children.keys()):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        prazo = time.monotonic() + timeout
+
+        while self.__children and time.monotonic() < prazo:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+            if pid == 0:
+                time.sleep(0.05)
+            else:
+                self.__children.pop(pid, None)
+
+        for pid in list(self.__children.keys()):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+        self.__children.clear()
+
+    def stop(self):
+        """
+        Solicita o término do 'runner'. Os filhos serão finalizados pelo laço de monitoramento do método 'run'.
+        """
+        self.__running = False
+
+    def get_status(self) -> dict:
+        """
+        Obtém a situação de cada processo filho.
+            :return: Dicionário com o número de cada filho como chave e outro dicionário como valor, contendo: 'pid'
+                     (None se não estiver rodando), 'restarts', 'finished' e 'last_heartbeat'.
+        """
+        pids = {worker_id: pid for pid, worker_id in self.__children.items()}
+
+        return {worker_id: {'pid': pids.get(worker_id), 'restarts': self.__restarts[worker_id],
+                            'finished': self.__finished[worker_id],
+                            'last_heartbeat': self.__heartbeats[worker_id]}
+                for worker_id in range(self.__workers)}
+
+    def run(self):
+        """
+        Inicia os modelos, cria os processos filhos e fica monitorando-os até que todos terminem ou que o processo pai
+        receba o sinal SIGTERM ou SIGINT.
+        """
+        # Desabilita o coletor durante a iniciação para que os objetos dos modelos não sejam movidos entre as gerações
+        gc.disable()
+
+        try:
+            self.__models = InitModels.init_models(path=self.__path, **self.__init_params)
+        finally:
+            # Move todos os objetos existentes para a geração permanente, que não é percorrida pelo coletor
+            gc.freeze()
+
+        LOGGER.info(f"{len(self.__models)} modelo(s) iniciado(s) no processo pai (pid {os.getpid()}). "
+                    f"{gc.get_freeze_count()} objeto(s) congelado(s). Criando {self.__workers} worker(s).")
+
+        handler_sigterm = signal.signal(signal.SIGTERM, self.__stop_signal)
+        handler_sigint = signal.signal(signal.SIGINT, self.__stop_signal)
+        self.__running = True
+
+        try:
+            for worker_id in range(self.__workers):
+                self.__spawn(worker_id)
+
+            while self.__running and self.__children:
+                while True:
+                    try:
+                        pid, status = os.waitpid(-1, os.WNOHANG)
+                    except ChildProcessError:
+                        pid = 0
+
+                    if pid == 0:
+                        break
+
+                    self.__handle_exit(pid, status)
+
+                self.__check_heartbeats()
+                time.sleep(self.__poll_interval)
+        finally:
+            self.__running = False
+            self.__terminate_children()
+            signal.signal(signal.SIGTERM, handler_sigterm)
+            signal.signal(signal.SIGINT, handler_sigint)
+            gc.unfreeze()
+            gc.enable()
+            LOGGER.info("Todos os workers foram finalizados.")
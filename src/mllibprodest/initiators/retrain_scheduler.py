@@ -0,0 +1,284 @@
+# ---------------------------------------------------------------------------------------------------------
+# Execução paralela dos ciclos de retreinamento (avaliação e retreino) dos modelos da classe
+# 'ModeloRETRAIN', cada modelo num processo separado, com limites de concorrência, de threads e de memória.
+#
+# Obs.: Os processos são criados com o método 'spawn' (padrão), para que os limites de threads das
+# bibliotecas numéricas (BLAS/OpenMP) sejam aplicados antes da importação delas. Por isso, a função do
+# ciclo de retreinamento deve ser definida no nível do módulo e o script principal deve estar protegido por
+# 'if __name__ == "__main__":'.
+# ---------------------------------------------------------------------------------------------------------
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from .model_initiator import InitModels
+from ..utils import get_models_params, LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+# Variáveis de ambiente que limitam a quantidade de threads das bibliotecas numéricas
+VARIAVEIS_THREADS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS",
+                     "VECLIB_MAXIMUM_THREADS")
+
+
+def _run_job(job_function, model_name: str, model_params: dict, path: str, threads: int, memory_limit_mb: float,
+             connection):
+    """
+    Executa o ciclo de retreinamento de um modelo no processo filho e envia o resultado ao processo pai.
+        :param job_function: Função do ciclo de retreinamento.
+        :param model_name: Nome do modelo.
+        :param model_params: Parâmetros do modelo obtidos do arquivo 'params.conf'.
+        :param path: Caminho onde se encontra o arquivo 'params.conf'.
+        :param threads: Quantidade máxima de threads das bibliotecas numéricas.
+        :param memory_limit_mb: Limite de memória (endereçamento virtual) do processo, em MB.
+        :param connection: Conexão para envio do resultado ao processo pai.
+    """
+    limitador = None
+
+    try:
+        if memory_limit_mb is not None:
+            import resource
+
+            limite = int(memory_limit_mb * 2 ** 20)
+            resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+        if threads is not None:
+            # Se o 'threadpoolctl' estiver instalado, também limita as bibliotecas já carregadas
+            try:
+                from threadpoolctl import threadpool_limits
+                limitador = threadpool_limits(limits=threads)
+            except ImportError:
+                pass
+
+        modelo = InitModels.init_model(model_name, model_params, path=path, warmup=False)
+        resultado = ('ok', job_function(model_name=model_name, model=modelo), "")
+    except MemoryError:
+        resultado = ('memory', None, f"O limite de memória de {memory_limit_mb} MB foi ultrapassado.")
+    except BaseException as e:
+        resultado = ('error', None, f"{type(e).__name__}: {e}")
+
+    try:
+        connection.send(resultado)
+    except Exception as e:
+        connection.send(('error', None, f"Não foi possível enviar o retorno do ciclo de retreinamento ao processo "
+                                        f"pai: {type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+    del limitador
+
+
+class RetrainScheduler:
+    """
+    Executa os ciclos de retreinamento de vários modelos concorrentemente, cada um num processo separado, respeitando
+    a quantidade máxima de ciclos simultâneos e a ordem de prioridade dos modelos. Informa a duração e o resultado de
+    cada ciclo.
+    """
+    def __init__(self, job_function, max_concurrent: int = 2, threads_per_job: int = 1,
+                 memory_limit_mb: float = None, timeout: float = None, path: str = "", priorities: dict = None,
+                 start_method: str = "spawn", poll_interval: float = 0.5):
+        """
+        Configura o agendador.
+            :param job_function: Função executada no processo filho para cada modelo. Deve receber os parâmetros
+                                 'model_name' (nome do modelo) e 'model' (modelo instanciado) e pode retornar um valor
+                                 serializável pelo Pickle (ex.: métricas), que será incluído no relatório.
+            :param max_concurrent: Quantidade máxima de ciclos de retreinamento simultâneos.
+            :param threads_per_job: Quantidade máxima de threads das bibliotecas numéricas (BLAS/OpenMP) em cada
+                                    processo. Se for None, não limita.
+            :param memory_limit_mb: Limite de memória de cada processo, em MB (somente em sistemas com o módulo
+                                    'resource'). Se não for informado, não limita.
+            :param timeout: Tempo máximo, em segundos, de cada ciclo. Os processos que ultrapassarem o tempo serão
+                            terminados. Se não for informado, não limita.
+            :param path: Caminho onde se encontra o arquivo 'params.conf'.
+            :param priorities: Dicionário com o nome do modelo como chave e a prioridade como valor. Se não for
+                               informado, utiliza o parâmetro 'retrain_priority' do arquivo 'params.conf'. Os modelos
+                               com os menores valores são executados primeiro; os modelos sem prioridade, por último,
+                               na ordem do arquivo 'params.conf'.
+            :param start_method: Método de criação dos processos ('spawn', 'forkserver' ou 'fork'). Obs.: Com o
+                                 'fork', os limites de threads só valem para as bibliotecas ainda não importadas.
+            :param poll_interval: Intervalo máximo, em segundos, entre as verificações dos processos.
+        """
+        if type(max_concurrent) is not int or max_concurrent <= 0:
+            msg = f"O parâmetro 'max_concurrent' deve ser um inteiro maior que 0 (zero), porém recebeu " \
+                  f"'{max_concurrent}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        if threads_per_job is not None and (type(threads_per_job) is not int or threads_per_job <= 0):
+            msg = f"O parâmetro 'threads_per_job' deve ser um inteiro maior que 0 (zero), porém recebeu " \
+                  f"'{threads_per_job}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.__job_function = job_function
+        self.__max_concurrent = max_concurrent
+        self.__threads_per_job = threads_per_job
+        self.__memory_limit_mb = memory_limit_mb
+        self.__timeout = timeout
+        self.__path = path
+        self.__priorities = priorities
+        self.__context = multiprocessing.get_context(start_method)
+        self.__poll_interval = poll_interval
+
+    def __get_priority(self, model_name: str, model_params: dict):
+        """
+        Obtém a prioridade de um modelo.
+            :param model_name: Nome do modelo.
+            :param model_params: Parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :return: Prioridade do modelo ou None, se não foi informada.
+        """
+        if self.__priorities is not None:
+            prioridade = self.__priorities.get(model_name)
+        else:
+            prioridade = model_params.get('retrain_priority')
+
+        if prioridade is None:
+            return None
+
+        try:
+            return float(prioridade)
+        except ValueError:
+            msg = f"A prioridade do modelo '{model_name}' deve ser um número, porém foi informado '{prioridade}'."
+            LOGGER.error(msg)
+            raise ValueError(msg) from None
+
+    def __start_job(self, model_name: str, model_params: dict) -> dict:
+        """
+        Cria o processo que executará o ciclo de retreinamento de um modelo.
+            :param model_name: Nome do modelo.
+            :param model_params: Parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :return: Dicionário com o processo, a conexão para recebimento do resultado e o instante de início.
+        """
+        receptor, emissor = self.__context.Pipe(duplex=False)
+        processo = self.__context.Process(target=_run_job, name=f"retrain_{model_name}",
+                                          args=(self.__job_function, model_name, model_params, self.__path,
+                                                self.__threads_per_job, self.__memory_limit_mb, emissor))
+
+        # As variáveis de ambiente são herdadas pelo processo filho no momento da criação
+        anteriores = {variavel: os.environ.get(variavel) for variavel in VARIAVEIS_THREADS}
+
+        try:
+            if self.__threads_per_job is not None:
+                for variavel in VARIAVEIS_THREADS:
+                    os.environ[variavel] = str(self.__threads_per_job)
+
+            processo.start()
+        finally:
+            for variavel, valor in anteriores.items():
+                if valor is None:
+                    os.environ.pop(variavel, None)
+                else:
+                    os.environ[variavel] = valor
+
+        # A ponta de envio pertence somente ao filho; fechá-la aqui permite detectar o término dele
+        emissor.close()
+        LOGGER.info("Modelo: %s. Ciclo de retreinamento iniciado (pid %d).", model_name, processo.pid,
+                    extra={'model_name': model_name})
+
+        return {'process': processo, 'connection': receptor, 'start': time.perf_counter(), 'message': None}
+
+    @staticmethod
+    def __finish_job(model_name: str, job: dict, priority, status: str = None, error: str = "") -> dict:
+        """
+        Encerra o acompanhamento de um ciclo de retreinamento e monta o resultado dele.
+            :param model_name: Nome do modelo.
+            :param job: Dicionário retornado pelo método '__start_job'.
+            :param priority: Prioridade do modelo.
+            :param status: Resultado do ciclo, se já conhecido (ex.: 'timeout').
+            :param error: Mensagem de erro, se já conhecida.
+            :return: Dicionário com o resultado do ciclo.
+        """
+        processo = job['process']
+        processo.join()
+        job['connection'].close()
+        duracao = time.perf_counter() - job['start']
+        retorno = None
+
+        if status is None:
+            if job['message'] is not None:
+                status, retorno, error = job['message']
+            else:
+                status = "killed"
+                error = f"O processo terminou sem informar o resultado (código de saída {processo.exitcode})."
+
+        resultado = {'status': status, 'priority': priority, 'duration_s': duracao, 'exit_code': processo.exitcode,
+                     'error': error, 'result': retorno}
+
+        if status == "ok":
+            LOGGER.info("Modelo: %s. Ciclo de retreinamento concluído em %.1f s.", model_name, duracao,
+                        extra={'model_name': model_name, 'duration': duracao, 'status': status})
+        else:
+            LOGGER.error("Modelo: %s. Ciclo de retreinamento terminou com o resultado '%s' após %.1f s: %s",
+                         model_name, status, duracao, error,
+                         extra={'model_name': model_name, 'duration': duracao, 'status': status})
+
+        return resultado
+
+    def run(self, models_names: list = None) -> dict:
+        """
+        Executa os ciclos de retreinamento e aguarda o término de todos eles.
+            :param models_names: Lista com os nomes dos modelos (padrão: todos os modelos da classe 'ModeloRETRAIN' do
+                                 arquivo 'params.conf').
+            :return: Dicionário com o nome de cada modelo como chave, na ordem de início dos ciclos, e, como valor,
+                     um dicionário contendo o resultado ('status': 'ok', 'error', 'memory', 'timeout' ou 'killed'), a
+                     prioridade ('priority'), a duração em segundos ('duration_s'), o código de saída do processo
+                     ('exit_code'), a mensagem de erro ('error') e o retorno da função do ciclo ('result').
+        """
+        models_params = get_models_params(self.__path)
+        nomes = [model_name for model_name, params in models_params.items()
+                 if params['model_class'] == "ModeloRETRAIN"]
+
+        if models_names is not None:
+            nao_encontrados = [model_name for model_name in models_names if model_name not in nomes]
+
+            if nao_encontrados:
+                msg = f"Os modelos {nao_encontrados} não foram encontrados no arquivo 'params.conf' ou não são da " \
+                      f"classe 'ModeloRETRAIN'."
+                LOGGER.error(msg)
+                raise ValueError(msg)
+
+            nomes = list(models_names)
+
+        prioridades = {model_name: self.__get_priority(model_name, models_params[model_name]) for model_name in nomes}
+        # A ordenação do Python é estável: os modelos com a mesma prioridade mantêm a ordem do arquivo 'params.conf'
+        pendentes = deque(sorted(nomes, key=lambda nome: (prioridades[nome] is None, prioridades[nome] or 0)))
+        executando = {}
+        resultados = {}
+
+        try:
+            while pendentes or executando:
+                while pendentes and len(executando) < self.__max_concurrent:
+                    model_name = pendentes.popleft()
+                    executando[model_name] = self.__start_job(model_name, models_params[model_name])
+                    resultados[model_name] = None
+
+                objetos = [job['process'].sentinel for job in executando.values()] + \
+                          [job['connection'] for job in executando.values() if job['message'] is None]
+                wait(objetos, timeout=self.__poll_interval)
+
+                for model_name, job in list(executando.items()):
+                    # O resultado é lido assim que chega, para que o filho não fique bloqueado no envio
+                    if job['message'] is None and job['connection'].poll():
+                        try:
+                            job['message'] = job['connection'].recv()
+                        except (EOFError, OSError):
+                            pass
+
+                    if not job['process'].is_alive():
+                        resultados[model_name] = self.__finish_job(model_name, executando.pop(model_name),
+                                                                   prioridades[model_name])
+                    elif self.__timeout is not None and time.perf_counter() - job['start'] > self.__timeout:
+                        job['process'].terminate()
+                        resultados[model_name] = self.__finish_job(model_name, executando.pop(model_name),
+                                                                   prioridades[model_name], status="timeout",
+                                                                   error=f"O tempo máximo de {self.__timeout} s "
+                                                                         f"foi ultrapassado.")
+        finally:
+            # Em caso de interrupção (ex.: Ctrl+C), não deixa processos órfãos
+            for job in executando.values():
+                job['process'].terminate()
+                job['process'].join()
+
+        return resultados
@@ -228,3 +228,59 @@ class ModelPublicationInterfaceRETRAIN(CommonMethods, metaclass=abc.ABCMeta):
             :param reasons: Dicionário com o(s) motivo(s) para realização do retreinamento e/ou informações adicionais.
         """
         raise NotImplementedError
+
+    def retrain_incremental(self, production_model_name: str, production_params: dict, experiment_name: str,
+                            datasets: dict, partitions: dict, reasons: dict):
+        """
+        (Opcional) Faz o retreinamento incremental do modelo, somente com as partições dos datasets adicionadas depois
+        do treinamento do modelo que está em produção, de forma que o custo do retreino dependa somente dos dados
+        novos. Para isso, o modelo em produção deve ter as partições utilizadas no treinamento persistidas no artefato
+        'TrainingPartitions.pkl' (obtidas com 'load_production_training_partitions') e as partições novas devem ser
+        carregadas com 'load_new_datasets_partitions'. Dica: Para modelos que possuem o método 'partial_fit' (ex.:
+        SGDClassifier do scikit-learn), obtenha o estimador com 'get_partial_fit_estimator' e atualize-o com as
+        partições novas. Ao persistir o modelo retreinado, salve o parâmetro 'partitions' no artefato
+        'TrainingPartitions.pkl' (utilize a função 'convert_artifact_to_pickle').
+            :param production_model_name: Nome do modelo que está em produção.
+            :param production_params: Dicionário com os parâmetros utilizados no treinamento do modelo que está em
+                                      produção.
+            :param experiment_name: Nome do experimento para persistir o modelo retreinado.
+            :param datasets: Dicionário com os tipos de datasets como chave e, como valor, um dicionário com os nomes
+                             das partições novas como chave e as partições carregadas como valor (chave 'datasets' do
+                             retorno do 'load_new_datasets_partitions').
+            :param partitions: Dicionário com os tipos de datasets como chave e a lista de todas as partições (já
+                               utilizadas e novas) como valor (chave 'partitions' do retorno do
+                               'load_new_datasets_partitions').
+            :param reasons: Dicionário com o(s) motivo(s) para realização do retreinamento e/ou informações adicionais.
+        """
+        raise NotImplementedError
+
+    def supports_incremental_retrain(self) -> bool:
+        """
+        Verifica se o modelo implementa o retreinamento incremental (método 'retrain_incremental').
+            :return: True, se o modelo implementa o retreinamento incremental. False, caso contrário.
+        """
+        return type(self).retrain_incremental is not ModelPublicationInterfaceRETRAIN.retrain_incremental
+
+    @staticmethod
+    def get_partial_fit_estimator(model):
+        """
+        Obtém, a partir do modelo carregado pelo 'load_model', o estimador que possui o método 'partial_fit' e pode
+        ser atualizado incrementalmente.
+            :param model: Modelo carregado pelo 'load_model' (ou o próprio estimador).
+            :return: Estimador com o método 'partial_fit' ou None, se o modelo não suportar atualização incremental.
+        """
+        candidatos = [model]
+
+        # Modelos carregados pelo MLflow ('pyfunc') encapsulam o estimador original
+        for metodo in ("get_raw_model", "unwrap_python_model"):
+            if hasattr(model, metodo):
+                try:
+                    candidatos.append(getattr(model, metodo)())
+                except Exception:
+                    continue
+
+        for candidato in candidatos:
+            if callable(getattr(candidato, "partial_fit", None)):
+                return candidato
+
+        return None
@@ -0,0 +1,118 @@
+# ----------------------------------------------------------------------------------------------------
+# Instrumentação dos métodos dos modelos (registro de uso, rastreamento e perfilamento) sem alterar as
+# instâncias.
+#
+# Os métodos são envolvidos uma única vez na classe do modelo e, a cada chamada, consultam os ganchos
+# registrados para a instância. Como nenhuma função é adicionada ao '__dict__' da instância, os modelos
+# continuam podendo ser serializados com o Pickle (ex.: para enviá-los a outros processos). A cópia
+# desserializada não possui ganchos e executa os métodos originais.
+# ----------------------------------------------------------------------------------------------------
+import inspect
+import threading
+import weakref
+from functools import wraps
+
+# Ganchos registrados para cada instância (id da instância: {nome do gancho: gancho})
+_GANCHOS = {}
+_GANCHOS_LOCK = threading.Lock()
+
+
+def _discard_hooks(model_id: int):
+    """
+    Remove os ganchos de uma instância que foi descartada.
+    """
+    with _GANCHOS_LOCK:
+        _GANCHOS.pop(model_id, None)
+
+
+def _make_class_wrapper(method: str, function):
+    """
+    Cria a versão instrumentada de um método da classe do modelo.
+    """
+    @wraps(function)
+    def envolvida(self, *args, **kwargs):
+        ganchos = _GANCHOS.get(id(self))
+
+        if not ganchos:
+            return function(self, *args, **kwargs)
+
+        def chamada(*a, **kw):
+            return function(self, *a, **kw)
+
+        # O primeiro gancho registrado fica mais próximo do método original
+        for gancho in list(ganchos.values()):
+            chamada = _bind_hook(gancho, self, method, chamada)
+
+        return chamada(*args, **kwargs)
+
+    envolvida._mllib_instrumented = True
+
+    return envolvida
+
+
+def _bind_hook(hook, model, method: str, call):
+    """
+    Encadeia um gancho à chamada seguinte.
+    """
+    def chamada(*args, **kwargs):
+        return hook(model, method, call, args, kwargs)
+
+    return chamada
+
+
+def add_model_hook(hook_name: str, model, hook, methods: tuple):
+    """
+    Registra um gancho para os métodos de uma instância de modelo. Registrar novamente um gancho com o mesmo nome
+    substitui o anterior.
+        :param hook_name: Nome do gancho (ex.: 'usage', 'tracing' ou 'profiling').
+        :param model: Modelo instanciado.
+        :param hook: Função 'hook(model, method, call, args, kwargs)' que deve chamar 'call(*args, **kwargs)' e
+                     retornar o resultado.
+        :param methods: Métodos do modelo que serão instrumentados (se existirem na classe do modelo).
+        :return: O próprio modelo.
+    """
+    cls = type(model)
+
+    with _GANCHOS_LOCK:
+        for metodo in methods:
+            funcao = inspect.getattr_static(cls, metodo, None)
+
+            # Somente funções comuns da classe (métodos de instância); o método já pode ter sido envolvido numa
+            # classe base
+            if not inspect.isfunction(funcao) or getattr(funcao, "_mllib_instrumented", False):
+                continue
+
+            setattr(cls, metodo, _make_class_wrapper(metodo, funcao))
+
+        if id(model) not in _GANCHOS:
+            _GANCHOS[id(model)] = {}
+
+            try:
+                weakref.finalize(model, _discard_hooks, id(model))
+            except TypeError:
+                # A classe não aceita referências fracas ('__slots__' sem '__weakref__'); o registro fica na memória
+                pass
+
+        _GANCHOS[id(model)][hook_name] = hook
+
+    return model
+
+
+def remove_model_hook(hook_name: str, model):
+    """
+    Remove um gancho de uma instância de modelo.
+        :param hook_name: Nome do gancho.
+        :param model: Modelo instanciado.
+    """
+    with _GANCHOS_LOCK:
+        _GANCHOS.get(id(model), {}).pop(hook_name, None)
+
+
+def has_model_hook(hook_name: str, model) -> bool:
+    """
+    Verifica se uma instância de modelo possui um gancho registrado.
+        :param hook_name: Nome do gancho.
+        :param model: Modelo instanciado.
+        :return: True, se o gancho está registrado. False, caso contrário.
+    """
+    return hook_name in _GANCHOS.get(id(model), {})
@@ -0,0 +1,374 @@
+# ----------------------------------------------------------------------------------------------------
+# Registro de métricas de desempenho (contadores, medidores e histogramas) dos pontos críticos da lib
+# e servidor HTTP opcional que as expõe no formato texto do Prometheus.
+#
+# Uso: As métricas da lib são registradas automaticamente no registro global 'REGISTRY'. Para expô-las,
+# chame 'start_metrics_server(porta)' na inicialização do worker.
+# ----------------------------------------------------------------------------------------------------
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+# Limites padrões (em segundos) dos intervalos dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(labels: tuple) -> str:
+    """
+    Formata os labels de uma métrica no padrão do Prometheus.
+        :param labels: Tupla de pares (nome, valor) ordenada pelo nome.
+        :return: String no formato '{nome="valor",...}' ou vazia, se não houver labels.
+    """
+    if not labels:
+        return ""
+
+    partes = []
+
+    for nome, valor in labels:
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        partes.append(f'{nome}="{valor}"')
+
+    return "{" + ",".join(partes) + "}"
+
+
+class _Metric:
+    """
+    Base das métricas. Guarda os valores separados pela combinação de labels.
+    """
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def render(self) -> list:
+        """
+        Gera as linhas da métrica no formato texto do Prometheus.
+            :return: Lista de linhas.
+        """
+        with self._lock:
+            valores = dict(self._values)
+
+        linhas = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+        for labels, valor in sorted(valores.items()):
+            linhas.append(f"{self.name}{_format_labels(labels)} {valor}")
+
+        return linhas
+
+    def get(self, **labels) -> float:
+        """
+        Obtém o valor atual da métrica para uma combinação de labels.
+            :param labels: Labels da métrica.
+            :return: Valor atual (0, se a combinação de labels ainda não foi utilizada).
+        """
+        with self._lock:
+            return self._values.get(tuple(sorted(labels.items())), 0)
+
+
+class Counter(_Metric):
+    """
+    Contador: valor que só aumenta (ex.: quantidade de chamadas, bytes transferidos).
+    """
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Incrementa o contador.
+            :param amount: Valor do incremento (não pode ser negativo).
+            :param labels: Labels da métrica.
+        """
+        if amount < 0:
+            msg = f"O contador '{self.name}' não pode ser decrementado."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        chave = tuple(sorted(labels.items()))
+
+        with self._lock:
+            self._values[chave] = self._values.get(chave, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Medidor: valor que pode aumentar ou diminuir (ex.: quantidade de modelos carregados).
+    """
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        """
+        Define o valor do medidor.
+            :param value: Novo valor.
+            :param labels: Labels da métrica.
+        """
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Incrementa (ou decrementa, se negativo) o valor do medidor.
+            :param amount: Valor do incremento.
+            :param labels: Labels da métrica.
+        """
+        chave = tuple(sorted(labels.items()))
+
+        with self._lock:
+            self._values[chave] = self._values.get(chave, 0) + amount
+
+
+class Histogram(_Metric):
+    """
+    Histograma: distribui as observações (ex.: latências) em intervalos acumulados e guarda a soma e a quantidade.
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """
+        Registra uma observação.
+            :param value: Valor observado.
+            :param labels: Labels da métrica.
+        """
+        chave = tuple(sorted(labels.items()))
+
+        with self._lock:
+            estado = self._values.get(chave)
+
+            if estado is None:
+                estado = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._values[chave] = estado
+
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    estado['buckets'][i] += 1
+
+            estado['sum'] += value
+            estado['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Mede o tempo de execução de um bloco 'with' e o registra como uma observação.
+            :param labels: Labels da métrica.
+        """
+        inicio = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def get(self, **labels) -> dict:
+        """
+        Obtém o estado do histograma para uma combinação de labels.
+            :param labels: Labels da métrica.
+            :return: Dicionário com a soma ('sum') e a quantidade ('count') das observações.
+        """
+        with self._lock:
+            estado = self._values.get(tuple(sorted(labels.items())))
+
+        if estado is None:
+            return {'sum': 0.0, 'count': 0}
+
+        return {'sum': estado['sum'], 'count': estado['count']}
+
+    def render(self) -> list:
+        with self._lock:
+            valores = {chave: {'buckets': list(e['buckets']), 'sum': e['sum'], 'count': e['count']}
+                       for chave, e in self._values.items()}
+
+        linhas = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+        for labels, estado in sorted(valores.items()):
+            for limite, quantidade in zip(self.buckets, estado['buckets']):
+                linhas.append(f"{self.name}_bucket{_format_labels(tuple(sorted(labels + (('le', limite),))))} "
+                              f"{quantidade}")
+
+            linhas.append(f"{self.name}_bucket{_format_labels(tuple(sorted(labels + (('le', '+Inf'),))))} "
+                          f"{estado['count']}")
+            linhas.append(f"{self.name}_sum{_format_labels(labels)} {estado['sum']}")
+            linhas.append(f"{self.name}_count{_format_labels(labels)} {estado['count']}")
+
+        return linhas
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas. Obter uma métrica já registrada (pelo nome) retorna a mesma instância.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__metrics = {}
+
+    def __get_or_create(self, cls, name: str, documentation: str, **kwargs):
+        with self.__lock:
+            metrica = self.__metrics.get(name)
+
+            if metrica is None:
+                metrica = cls(name, documentation, **kwargs)
+                self.__metrics[name] = metrica
+            elif type(metrica) is not cls:
+                msg = f"A métrica '{name}' já foi registrada com o tipo '{metrica.type_name}'."
+                LOGGER.error(msg)
+                raise TypeError(msg)
+
+        return metrica
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        """
+        Obtém (ou registra) um contador.
+            :param name: Nome da métrica.
+            :param documentation: Descrição da métrica.
+            :return: Contador.
+        """
+        return self.__get_or_create(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        """
+        Obtém (ou registra) um medidor.
+            :param name: Nome da métrica.
+            :param documentation: Descrição da métrica.
+            :return: Medidor.
+        """
+        return self.__get_or_create(Gauge, name, documentation)
+
+    def histogram(self, name: str, documentation: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Obtém (ou registra) um histograma.
+            :param name: Nome da métrica.
+            :param documentation: Descrição da métrica.
+            :param buckets: Limites superiores dos intervalos do histograma.
+            :return: Histograma.
+        """
+        return self.__get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Gera o texto com todas as métricas no formato do Prometheus.
+            :return: String com as métricas.
+        """
+        with self.__lock:
+            metricas = list(self.__metrics.values())
+
+        linhas = []
+
+        for metrica in sorted(metricas, key=lambda m: m.name):
+            linhas.extend(metrica.render())
+
+        return "\n".join(linhas) + "\n"
+
+
+# Registro global utilizado pela lib
+REGISTRY = MetricsRegistry()
+
+# Métricas dos pontos críticos da lib
+PROVIDER_CALL_SECONDS = REGISTRY.histogram("mllib_provider_call_seconds",
+                                           "Duração das chamadas ao Provider, por operação e provider.")
+PROVIDER_CALL_ERRORS = REGISTRY.counter("mllib_provider_call_errors_total",
+                                        "Quantidade de chamadas ao Provider que terminaram com erro.")
+MLFLOW_STAGE_SECONDS = REGISTRY.histogram("mllib_mlflow_stage_seconds",
+                                          "Duração das etapas do carregamento de modelos no MLflow (resolução do "
+                                          "alias e carregamento do modelo; download dos artefatos).")
+TRANSFERRED_BYTES = REGISTRY.counter("mllib_transferred_bytes_total",
+                                     "Bytes transferidos pelos providers (datasets e artefatos).")
+SNAPSHOT_LOADS = REGISTRY.counter("mllib_snapshot_loads_total",
+                                  "Quantidade de modelos carregados a partir do snapshot local.")
+ARTIFACT_SECONDS = REGISTRY.histogram("mllib_artifact_seconds",
+                                      "Duração da conversão de artefatos (pickle/unpickle).")
+ARTIFACT_BYTES = REGISTRY.counter("mllib_artifact_bytes_total", "Bytes lidos/gravados na conversão de artefatos.")
+MODEL_INIT_SECONDS = REGISTRY.histogram("mllib_model_init_seconds",
+                                        "Duração das etapas da iniciação (import, instantiate e warmup) dos modelos.")
+MODELS_LOADED = REGISTRY.gauge("mllib_models_loaded", "Quantidade de modelos instanciados.")
+PREDICTION_CACHE_REQUESTS = REGISTRY.counter("mllib_prediction_cache_requests_total",
+                                             "Registros consultados no cache de predições, por resultado (hit/miss).")
+EVALUATION_CACHE_REQUESTS = REGISTRY.counter("mllib_evaluation_cache_requests_total",
+                                             "Avaliações consultadas no cache de avaliações, por resultado (hit/miss).")
+MODEL_ARTIFACT_BYTES = REGISTRY.gauge("mllib_model_artifact_bytes",
+                                      "Bytes em disco dos artefatos de cada modelo (ver 'get_models_resources').")
+MODEL_MEMORY_BYTES = REGISTRY.gauge("mllib_model_memory_bytes",
+                                    "Tamanho aproximado em memória de cada modelo (ver 'get_models_resources').")
+
+
+def timed_provider_call(operation: str):
+    """
+    Decorador que registra a duração e os erros das chamadas ao Provider.
+        :param operation: Nome da operação (ex.: 'load_model').
+        :return: Decorador.
+    """
+    def decorador(funcao):
+        # Obtém a posição e o valor padrão do parâmetro 'provider', que pode ser informado por posição ou por nome
+        parametros = inspect.signature(funcao).parameters
+        posicao = list(parametros.keys()).index('provider')
+        provider_padrao = parametros['provider'].default
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            provider = kwargs.get('provider', args[posicao] if len(args) > posicao else provider_padrao)
+            inicio = time.perf_counter()
+
+            try:
+                return funcao(*args, **kwargs)
+            except Exception:
+                PROVIDER_CALL_ERRORS.inc(operation=operation, provider=provider)
+                raise
+            finally:
+                PROVIDER_CALL_SECONDS.observe(time.perf_counter() - inicio, operation=operation, provider=provider)
+
+        return envolvida
+
+    return decorador
+
+
+def start_metrics_server(port: int = 9100, address: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY):
+    """
+    Inicia, em uma thread em segundo plano, um servidor HTTP que expõe as métricas no formato texto do Prometheus nos
+    caminhos '/' e '/metrics'.
+        :param port: Porta do servidor. Utilize 0 (zero) para escolher uma porta livre.
+        :param address: Endereço em que o servidor vai escutar.
+        :param registry: Registro com as métricas que serão expostas.
+        :return: Servidor ('ThreadingHTTPServer') iniciado. Para finalizá-lo, chame o método 'shutdown'.
+    """
+    # Importado somente quando necessário, para não atrasar a importação da lib
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+
+            corpo = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, format, *args):
+            # Não registra cada requisição, para não poluir os logs
+            pass
+
+    try:
+        servidor = ThreadingHTTPServer((address, port), MetricsHandler)
+    except OSError as e:
+        msg = f"Não foi possível iniciar o servidor de métricas no endereço '{address}:{port}': {e}"
+        LOGGER.error(msg)
+        raise RuntimeError(msg) from None
+
+    servidor.daemon_threads = True
+    thread = threading.Thread(target=servidor.serve_forever, name="metrics_server", daemon=True)
+    thread.start()
+    LOGGER.info(f"Servidor de métricas iniciado no endereço '{address}:{servidor.server_address[1]}'.")
+
+    return servidor
@@ -0,0 +1,238 @@
+# ----------------------------------------------------------------------------------------------------
+# Perfilamento (profiling) opcional dos métodos 'predict', 'evaluate' e 'retrain' dos modelos.
+#
+# Uso: Defina a variável de ambiente 'STACK_PROFILE' com o tipo de perfilamento ('cprofile',
+# 'tracemalloc' ou 'both') para que os modelos iniciados pelo 'InitModels' sejam perfilados
+# automaticamente, ou chame 'enable_profiling' passando os modelos já iniciados. Somente uma fração
+# das chamadas é perfilada (ver 'STACK_PROFILE_SAMPLE_RATE') e os resultados são gravados em
+# '<pasta>/<modelo>/<versão>/'.
+# ----------------------------------------------------------------------------------------------------
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from os import environ as env
+from .instrumentation import add_model_hook
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+MODOS_PERFILAMENTO = ("cprofile", "tracemalloc", "both")
+METODOS_PERFILADOS = ("predict", "evaluate", "retrain")
+
+# Somente uma chamada é perfilada por vez (o 'tracemalloc' é global ao processo). As chamadas que chegarem enquanto
+# outra estiver sendo perfilada são executadas normalmente, sem perfilamento.
+_PROFILE_LOCK = threading.Lock()
+# Numeração das chamadas perfiladas, para que os arquivos gerados no mesmo segundo não se sobrescrevam
+_CONTADOR = itertools.count(1)
+
+
+class ModelProfiler:
+    """
+    Perfila uma fração das chamadas aos métodos de um modelo e grava, para cada chamada perfilada, o 'dump' do
+    'cProfile' (arquivo '.prof', que pode ser aberto com o 'pstats' ou o 'snakeviz') e um resumo com as N funções mais
+    custosas e/ou as N linhas que mais alocaram memória.
+    """
+    def __init__(self, mode: str = "cprofile", sample_rate: float = 0.01, output_dir: str = "profiles",
+                 top_n: int = 20, methods: tuple = METODOS_PERFILADOS):
+        """
+        Configura o perfilamento.
+            :param mode: Tipo de perfilamento: 'cprofile' (tempo de CPU por função), 'tracemalloc' (alocações de
+                         memória por linha) ou 'both'.
+            :param sample_rate: Fração das chamadas que serão perfiladas, entre 0.0 e 1.0.
+            :param output_dir: Pasta onde os resultados serão gravados.
+            :param top_n: Quantidade de funções/linhas listadas nos resumos.
+            :param methods: Métodos dos modelos que serão perfilados (se existirem no modelo).
+        """
+        if mode not in MODOS_PERFILAMENTO:
+            msg = f"O tipo de perfilamento '{mode}' é inválido. Os possíveis valores são: {list(MODOS_PERFILAMENTO)}."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        if not 0.0 <= sample_rate <= 1.0:
+            msg = f"A fração de chamadas perfiladas deve estar entre 0.0 e 1.0, porém recebeu '{sample_rate}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.__mode = mode
+        self.__sample_rate = sample_rate
+        self.__output_dir = output_dir
+        self.__top_n = top_n
+        self.__methods = tuple(methods)
+
+    @staticmethod
+    def from_env():
+        """
+        Cria um 'ModelProfiler' a partir das variáveis de ambiente: 'STACK_PROFILE' (tipo de perfilamento),
+        'STACK_PROFILE_SAMPLE_RATE' (padrão: 0.01), 'STACK_PROFILE_DIR' (padrão: 'profiles') e 'STACK_PROFILE_TOP_N'
+        (padrão: 20).
+            :return: 'ModelProfiler' configurado ou None, se a variável 'STACK_PROFILE' não estiver definida.
+        """
+        modo = env.get('STACK_PROFILE', "").lower()
+
+        if modo == "":
+            return None
+
+        try:
+            taxa = float(env.get('STACK_PROFILE_SAMPLE_RATE', "0.01"))
+            top_n = int(env.get('STACK_PROFILE_TOP_N', "20"))
+        except ValueError:
+            msg = "As variáveis de ambiente 'STACK_PROFILE_SAMPLE_RATE' e 'STACK_PROFILE_TOP_N' devem conter, " \
+                  "respectivamente, um número entre 0.0 e 1.0 e um número inteiro."
+            LOGGER.error(msg)
+            raise ValueError(msg) from None
+
+        return ModelProfiler(mode=modo, sample_rate=taxa, output_dir=env.get('STACK_PROFILE_DIR', "profiles"),
+                             top_n=top_n)
+
+    @staticmethod
+    def __get_model_version(model) -> str:
+        """
+        Obtém a versão do modelo para compor o caminho dos resultados.
+            :param model: Modelo instanciado.
+            :return: Versão do modelo ou 'sem_versao', se não for possível obtê-la.
+        """
+        try:
+            versao = model.get_model_version()
+        except Exception:
+            versao = None
+
+        if type(versao) not in (str, int) or str(versao).strip() == "":
+            return "sem_versao"
+
+        return str(versao)
+
+    def __write_results(self, model_name: str, model_version: str, method: str, duration: float,
+                        profiler: cProfile.Profile = None, snapshot: tracemalloc.Snapshot = None, peak: int = 0):
+        """
+        Grava os resultados de uma chamada perfilada.
+            :param model_name: Nome do modelo.
+            :param model_version: Versão do modelo.
+            :param method: Nome do método perfilado.
+            :param duration: Duração da chamada, em segundos.
+            :param profiler: Perfilador do 'cProfile', se utilizado.
+            :param snapshot: 'Snapshot' do 'tracemalloc', se utilizado.
+            :param peak: Pico de memória alocada durante a chamada, em bytes.
+        """
+        pasta = Path(self.__output_dir) / model_name / model_version
+        pasta.mkdir(parents=True, exist_ok=True)
+        prefixo = f"{method}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{next(_CONTADOR)}"
+        resumo = [f"Modelo: {model_name}", f"Versão: {model_version}", f"Método: {method}",
+                  f"Duração: {duration * 1000:.2f} ms", ""]
+
+        if profiler is not None:
+            profiler.dump_stats(str(pasta / f"{prefixo}.prof"))
+            saida = io.StringIO()
+            pstats.Stats(profiler, stream=saida).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.__top_n)
+            resumo.append(f"Top {self.__top_n} funções por tempo acumulado (cProfile):")
+            resumo.append(saida.getvalue())
+
+        if snapshot is not None:
+            resumo.append(f"Pico de memória alocada: {peak / 1024:.1f} KiB")
+            resumo.append(f"Top {self.__top_n} linhas por memória alocada (tracemalloc):")
+
+            for estatistica in snapshot.statistics("lineno")[:self.__top_n]:
+                resumo.append(f"  {estatistica}")
+
+        with open(pasta / f"{prefixo}.txt", "w", encoding="utf-8") as arq:
+            arq.write("\n".join(resumo) + "\n")
+
+    def __profile_call(self, model_name: str, model, method: str, function, args: tuple, kwargs: dict):
+        """
+        Executa uma chamada ao método do modelo sob perfilamento.
+        """
+        usar_cprofile = self.__mode in ("cprofile", "both")
+        usar_tracemalloc = self.__mode in ("tracemalloc", "both")
+        tracemalloc_ja_ativo = tracemalloc.is_tracing()
+        profiler = cProfile.Profile() if usar_cprofile else None
+
+        if usar_tracemalloc:
+            if tracemalloc_ja_ativo:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+
+        inicio = time.perf_counter()
+
+        try:
+            if profiler is not None:
+                retorno = profiler.runcall(function, *args, **kwargs)
+            else:
+                retorno = function(*args, **kwargs)
+        finally:
+            duracao = time.perf_counter() - inicio
+            snapshot = None
+            pico = 0
+
+            if usar_tracemalloc:
+                snapshot = tracemalloc.take_snapshot()
+                pico = tracemalloc.get_traced_memory()[1]
+
+                if not tracemalloc_ja_ativo:
+                    tracemalloc.stop()
+
+        try:
+            self.__write_results(model_name, self.__get_model_version(model), method, duracao, profiler, snapshot,
+                                 pico)
+        except OSError as e:
+            # O perfilamento não pode interromper o funcionamento do modelo
+            LOGGER.warning(f"Modelo: {model_name}. Não foi possível gravar o perfilamento do método '{method}': {e}")
+
+        return retorno
+
+    def wrap_model(self, model_name: str, model):
+        """
+        Perfila uma fração das chamadas aos métodos configurados do modelo. Os métodos são instrumentados na classe do
+        modelo (ver 'monitors.instrumentation'), para que a instância continue podendo ser serializada com o Pickle.
+        Chamar novamente para o mesmo modelo substitui o perfilamento anterior.
+            :param model_name: Nome do modelo.
+            :param model: Modelo instanciado.
+            :return: O próprio modelo.
+        """
+        return add_model_hook("profiling", model, self.__make_hook(model_name), self.__methods)
+
+    def __make_hook(self, model_name: str):
+        """
+        Cria o gancho que perfila uma fração das chamadas aos métodos do modelo.
+        """
+        def gancho(model, method: str, call, args: tuple, kwargs: dict):
+            if random.random() >= self.__sample_rate or not _PROFILE_LOCK.acquire(blocking=False):
+                return call(*args, **kwargs)
+
+            try:
+                return self.__profile_call(model_name, model, method, call, args, kwargs)
+            finally:
+                _PROFILE_LOCK.release()
+
+        return gancho
+
+
+def enable_profiling(models: dict, mode: str = "cprofile", sample_rate: float = 0.01, output_dir: str = "profiles",
+                     top_n: int = 20, methods: tuple = METODOS_PERFILADOS) -> dict:
+    """
+    Habilita o perfilamento dos modelos já iniciados (ex.: retorno do 'InitModels.init_models'). Obs.: Num
+    'LazyModels', todos os modelos serão instanciados; nesse caso, prefira a variável de ambiente 'STACK_PROFILE'.
+        :param models: Dicionário com os nomes dos modelos como chave e os modelos instanciados como valor.
+        :param mode: Tipo de perfilamento: 'cprofile', 'tracemalloc' ou 'both'.
+        :param sample_rate: Fração das chamadas que serão perfiladas, entre 0.0 e 1.0.
+        :param output_dir: Pasta onde os resultados serão gravados.
+        :param top_n: Quantidade de funções/linhas listadas nos resumos.
+        :param methods: Métodos dos modelos que serão perfilados.
+        :return: O próprio dicionário de modelos.
+    """
+    profiler = ModelProfiler(mode=mode, sample_rate=sample_rate, output_dir=output_dir, top_n=top_n, methods=methods)
+
+    for model_name, modelo in models.items():
+        profiler.wrap_model(model_name, modelo)
+
+    LOGGER.info(f"Perfilamento '{mode}' habilitado para {len(models)} modelo(s), com {sample_rate:.1%} das chamadas "
+                f"perfiladas. Resultados em '{output_dir}'.")
+
+    return models
@@ -0,0 +1,198 @@
+# ----------------------------------------------------------------------------------------------------
+# Contabilização dos recursos utilizados por cada modelo: bytes dos artefatos em disco, tamanho
+# aproximado em memória, duração do carregamento e momento do último uso.
+#
+# Uso: Os modelos iniciados pelo 'InitModels' são registrados automaticamente. Chame
+# 'get_models_resources(modelos)' para obter o relatório, por exemplo, para decidir quais modelos
+# descarregar de um worker com vários modelos.
+# ----------------------------------------------------------------------------------------------------
+import logging
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+from .instrumentation import add_model_hook
+from .metrics import MODEL_ARTIFACT_BYTES, MODEL_MEMORY_BYTES
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+METODOS_RASTREADOS = ("predict", "evaluate", "retrain")
+
+# Tipos que não são percorridos no cálculo do tamanho em memória (são compartilhados com o restante do processo)
+_TIPOS_IGNORADOS = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                    types.CodeType, types.FrameType, threading.Thread, logging.Logger, logging.Handler)
+
+# Registro do carregamento e do último uso de cada modelo (nome do modelo: dicionário com os tempos)
+_REGISTROS = {}
+_REGISTROS_LOCK = threading.Lock()
+
+
+def record_model_load(model_name: str, duration: float):
+    """
+    Registra o carregamento de um modelo. Chamado pelo 'InitModels' ao instanciar cada modelo.
+        :param model_name: Nome do modelo.
+        :param duration: Duração da instanciação do modelo (que normalmente inclui o 'load_model'), em segundos.
+    """
+    agora = time.time()
+
+    with _REGISTROS_LOCK:
+        _REGISTROS[model_name] = {'load_seconds': duration, 'loaded_at': agora, 'last_used_at': None}
+
+
+def forget_model(model_name: str):
+    """
+    Remove o registro de um modelo que foi descartado.
+        :param model_name: Nome do modelo.
+    """
+    with _REGISTROS_LOCK:
+        _REGISTROS.pop(model_name, None)
+
+    MODEL_ARTIFACT_BYTES.set(0, model=model_name)
+    MODEL_MEMORY_BYTES.set(0, model=model_name)
+
+
+def track_model_usage(model_name: str, model, methods: tuple = METODOS_RASTREADOS):
+    """
+    Registra o momento do último uso do modelo a cada chamada aos métodos informados. Os métodos são instrumentados na
+    classe do modelo (ver 'monitors.instrumentation'), para que a instância continue podendo ser serializada com o
+    Pickle. Chamar novamente para o mesmo modelo não adiciona um novo rastreamento.
+        :param model_name: Nome do modelo.
+        :param model: Modelo instanciado.
+        :param methods: Métodos que contam como uso do modelo (se existirem no modelo).
+        :return: O próprio modelo.
+    """
+    return add_model_hook("usage", model, _make_usage_hook(model_name), methods)
+
+
+def _make_usage_hook(model_name: str):
+    """
+    Cria o gancho que registra o momento do último uso do modelo.
+    """
+    def gancho(model, method: str, call, args: tuple, kwargs: dict):
+        registro = _REGISTROS.get(model_name)
+
+        # Atribuição simples (atômica no CPython), para não disputar o 'lock' a cada predição
+        if registro is not None:
+            registro['last_used_at'] = time.time()
+
+        return call(*args, **kwargs)
+
+    return gancho
+
+
+def get_directory_size(path: str) -> int:
+    """
+    Obtém o tamanho em disco de uma pasta.
+        :param path: Caminho da pasta.
+        :return: Soma dos tamanhos dos arquivos da pasta e das subpastas, em bytes (0, se a pasta não existir).
+    """
+    tamanho = 0
+
+    for arq in Path(path).rglob("*"):
+        try:
+            if arq.is_file():
+                tamanho += arq.stat().st_size
+        except OSError:
+            # O arquivo pode ter sido removido durante a contagem
+            continue
+
+    return tamanho
+
+
+def approximate_size(obj, max_objects: int = 1000000) -> int:
+    """
+    Calcula o tamanho aproximado em memória de um objeto, percorrendo os objetos referenciados por ele (atributos,
+    itens de listas, dicionários, etc.). Objetos referenciados mais de uma vez são contados uma única vez. Para
+    arrays (ex.: NumPy) é utilizado o atributo 'nbytes'. Obs.: O valor é uma estimativa e o cálculo pode ser lento
+    para modelos grandes.
+        :param obj: Objeto a ser medido.
+        :param max_objects: Quantidade máxima de objetos percorridos (limita o tempo do cálculo).
+        :return: Tamanho aproximado, em bytes.
+    """
+    vistos = set()
+    pendentes = [obj]
+    tamanho = 0
+
+    while pendentes and len(vistos) < max_objects:
+        atual = pendentes.pop()
+
+        if id(atual) in vistos or isinstance(atual, _TIPOS_IGNORADOS):
+            continue
+
+        vistos.add(id(atual))
+
+        try:
+            tamanho += sys.getsizeof(atual)
+        except TypeError:
+            pass
+
+        nbytes = getattr(atual, "nbytes", None)
+
+        if type(nbytes) is int:
+            # Arrays guardam os dados fora do objeto Python, que não são contados pelo 'getsizeof'
+            tamanho += nbytes
+            continue
+
+        if isinstance(atual, (str, bytes, bytearray, int, float, complex, bool)):
+            continue
+
+        if isinstance(atual, dict):
+            pendentes.extend(atual.keys())
+            pendentes.extend(atual.values())
+        elif isinstance(atual, (list, tuple, set, frozenset)):
+            pendentes.extend(atual)
+
+        atributos = getattr(atual, "__dict__", None)
+
+        if isinstance(atributos, dict):
+            pendentes.append(atributos)
+
+        for slot in getattr(type(atual), "__slots__", ()):
+            if isinstance(slot, str) and hasattr(atual, slot):
+                pendentes.append(getattr(atual, slot))
+
+    return tamanho
+
+
+def get_models_resources(models: dict, artifacts_path: str = "temp_area", measure_memory: bool = True) -> dict:
+    """
+    Obtém os recursos utilizados por cada modelo iniciado. Os valores de bytes também são publicados nas métricas
+    'mllib_model_artifact_bytes' e 'mllib_model_memory_bytes'.
+        :param models: Dicionário com os nomes dos modelos como chave e os modelos instanciados como valor (retorno do
+                       'InitModels.init_models'). Num 'LazyModels', somente os modelos já instanciados são medidos.
+        :param artifacts_path: Pasta para onde os artefatos dos modelos são baixados pelo 'load_model'.
+        :param measure_memory: Se False, não calcula o tamanho em memória (que é a parte mais lenta).
+        :return: Dicionário com o nome de cada modelo como chave e, como valor, um dicionário contendo os bytes dos
+                 artefatos em disco ('artifact_bytes'), o tamanho aproximado em memória ('memory_bytes'), a duração do
+                 carregamento em segundos ('load_seconds'), os momentos do carregamento e do último uso
+                 ('loaded_at' e 'last_used_at', em segundos desde a época Unix) e os segundos sem uso
+                 ('idle_seconds').
+    """
+    if hasattr(models, "get_loaded_models"):
+        models = models.get_loaded_models()
+
+    agora = time.time()
+    recursos = {}
+
+    for model_name, modelo in models.items():
+        with _REGISTROS_LOCK:
+            registro = dict(_REGISTROS.get(model_name, {}))
+
+        bytes_artefatos = get_directory_size(str(Path(artifacts_path) / model_name))
+        bytes_memoria = approximate_size(modelo) if measure_memory else None
+        ultimo_uso = registro.get('last_used_at') or registro.get('loaded_at')
+
+        MODEL_ARTIFACT_BYTES.set(bytes_artefatos, model=model_name)
+
+        if bytes_memoria is not None:
+            MODEL_MEMORY_BYTES.set(bytes_memoria, model=model_name)
+
+        recursos[model_name] = {'artifact_bytes': bytes_artefatos, 'memory_bytes': bytes_memoria,
+                                'load_seconds': registro.get('load_seconds'), 'loaded_at': registro.get('loaded_at'),
+                                'last_used_at': registro.get('last_used_at'),
+                                'idle_seconds': agora - ultimo_uso if ultimo_uso is not None else None}
+
+    return recursos
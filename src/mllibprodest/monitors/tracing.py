@@ -0,0 +1,346 @@
+# ----------------------------------------------------------------------------------------------------
+# Rastreamento (tracing) das chamadas ao Provider e dos métodos dos modelos, com spans compatíveis com
+# o OpenTelemetry (identificadores, relação pai/filho e atributos).
+#
+# Uso: Defina a variável de ambiente 'STACK_TRACE_FILE' com o caminho de um arquivo para gravar os spans
+# no formato OTLP-JSON (um 'ExportTraceServiceRequest' por linha, que pode ser importado por ferramentas
+# compatíveis com o OpenTelemetry), ou chame 'set_span_exporter' passando um exportador (ex.:
+# 'InMemorySpanExporter', útil em testes). Nenhum coletor é necessário. Sem exportador, os spans não são
+# criados e o custo é desprezível.
+# ----------------------------------------------------------------------------------------------------
+import contextvars
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from os import environ as env
+from .instrumentation import add_model_hook
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+METODOS_RASTREADOS = ("predict", "evaluate", "retrain", "get_feedback")
+
+# Códigos de status do OpenTelemetry
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Span ativo no contexto atual (cada thread ou tarefa assíncrona possui o seu)
+_SPAN_ATUAL = contextvars.ContextVar("mllib_span_atual", default=None)
+
+
+class Span:
+    """
+    Trecho de execução rastreado, com início, fim, atributos e status.
+    """
+    def __init__(self, name: str, parent=None, attributes: dict = None):
+        """
+        Inicia o span.
+            :param name: Nome do span (ex.: 'Provider.load_model').
+            :param parent: Span pai. Se for None, o span inicia um novo trace.
+            :param attributes: Atributos iniciais do span.
+        """
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent is not None else ""
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = None
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value):
+        """
+        Define um atributo do span.
+            :param key: Nome do atributo (ex.: 'model.name').
+            :param value: Valor do atributo (str, int, float ou bool).
+        """
+        self.attributes[key] = value
+
+    def set_error(self, exception: Exception):
+        """
+        Marca o span com erro.
+            :param exception: Exceção que causou o erro.
+        """
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(exception).__name__}: {exception}"
+
+    @property
+    def duration(self) -> float:
+        """
+        Duração do span em segundos (None, se ainda não terminou).
+        """
+        if self.end_time_ns is None:
+            return None
+
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+
+def _otlp_value(value) -> dict:
+    """
+    Converte o valor de um atributo para o formato 'AnyValue' do OTLP-JSON.
+    """
+    if type(value) is bool:
+        return {'boolValue': value}
+
+    if type(value) is int:
+        return {'intValue': str(value)}
+
+    if type(value) is float:
+        return {'doubleValue': value}
+
+    return {'stringValue': str(value)}
+
+
+def spans_to_otlp(spans: list, service_name: str = "mllibprodest") -> dict:
+    """
+    Converte uma lista de spans para o formato OTLP-JSON ('ExportTraceServiceRequest').
+        :param spans: Lista de spans terminados.
+        :param service_name: Nome do serviço que gerou os spans.
+        :return: Dicionário no formato OTLP-JSON.
+    """
+    spans_otlp = []
+
+    for span in spans:
+        spans_otlp.append({
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'parentSpanId': span.parent_span_id,
+            'name': span.name,
+            'kind': 1,
+            'startTimeUnixNano': str(span.start_time_ns),
+            'endTimeUnixNano': str(span.end_time_ns),
+            'attributes': [{'key': chave, 'value': _otlp_value(valor)} for chave, valor in span.attributes.items()],
+            'status': {'code': span.status_code, 'message': span.status_message}
+        })
+
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]},
+        'scopeSpans': [{'scope': {'name': "mllibprodest"}, 'spans': spans_otlp}]
+    }]}
+
+
+class InMemorySpanExporter:
+    """
+    Exportador que guarda os spans terminados na memória. Útil em testes e para inspeção no próprio processo.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__spans = []
+
+    def export(self, span: Span):
+        """
+        Recebe um span terminado.
+            :param span: Span terminado.
+        """
+        with self.__lock:
+            self.__spans.append(span)
+
+    def get_finished_spans(self) -> list:
+        """
+        Obtém os spans recebidos até o momento.
+            :return: Lista de spans, na ordem em que terminaram.
+        """
+        with self.__lock:
+            return list(self.__spans)
+
+    def clear(self):
+        """
+        Descarta os spans recebidos.
+        """
+        with self.__lock:
+            self.__spans.clear()
+
+
+class OTLPJsonFileExporter:
+    """
+    Exportador que grava cada span terminado, no formato OTLP-JSON, numa linha do arquivo informado.
+    """
+    def __init__(self, file_path: str, service_name: str = "mllibprodest"):
+        """
+        Configura o exportador.
+            :param file_path: Caminho do arquivo onde os spans serão gravados (os spans são adicionados ao final).
+            :param service_name: Nome do serviço que gerou os spans (atributo 'service.name').
+        """
+        self.__file_path = file_path
+        self.__service_name = service_name
+        self.__lock = threading.Lock()
+
+    def export(self, span: Span):
+        """
+        Grava um span terminado no arquivo.
+            :param span: Span terminado.
+        """
+        linha = json.dumps(spans_to_otlp([span], self.__service_name), ensure_ascii=False)
+
+        try:
+            with self.__lock, open(self.__file_path, "a", encoding="utf-8") as arq:
+                arq.write(linha + "\n")
+        except OSError as e:
+            # O rastreamento não pode interromper o funcionamento do modelo
+            LOGGER.warning(f"Não foi possível gravar o span '{span.name}' no arquivo '{self.__file_path}': {e}")
+
+
+# Exportador utilizado pela lib. Se a variável 'STACK_TRACE_FILE' estiver definida, grava os spans nesse arquivo.
+_EXPORTADOR = OTLPJsonFileExporter(env['STACK_TRACE_FILE']) if env.get('STACK_TRACE_FILE', "") != "" else None
+
+
+def set_span_exporter(exporter):
+    """
+    Define o exportador dos spans. Os modelos instanciados antes desta chamada não terão os métodos rastreados.
+        :param exporter: Objeto com o método 'export(span)' (ex.: 'InMemorySpanExporter' ou 'OTLPJsonFileExporter').
+                         Se for None, desabilita o rastreamento.
+    """
+    global _EXPORTADOR
+    _EXPORTADOR = exporter
+
+
+def is_tracing_enabled() -> bool:
+    """
+    Verifica se o rastreamento está habilitado (se há um exportador definido).
+        :return: True, se o rastreamento está habilitado. False, caso contrário.
+    """
+    return _EXPORTADOR is not None
+
+
+def get_current_span():
+    """
+    Obtém o span ativo no contexto atual.
+        :return: Span ativo ou None, se não houver.
+    """
+    return _SPAN_ATUAL.get()
+
+
+def set_span_attribute(key: str, value):
+    """
+    Define um atributo do span ativo, se houver (ex.: quantidade de bytes transferidos, conhecida só no final).
+        :param key: Nome do atributo.
+        :param value: Valor do atributo.
+    """
+    span = _SPAN_ATUAL.get()
+
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """
+    Cria um span para um bloco 'with', filho do span ativo no contexto atual. Os pontos nos nomes dos atributos podem
+    ser informados como '__' (ex.: model__name='x' vira 'model.name').
+        :param name: Nome do span.
+        :param attributes: Atributos do span.
+        :return: O span criado ou None, se o rastreamento estiver desabilitado.
+    """
+    exportador = _EXPORTADOR
+
+    if exportador is None:
+        yield None
+        return
+
+    span = Span(name, parent=_SPAN_ATUAL.get(),
+                attributes={chave.replace("__", "."): valor for chave, valor in attributes.items()})
+    token = _SPAN_ATUAL.set(span)
+
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    else:
+        if span.status_code == STATUS_UNSET:
+            span.status_code = STATUS_OK
+    finally:
+        span.end_time_ns = time.time_ns()
+        _SPAN_ATUAL.reset(token)
+        exportador.export(span)
+
+
+def traced_provider_call(operation: str):
+    """
+    Decorador que cria um span para as chamadas ao Provider, com o provider e o modelo (se houver) como atributos.
+        :param operation: Nome da operação (ex.: 'load_model').
+        :return: Decorador.
+    """
+    def decorador(funcao):
+        # Obtém as posições e os valores padrões dos parâmetros 'provider' e 'model_name', se existirem
+        parametros = inspect.signature(funcao).parameters
+        nomes = list(parametros.keys())
+        posicoes = {nome: nomes.index(nome) for nome in ('provider', 'model_name') if nome in parametros}
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if _EXPORTADOR is None:
+                return funcao(*args, **kwargs)
+
+            atributos = {}
+
+            for nome, posicao in posicoes.items():
+                valor = kwargs.get(nome, args[posicao] if len(args) > posicao else parametros[nome].default)
+                atributos['model.name' if nome == 'model_name' else nome] = valor
+
+            # Os atributos são passados na criação do span, pois o rastreamento pode ter sido desabilitado por outra
+            # thread depois da verificação acima (e nesse caso o 'start_span' não cria o span)
+            with start_span(f"Provider.{operation}", **atributos):
+                return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
+
+
+def _model_version(model) -> str:
+    """
+    Obtém a versão do modelo para os atributos dos spans.
+    """
+    try:
+        return str(model.get_model_version())
+    except Exception:
+        return ""
+
+
+def trace_model(model_name: str, model, methods: tuple = METODOS_RASTREADOS):
+    """
+    Cria um span a cada chamada aos métodos informados do modelo. Os métodos são instrumentados na classe do modelo
+    (ver 'monitors.instrumentation'), para que a instância continue podendo ser serializada com o Pickle. Chamar
+    novamente para o mesmo modelo não adiciona um novo rastreamento.
+        :param model_name: Nome do modelo.
+        :param model: Modelo instanciado.
+        :param methods: Métodos que serão rastreados (se existirem no modelo).
+        :return: O próprio modelo.
+    """
+    return add_model_hook("tracing", model, _make_trace_hook(model_name), methods)
+
+
+def _make_trace_hook(model_name: str):
+    """
+    Cria o gancho que rastreia as chamadas aos métodos do modelo.
+    """
+    def gancho(model, method: str, call, args: tuple, kwargs: dict):
+        if _EXPORTADOR is None:
+            return call(*args, **kwargs)
+
+        with start_span(f"{type(model).__name__}.{method}", model__name=model_name) as span:
+            retorno = call(*args, **kwargs)
+
+            # O rastreamento pode ter sido desabilitado por outra thread depois da verificação acima
+            if span is None:
+                return retorno
+
+            # A versão é obtida depois da chamada, pois o 'retrain' pode alterá-la
+            span.set_attribute('model.version', _model_version(model))
+
+            # Os métodos do 'ModeloCLF' informam os erros no retorno, em vez de lançar exceções
+            if type(retorno) is str and method == "predict":
+                span.status_code = STATUS_ERROR
+                span.status_message = retorno
+
+            return retorno
+
+    return gancho
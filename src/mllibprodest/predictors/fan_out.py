@@ -0,0 +1,286 @@
+# ----------------------------------------------------------------------------------------------------
+# Execução concorrente do método 'predict' em vários modelos instanciados através do
+# 'InitModels.init_models' (fan-out).
+#
+# Uso: Crie um 'FanOutPredictor' uma única vez (ex.: na inicialização do worker) e reutilize-o em
+# todas as requisições, para que os 'pools' de threads/processos não sejam recriados a cada chamada.
+# ----------------------------------------------------------------------------------------------------
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+# Modelo carregado em cada processo filho dos 'pools' de processos
+_PROCESS_MODEL = None
+
+
+def _init_process_model(model):
+    """
+    Guarda o modelo no processo filho, para que ele não precise ser serializado a cada predição.
+        :param model: Modelo que será utilizado pelo processo filho.
+    """
+    global _PROCESS_MODEL
+    _PROCESS_MODEL = model
+
+
+def _predict_in_process(dataset: list):
+    """
+    Faz a predição no processo filho utilizando o modelo guardado na inicialização do processo.
+        :param dataset: Lista com os dados utilizados como features para realizar a predição.
+        :return: Retorno do método 'predict' do modelo.
+    """
+    return _PROCESS_MODEL.predict(dataset)
+
+
+def _set_future_result(future: Future, result):
+    """
+    Repassa o resultado de uma predição feita num processo para o 'Future' correspondente.
+    """
+    try:
+        future.set_result(result)
+    except InvalidStateError:
+        # O 'Future' já foi cancelado ou finalizado (ex.: o processo foi reiniciado após exceder o tempo limite)
+        pass
+
+
+def _set_future_exception(future: Future, exception: BaseException):
+    """
+    Repassa o erro de uma predição feita num processo para o 'Future' correspondente.
+    """
+    try:
+        future.set_exception(exception)
+    except InvalidStateError:
+        pass
+
+
+class _ModelProcess:
+    """
+    Processo dedicado a um modelo. O processo pode ser finalizado e recriado quando uma predição excede o tempo limite,
+    para que as próximas predições do modelo não fiquem na fila atrás dela.
+    """
+    def __init__(self, model_name: str, model, context):
+        self.__model_name = model_name
+        self.__model = model
+        self.__context = context
+        self.__lock = threading.Lock()
+        self.__pendentes = set()
+        self.__pool = self.__create_pool()
+
+    def __create_pool(self):
+        return self.__context.Pool(processes=1, initializer=_init_process_model, initargs=(self.__model,))
+
+    def submit(self, dataset: list) -> Future:
+        """
+        Envia uma predição para o processo.
+            :param dataset: Lista com os dados utilizados como features para realizar a predição.
+            :return: 'Future' com o resultado da predição.
+        """
+        futuro = Future()
+
+        with self.__lock:
+            self.__pendentes.add(futuro)
+            self.__pool.apply_async(_predict_in_process, (dataset,),
+                                    callback=lambda retorno: _set_future_result(futuro, retorno),
+                                    error_callback=lambda erro: _set_future_exception(futuro, erro))
+
+        futuro.add_done_callback(self.__pendentes.discard)
+
+        return futuro
+
+    def restart(self):
+        """
+        Finaliza o processo (interrompendo a predição em andamento) e cria um novo. As predições que estavam na fila
+        do processo finalizado terminam com erro.
+        """
+        with self.__lock:
+            pool_antigo = self.__pool
+            pendentes = list(self.__pendentes)
+            self.__pool = self.__create_pool()
+
+        pool_antigo.terminate()
+
+        for futuro in pendentes:
+            _set_future_exception(futuro, RuntimeError(f"O processo do modelo '{self.__model_name}' foi reiniciado "
+                                                       f"porque uma predição excedeu o tempo limite."))
+
+        LOGGER.warning(f"Modelo: {self.__model_name}. O processo do modelo foi reiniciado.")
+
+    def shutdown(self, wait_running: bool = True):
+        """
+        Finaliza o processo.
+            :param wait_running: Se True, espera as predições em andamento terminarem.
+        """
+        with self.__lock:
+            if wait_running:
+                self.__pool.close()
+                self.__pool.join()
+            else:
+                self.__pool.terminate()
+
+
+class FanOutPredictor:
+    """
+    Executa o método 'predict' de vários modelos de forma concorrente, com tempo limite por modelo e retorno de
+    resultados parciais. Cada modelo pode ser executado em uma thread (padrão, adequado quando a predição libera o
+    GIL, como no numpy/scikit-learn, ou faz I/O) ou em um processo dedicado (adequado para predições que consomem
+    muita CPU em código Python puro; o modelo precisa ser serializável com o Pickle). Quando uma predição num processo
+    excede o tempo limite, o processo é finalizado e recriado. Uma predição numa thread não pode ser interrompida: ela
+    termina em segundo plano e o resultado é descartado.
+    """
+    def __init__(self, models: dict, executor_types: dict = None, timeouts: dict = None,
+                 default_timeout: float = None, max_threads: int = None, mp_context=None):
+        """
+        Cria os 'pools' utilizados para executar as predições.
+            :param models: Dicionário com os nomes dos modelos como chave e os modelos instanciados como valor (ex.:
+                           retorno do 'InitModels.init_models').
+            :param executor_types: Dicionário com o nome do modelo como chave e o tipo de execução como valor:
+                                   'thread' ou 'process'. Os modelos não informados utilizam 'thread'.
+            :param timeouts: Dicionário com o nome do modelo como chave e o tempo limite, em segundos, como valor.
+            :param default_timeout: Tempo limite, em segundos, para os modelos que não estão no dicionário 'timeouts'.
+                                    Se não for informado, espera a predição terminar.
+            :param max_threads: Quantidade máxima de threads. O padrão é o dobro da quantidade de modelos executados
+                                em thread (no mínimo 4), para que as predições que excederam o tempo limite e ainda
+                                estão terminando em segundo plano não atrasem as próximas.
+            :param mp_context: Método de início dos processos ('fork', 'spawn' ou 'forkserver') ou um contexto do
+                               'multiprocessing'. Se não for informado, utiliza o padrão da plataforma. Com 'spawn' ou
+                               'forkserver', os modelos são enviados aos processos através do Pickle.
+        """
+        self.__models = models
+        self.__executor_types = executor_types if executor_types is not None else {}
+        self.__timeouts = timeouts if timeouts is not None else {}
+        self.__default_timeout = default_timeout
+        self.__process_pools = {}
+
+        for model_name, tipo in self.__executor_types.items():
+            if model_name not in models:
+                msg = f"O modelo '{model_name}' informado no parâmetro 'executor_types' não foi encontrado entre os " \
+                      f"modelos instanciados."
+                LOGGER.error(msg)
+                raise KeyError(msg)
+
+            if tipo not in ("thread", "process"):
+                msg = f"Modelo: {model_name}. O tipo de execução '{tipo}' está incorreto. Os possíveis valores são: " \
+                      f"'thread' ou 'process'."
+                LOGGER.error(msg)
+                raise ValueError(msg)
+
+        if isinstance(mp_context, str) or mp_context is None:
+            try:
+                mp_context = multiprocessing.get_context(mp_context)
+            except ValueError:
+                msg = f"O método de início dos processos '{mp_context}' está incorreto. Os possíveis valores são: " \
+                      f"{multiprocessing.get_all_start_methods()}."
+                LOGGER.error(msg)
+                raise ValueError(msg) from None
+
+        for model_name, tipo in self.__executor_types.items():
+            if tipo == "process":
+                self.__process_pools[model_name] = _ModelProcess(model_name, models[model_name], mp_context)
+
+        qtd_threads = len(models) - len(self.__process_pools)
+        self.__thread_pool = ThreadPoolExecutor(max_workers=max_threads if max_threads else max(2 * qtd_threads, 4),
+                                                thread_name_prefix="fan_out_predict")
+
+    def predict(self, dataset: list, models_names: list = None) -> dict:
+        """
+        Faz a predição do dataset em cada um dos modelos escolhidos, de forma concorrente. O tempo total é limitado pelo
+        modelo mais lento (ou pelo maior tempo limite) e não pela soma dos tempos de todos os modelos.
+            :param dataset: Lista com os dados utilizados como features para realizar a predição.
+            :param models_names: Lista com os nomes dos modelos que farão a predição. Se não for informada, utiliza
+                                 todos os modelos.
+            :return: Dicionário com o nome de cada modelo como chave e outro dicionário como valor, contendo: 'status'
+                     ('ok', 'error' ou 'timeout'), 'result' (retorno do 'predict' ou None), 'error' (mensagem de erro
+                     ou None) e 'duration' (tempo decorrido, em segundos).
+        """
+        if models_names is None:
+            models_names = list(self.__models.keys())
+
+        nao_encontrados = [nome for nome in models_names if nome not in self.__models]
+
+        if nao_encontrados:
+            msg = f"Os seguintes modelos não foram encontrados entre os modelos instanciados: {nao_encontrados}."
+            LOGGER.error(msg)
+            raise KeyError(msg)
+
+        inicio = time.monotonic()
+        futuros = {}
+        prazos = {}
+
+        for model_name in models_names:
+            if model_name in self.__process_pools:
+                futuro = self.__process_pools[model_name].submit(dataset)
+            else:
+                futuro = self.__thread_pool.submit(self.__models[model_name].predict, dataset)
+
+            futuros[futuro] = model_name
+            tempo_limite = self.__timeouts.get(model_name, self.__default_timeout)
+            prazos[futuro] = inicio + tempo_limite if tempo_limite is not None else None
+
+        resultados = {}
+        pendentes = set(futuros.keys())
+
+        while pendentes:
+            prazos_pendentes = [prazos[f] for f in pendentes if prazos[f] is not None]
+            espera = max(min(prazos_pendentes) - time.monotonic(), 0) if prazos_pendentes else None
+            concluidos, pendentes = wait(pendentes, timeout=espera, return_when=FIRST_COMPLETED)
+
+            for futuro in concluidos:
+                model_name = futuros[futuro]
+                duracao = time.monotonic() - inicio
+
+                try:
+                    retorno = futuro.result()
+                except Exception as e:
+                    msg = f"Modelo: {model_name}. A predição falhou: {type(e).__name__}: {e}"
+                    LOGGER.error(msg)
+                    resultados[model_name] = {'status': 'error', 'result': None, 'error': msg, 'duration': duracao}
+                    continue
+
+                if type(retorno) is str:
+                    resultados[model_name] = {'status': 'error', 'result': None, 'error': retorno,
+                                              'duration': duracao}
+                else:
+                    resultados[model_name] = {'status': 'ok', 'result': retorno, 'error': None, 'duration': duracao}
+
+            agora = time.monotonic()
+
+            for futuro in list(pendentes):
+                if prazos[futuro] is not None and prazos[futuro] <= agora:
+                    model_name = futuros[futuro]
+                    pendentes.discard(futuro)
+
+                    if model_name in self.__process_pools:
+                        # Interrompe a predição, para que as próximas predições do modelo não fiquem na fila atrás dela
+                        self.__process_pools[model_name].restart()
+                    else:
+                        # Se a predição ainda não começou, é cancelada. Caso contrário, termina em segundo plano e o
+                        # resultado é descartado.
+                        futuro.cancel()
+
+                    msg = f"Modelo: {model_name}. A predição excedeu o tempo limite de " \
+                          f"{prazos[futuro] - inicio:.3f} segundo(s)."
+                    LOGGER.warning(msg)
+                    resultados[model_name] = {'status': 'timeout', 'result': None, 'error': msg,
+                                              'duration': agora - inicio}
+
+        return {model_name: resultados[model_name] for model_name in models_names}
+
+    def shutdown(self, wait_running: bool = True):
+        """
+        Finaliza os 'pools' de threads e processos.
+            :param wait_running: Se True, espera as predições em andamento terminarem.
+        """
+        self.__thread_pool.shutdown(wait=wait_running, cancel_futures=True)
+
+        for processo in self.__process_pools.values():
+            processo.shutdown(wait_running=wait_running)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
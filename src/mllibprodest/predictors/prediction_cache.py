@@ -0,0 +1,218 @@
+# ----------------------------------------------------------------------------------------------------
+# Cache para os resultados das predições dos modelos publicados através da interface
+# ModelPublicationInterfaceCLF.
+#
+# Uso: Envolva um modelo já instanciado (ex.: obtido através do 'InitModels.init_models') com a
+# classe 'PredictionCache' e chame o método 'predict' do cache no lugar do método do modelo.
+# ----------------------------------------------------------------------------------------------------
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from ..monitors.metrics import PREDICTION_CACHE_REQUESTS
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+# Tipos escalares representados diretamente no JSON (o tipo é preservado: 1, 1.0, True, '1' e None são distintos)
+_TIPOS_ESCALARES = (str, int, float, bool, type(None))
+
+
+def _tag_record(record):
+    """
+    Converte um registro para uma estrutura JSON que preserva os tipos. Cada contêiner vira uma lista cujo primeiro
+    elemento identifica o tipo ('l' para list, 't' para tuple e 'd' para dict), de forma que, por exemplo, (1, 2) e
+    [1, 2] ou {1: 'a'} e {'1': 'a'} geram chaves diferentes. Os itens dos dicionários são ordenados pela chave.
+        :param record: Registro (features) que será enviado para a predição.
+        :return: Estrutura equivalente contendo somente listas e tipos escalares.
+    """
+    tipo = type(record)
+
+    if tipo in _TIPOS_ESCALARES:
+        return record
+
+    if tipo is list:
+        return ["l"] + [_tag_record(item) for item in record]
+
+    if tipo is tuple:
+        return ["t"] + [_tag_record(item) for item in record]
+
+    if tipo is dict:
+        itens = [[_tag_record(chave), _tag_record(valor)] for chave, valor in record.items()]
+        itens.sort(key=lambda item: json.dumps(item[0], ensure_ascii=False))
+        return ["d"] + itens
+
+    # Outros tipos (ex.: arrays, sets e objetos) são serializados com o Pickle
+    raise TypeError(f"Tipo não suportado na serialização JSON: '{tipo.__name__}'.")
+
+
+def make_record_key(record) -> str:
+    """
+    Gera uma chave estável para um registro que será predito. Tenta serializar o registro em JSON, preservando os
+    tipos (ver '_tag_record'), e, caso contenha outros tipos, utiliza o Pickle.
+        :param record: Registro (features) que será enviado para a predição.
+        :return: String contendo o hash (sha256) do registro.
+    """
+    try:
+        dados = b"j" + json.dumps(_tag_record(record), ensure_ascii=False, separators=(',', ':')).encode()
+    except (TypeError, ValueError, RecursionError):
+        try:
+            dados = b"p" + pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            msg = f"Não foi possível gerar a chave do cache para o registro. O registro não pode ser serializado " \
+                  f"em JSON nem com o Pickle (mensagem Pickle: {e})."
+            LOGGER.error(msg)
+            raise TypeError(msg) from None
+
+    return hashlib.sha256(dados).hexdigest()
+
+
+class PredictionCache:
+    """
+    Cache com tamanho limitado, tempo de expiração (TTL) e descarte dos registros menos utilizados (LRU) para os
+    resultados do método 'predict' de um modelo que implementa a interface ModelPublicationInterfaceCLF. Somente os
+    registros que não estiverem no cache são enviados para o modelo. O cache é invalidado automaticamente quando a
+    versão do modelo (obtida através do método 'get_model_version') é alterada.
+    """
+    def __init__(self, model, max_size: int = 10000, ttl: float = 3600.0):
+        """
+        Cria o cache para as predições do modelo.
+            :param model: Modelo instanciado que implementa a interface ModelPublicationInterfaceCLF.
+            :param max_size: Quantidade máxima de registros guardados no cache.
+            :param ttl: Tempo, em segundos, que um resultado permanece válido no cache. Utilize 0 (zero) para que os
+                        resultados não expirem.
+        """
+        if not (hasattr(model, 'predict') and callable(model.predict) and hasattr(model, 'get_model_version') and
+                callable(model.get_model_version)):
+            msg = f"Não foi possível criar o cache de predições. O modelo informado ('{type(model).__name__}') não " \
+                  f"possui os métodos 'predict' e 'get_model_version'."
+            LOGGER.error(msg)
+            raise TypeError(msg)
+
+        if type(max_size) is not int or max_size <= 0:
+            msg = f"O parâmetro 'max_size' deve ser um inteiro maior que 0 (zero), porém recebeu '{max_size}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        if ttl < 0:
+            msg = f"O parâmetro 'ttl' não pode ser negativo, porém recebeu '{ttl}'."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        self.__model = model
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()  # chave -> (instante de expiração, resultado)
+        self.__model_version = None
+        self.__hits = 0
+        self.__misses = 0
+        self.__invalidations = 0
+
+    def __check_version(self, model_version: str):
+        """
+        Invalida o cache caso a versão do modelo tenha sido alterada. Deve ser chamada com o 'lock' adquirido.
+            :param model_version: Versão atual do modelo.
+        """
+        if model_version != self.__model_version:
+            if self.__model_version is not None:
+                LOGGER.info(f"A versão do modelo foi alterada de '{self.__model_version}' para '{model_version}'. "
+                            f"O cache de predições foi invalidado.")
+                self.__invalidations += 1
+
+            self.__entries.clear()
+            self.__model_version = model_version
+
+    def predict(self, dataset: list) -> list | str:
+        """
+        Faz predições utilizando o cache. Os registros que não estiverem no cache (ou estiverem expirados) são enviados
+        em uma única chamada ao método 'predict' do modelo e os resultados obtidos são guardados no cache.
+            :param dataset: Lista com os dados utilizados como features para realizar a predição.
+            :return: Lista com os labels preditos, na mesma ordem dos registros recebidos. Em caso de erro retornado
+                     pelo modelo, repassa a 'string' com a mensagem de erro.
+        """
+        versao_modelo = self.__model.get_model_version()
+        chaves = [make_record_key(registro) for registro in dataset]
+        resultados = [None] * len(dataset)
+        posicoes_faltantes = {}  # chave -> posições no dataset que possuem o mesmo registro
+        agora = time.monotonic()
+
+        with self.__lock:
+            self.__check_version(versao_modelo)
+
+            for posicao, chave in enumerate(chaves):
+                entrada = self.__entries.get(chave)
+
+                if entrada is not None and (self.__ttl == 0 or entrada[0] > agora):
+                    self.__entries.move_to_end(chave)
+                    resultados[posicao] = entrada[1]
+                    self.__hits += 1
+                else:
+                    if entrada is not None:
+                        del self.__entries[chave]
+
+                    posicoes_faltantes.setdefault(chave, []).append(posicao)
+                    self.__misses += 1
+
+        qtd_faltantes = sum(len(posicoes) for posicoes in posicoes_faltantes.values())
+        PREDICTION_CACHE_REQUESTS.inc(len(dataset) - qtd_faltantes, result="hit")
+        PREDICTION_CACHE_REQUESTS.inc(qtd_faltantes, result="miss")
+
+        if not posicoes_faltantes:
+            return resultados
+
+        chaves_faltantes = list(posicoes_faltantes.keys())
+        registros_faltantes = [dataset[posicoes_faltantes[chave][0]] for chave in chaves_faltantes]
+        predicoes = self.__model.predict(registros_faltantes)
+
+        # Repassa a mensagem de erro do modelo sem guardar nada no cache
+        if type(predicoes) is str:
+            return predicoes
+
+        if len(predicoes) != len(registros_faltantes):
+            msg = f"O método 'predict' do modelo retornou {len(predicoes)} resultado(s) para " \
+                  f"{len(registros_faltantes)} registro(s). Não foi possível associar os resultados ao cache."
+            LOGGER.error(msg)
+            raise RuntimeError(msg)
+
+        expira_em = time.monotonic() + self.__ttl
+
+        with self.__lock:
+            # Se a versão mudou durante a predição, os resultados não são guardados, pois podem ser da versão antiga
+            guardar = versao_modelo == self.__model_version
+
+            for chave, predicao in zip(chaves_faltantes, predicoes):
+                for posicao in posicoes_faltantes[chave]:
+                    resultados[posicao] = predicao
+
+                if guardar:
+                    self.__entries[chave] = (expira_em, predicao)
+                    self.__entries.move_to_end(chave)
+
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+        return resultados
+
+    def invalidate(self):
+        """
+        Remove todos os resultados guardados no cache.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__invalidations += 1
+
+    def get_stats(self) -> dict:
+        """
+        Obtém as estatísticas de uso do cache.
+            :return: Dicionário com a quantidade de acertos ('hits'), falhas ('misses'), invalidações
+                     ('invalidations'), registros guardados ('size') e a versão do modelo associada ao cache
+                     ('model_version').
+        """
+        with self.__lock:
+            return {'hits': self.__hits, 'misses': self.__misses, 'invalidations': self.__invalidations,
+                    'size': len(self.__entries), 'model_version': self.__model_version}
@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------------------------------------
+# Funções para realizar predições em fluxo (streaming) sobre conjuntos de registros de tamanho
+# qualquer, sem a necessidade de manter todos os registros e resultados na memória.
+# ----------------------------------------------------------------------------------------------------
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+from ..utils import LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+
+def iter_chunks(records: Iterable, chunk_size: int) -> Iterator[list]:
+    """
+    Divide um iterável de registros em lotes (listas) de tamanho fixo. O último lote pode ser menor.
+        :param records: Iterável com os registros (lista, gerador, arquivo, etc.).
+        :param chunk_size: Quantidade máxima de registros por lote.
+        :return: Gerador de listas com os registros de cada lote.
+    """
+    if type(chunk_size) is not int or chunk_size <= 0:
+        msg = f"O parâmetro 'chunk_size' deve ser um inteiro maior que 0 (zero), porém recebeu '{chunk_size}'."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    iterador = iter(records)
+
+    while True:
+        lote = list(islice(iterador, chunk_size))
+
+        if not lote:
+            return
+
+        yield lote
+
+
+def read_jsonl(file_path: str) -> Iterator:
+    """
+    Lê, de forma incremental, um arquivo no formato JSON Lines (um registro JSON por linha). Linhas em branco são
+    ignoradas.
+        :param file_path: Caminho do arquivo a ser lido.
+        :return: Gerador com os registros lidos do arquivo.
+    """
+    try:
+        arq = open(file_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        msg = f"Não foi possível encontrar o arquivo no caminho '{file_path}'."
+        LOGGER.error(msg)
+        raise FileNotFoundError(msg) from None
+    except PermissionError:
+        msg = f"Não foi possível ler o arquivo no caminho '{file_path}'. Permissão de leitura negada."
+        LOGGER.error(msg)
+        raise PermissionError(msg) from None
+
+    with arq:
+        for num_linha, linha in enumerate(arq, start=1):
+            linha = linha.strip()
+
+            if not linha:
+                continue
+
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError as e:
+                msg = f"A linha {num_linha} do arquivo '{file_path}' não contém um JSON válido (mensagem JSON: {e})."
+                LOGGER.error(msg)
+                raise ValueError(msg) from None
+
+
+def stream_predict(model, records: Iterable, chunk_size: int = 1000, output_path: str = "") -> Iterator:
+    """
+    Faz predições em fluxo. Os registros são divididos em lotes, cada lote é enviado ao método 'predict' do modelo e
+    os resultados são retornados um a um, à medida que são obtidos. Dessa forma, a memória utilizada é proporcional
+    ao tamanho do lote e não ao total de registros.
+        :param model: Modelo instanciado que implementa a interface ModelPublicationInterfaceCLF (ou qualquer objeto
+                      que possua o método 'predict', como o 'PredictionCache').
+        :param records: Iterável com os registros (features) que serão preditos. Pode ser infinito.
+        :param chunk_size: Quantidade de registros enviados ao método 'predict' em cada chamada.
+        :param output_path: Caminho de um arquivo para onde os resultados serão gravados, um por linha no formato JSON
+                            Lines, à medida que forem obtidos. Se não for informado, os resultados não são gravados.
+        :return: Gerador com os resultados das predições, na mesma ordem dos registros recebidos.
+    """
+    if not (hasattr(model, 'predict') and callable(model.predict)):
+        msg = f"Não foi possível realizar as predições. O modelo informado ('{type(model).__name__}') não possui o " \
+              f"método 'predict'."
+        LOGGER.error(msg)
+        raise TypeError(msg)
+
+    arq_saida = None
+
+    if output_path != "":
+        try:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            arq_saida = open(output_path, 'w', encoding='utf-8')
+        except PermissionError:
+            msg = f"Não foi possível criar o arquivo de saída das predições no caminho '{output_path}'. Permissão " \
+                  f"de escrita negada."
+            LOGGER.error(msg)
+            raise PermissionError(msg) from None
+
+    try:
+        qtd_registros = 0
+
+        for num_lote, lote in enumerate(iter_chunks(records, chunk_size)):
+            predicoes = model.predict(lote)
+
+            if type(predicoes) is str:
+                msg = f"O método 'predict' retornou um erro no lote {num_lote} (registros {qtd_registros} a " \
+                      f"{qtd_registros + len(lote) - 1}): {predicoes}"
+                LOGGER.error(msg)
+                raise RuntimeError(msg)
+
+            if len(predicoes) != len(lote):
+                msg = f"O método 'predict' retornou {len(predicoes)} resultado(s) para o lote {num_lote}, que possui " \
+                      f"{len(lote)} registro(s)."
+                LOGGER.error(msg)
+                raise RuntimeError(msg)
+
+            qtd_registros += len(lote)
+
+            for predicao in predicoes:
+                if arq_saida is not None:
+                    arq_saida.write(json.dumps(predicao, ensure_ascii=False, default=str) + "\n")
+
+                yield predicao
+
+            if arq_saida is not None:
+                arq_saida.flush()
+    finally:
+        if arq_saida is not None:
+            arq_saida.close()
+
+
+def stream_predict_to_file(model, records: Iterable, output_path: str, chunk_size: int = 1000) -> int:
+    """
+    Faz predições em fluxo e grava os resultados em um arquivo no formato JSON Lines, sem mantê-los na memória.
+        :param model: Modelo instanciado que implementa a interface ModelPublicationInterfaceCLF.
+        :param records: Iterável com os registros (features) que serão preditos. Dica: Para ler os registros de um
+                        arquivo JSON Lines, utilize a função 'read_jsonl'.
+        :param output_path: Caminho do arquivo para onde os resultados serão gravados.
+        :param chunk_size: Quantidade de registros enviados ao método 'predict' em cada chamada.
+        :return: Quantidade de registros preditos.
+    """
+    if output_path == "":
+        msg = "O parâmetro 'output_path' deve ser informado."
+        LOGGER.error(msg)
+        raise ValueError(msg)
+
+    qtd_registros = 0
+
+    for _ in stream_predict(model, records, chunk_size=chunk_size, output_path=output_path):
+        qtd_registros += 1
+
+    LOGGER.info(f"Foram preditos {qtd_registros} registro(s). Resultados gravados em '{output_path}'.")
+
+    return qtd_registros
@@ -1,14 +1,17 @@
 # ----------------------------------------------------------------------------------------------------
 # Funções para prover o acesso aos modelos persistidos e aos datasets
 # ----------------------------------------------------------------------------------------------------
-from .utils import make_log
-from .providers_types.minio_provider import load_datasets_minio
-from .providers_types.local_provider import load_datasets_local
+from .utils import LazyLogger
+from .monitors.metrics import timed_provider_call, TRANSFERRED_BYTES
+from .monitors.tracing import traced_provider_call, set_span_attribute
+from .providers_types.minio_provider import load_datasets_minio, list_partitions_minio
+from .providers_types.local_provider import load_datasets_local, list_partitions_local
 from .providers_types.mlflow_provider import load_production_params_mlflow, load_production_datasets_names_mlflow, \
-    load_production_baseline_mlflow, load_model_mlflow, get_models_versions_mlflow
+    load_production_baseline_mlflow, load_production_latency_baseline_mlflow, \
+    load_production_training_partitions_mlflow, load_model_mlflow, get_models_versions_mlflow
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
 class Provider:
@@ -16,6 +19,8 @@ class Provider:
     Classe para prover o acesso aos modelos persistidos e aos datasets.
     """
     @staticmethod
+    @timed_provider_call("load_datasets")
+    @traced_provider_call("load_datasets")
     def load_datasets(datasets_filenames: dict, provider: str = 'minio') -> dict:
         """
         Carrega os datasets necessários para o modelo.
@@ -25,15 +30,79 @@ class Provider:
             :return: Dicionário com os datasets carregados.
         """
         if provider == "minio":
-            return load_datasets_minio(datasets_filenames)
+            datasets = load_datasets_minio(datasets_filenames)
         elif provider == "local":
-            return load_datasets_local(datasets_filenames)
+            datasets = load_datasets_local(datasets_filenames)
         else:
             msg = f"Não foi possível carregar os datasets. O provider '{provider}' não foi encontrado."
             LOGGER.error(msg)
             raise ValueError(msg)
 
+        bytes_datasets = sum(dataset.getbuffer().nbytes for dataset in datasets.values())
+        TRANSFERRED_BYTES.inc(bytes_datasets, kind="dataset", provider=provider)
+        set_span_attribute('bytes', bytes_datasets)
+
+        return datasets
+
     @staticmethod
+    @timed_provider_call("list_datasets_partitions")
+    @traced_provider_call("list_datasets_partitions")
+    def list_datasets_partitions(datasets_prefixes: dict, provider: str = 'minio') -> dict:
+        """
+        Lista as partições (arquivos) de cada dataset.
+            :param datasets_prefixes: Dicionário contendo os tipos de datasets e os prefixos (pastas) onde as
+                                      partições se encontram. Exemplo: {'features': 'dados/features/',
+                                      'targets': 'dados/targets/'}
+            :param provider: Nome do provedor que fornecerá os datasets. Tipos de provider: 'minio' e 'local'.
+            :return: Dicionário com os tipos de datasets como chave e as listas ordenadas de partições como valor.
+        """
+        if provider == "minio":
+            return {tipo: list_partitions_minio(prefixo) for tipo, prefixo in datasets_prefixes.items()}
+        elif provider == "local":
+            return {tipo: list_partitions_local(prefixo) for tipo, prefixo in datasets_prefixes.items()}
+        else:
+            msg = f"Não foi possível listar as partições dos datasets. O provider '{provider}' não foi encontrado."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+    @staticmethod
+    def load_new_datasets_partitions(datasets_prefixes: dict, trained_partitions: dict | None,
+                                     provider: str = 'minio') -> dict:
+        """
+        Carrega somente as partições dos datasets que foram adicionadas depois do treinamento do modelo.
+            :param datasets_prefixes: Dicionário contendo os tipos de datasets e os prefixos (pastas) onde as
+                                      partições se encontram. Exemplo: {'features': 'dados/features/',
+                                      'targets': 'dados/targets/'}
+            :param trained_partitions: Dicionário com os tipos de datasets como chave e as listas de partições já
+                                       utilizadas no treinamento como valor (ex.: retorno do
+                                       'load_production_training_partitions'). Se for None (o modelo em produção não
+                                       possui o artefato 'TrainingPartitions.pkl'), todas as partições são novas.
+            :param provider: Nome do provedor que fornecerá os datasets. Tipos de provider: 'minio' e 'local'.
+            :return: Dicionário com as chaves 'datasets' (tipos de datasets como chave e, como valor, um dicionário com
+                     os nomes das partições novas como chave e as partições carregadas como valor, na ordem dos nomes)
+                     e 'partitions' (tipos de datasets como chave e a lista de todas as partições, já utilizadas e
+                     novas, como valor, para ser persistida no artefato 'TrainingPartitions.pkl' do modelo retreinado).
+        """
+        # Primeiro retreinamento incremental: o 'load_production_training_partitions' retorna None
+        trained_partitions = trained_partitions or {}
+        particoes = Provider.list_datasets_partitions(datasets_prefixes, provider=provider)
+        datasets = {}
+
+        for tipo, nomes in particoes.items():
+            ja_utilizadas = set(trained_partitions.get(tipo, []))
+            novas = [nome for nome in nomes if nome not in ja_utilizadas]
+            datasets[tipo] = Provider.load_datasets({nome: nome for nome in novas}, provider=provider) if novas else {}
+            # Mantém as partições já utilizadas que não existem mais no provider, para não treinar com elas novamente
+            particoes[tipo] = sorted(ja_utilizadas | set(nomes))
+
+        LOGGER.info("Partições novas carregadas: %s.", {tipo: len(novas) for tipo, novas in datasets.items()},
+                    extra={'new_partitions': {tipo: list(novas.keys()) for tipo, novas in datasets.items()}})
+
+        return {'datasets': datasets, 'partitions': particoes}
+
+    @staticmethod
+    @timed_provider_call("load_production_params")
+    @traced_provider_call("load_production_params")
     def load_production_params(model_name: str, provider: str = 'mlflow') -> dict:
         """
         Carrega os parâmetros utilizados para treinar o modelo que está em produção.
@@ -51,6 +120,8 @@ class Provider:
             raise ValueError(msg)
 
     @staticmethod
+    @timed_provider_call("load_production_datasets_names")
+    @traced_provider_call("load_production_datasets_names")
     def load_production_datasets_names(model_name: str, provider: str = 'mlflow') -> dict:
         """
         Carrega os nomes dos datasets que foram utilizados para treinar o modelo que está em produção.
@@ -68,6 +139,8 @@ class Provider:
             raise ValueError(msg)
 
     @staticmethod
+    @timed_provider_call("load_production_baseline")
+    @traced_provider_call("load_production_baseline")
     def load_production_baseline(model_name: str, provider: str = 'mlflow') -> dict:
         """
         Carrega as métricas do modelo que está em produção que serão utilizadas como baseline para avaliação
@@ -86,6 +159,49 @@ class Provider:
             raise ValueError(msg)
 
     @staticmethod
+    @timed_provider_call("load_production_latency_baseline")
+    @traced_provider_call("load_production_latency_baseline")
+    def load_production_latency_baseline(model_name: str, provider: str = 'mlflow') -> dict:
+        """
+        Carrega o baseline de desempenho (latência, vazão e tamanho) do modelo que está em produção, gravado no
+        artefato opcional 'BaselineLatency.pkl'.
+            :param model_name: Nome do modelo que está em produção.
+            :param provider: Nome do provedor que fornecerá o baseline de desempenho do modelo em produção. Tipos de
+                             provider: 'mlflow'.
+            :return: Dicionário contendo o baseline de desempenho ou None, se o modelo não possuir o artefato.
+        """
+        if provider == "mlflow":
+            return load_production_latency_baseline_mlflow(model_name)
+        else:
+            msg = f"Não foi possível carregar o baseline de desempenho do modelo '{model_name}'. O provider " \
+                  f"'{provider}' não foi encontrado."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+    @staticmethod
+    @timed_provider_call("load_production_training_partitions")
+    @traced_provider_call("load_production_training_partitions")
+    def load_production_training_partitions(model_name: str, provider: str = 'mlflow') -> dict:
+        """
+        Carrega as partições dos datasets utilizadas no treinamento do modelo que está em produção, gravadas no
+        artefato opcional 'TrainingPartitions.pkl'.
+            :param model_name: Nome do modelo que está em produção.
+            :param provider: Nome do provedor que fornecerá as partições do modelo em produção. Tipos de provider:
+                             'mlflow'.
+            :return: Dicionário com os tipos de datasets como chave e as listas de partições como valor ou None, se o
+                     modelo não possuir o artefato.
+        """
+        if provider == "mlflow":
+            return load_production_training_partitions_mlflow(model_name)
+        else:
+            msg = f"Não foi possível carregar as partições de treinamento do modelo '{model_name}'. O provider " \
+                  f"'{provider}' não foi encontrado."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+    @staticmethod
+    @timed_provider_call("load_model")
+    @traced_provider_call("load_model")
     def load_model(model_name: str, provider: str = 'mlflow', artifacts_destination_path: str = 'temp_area'):
         """
         Carrega o modelo que está em produção e baixa os artefatos necessários.
@@ -102,6 +218,8 @@ class Provider:
             raise ValueError(msg)
 
     @staticmethod
+    @timed_provider_call("get_models_versions")
+    @traced_provider_call("get_models_versions")
     def get_models_versions(models_names: list, provider: str = 'mlflow') -> dict:
         """
         Obtém as versões de alguns modelos que estão sendo providos pelo provider.
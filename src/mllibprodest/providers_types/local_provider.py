@@ -3,24 +3,19 @@
 # ----------------------------------------------------------------------------------------------------
 import os
 from io import BytesIO
-from ..utils import load_env_variables, get_file_local, make_log
+from ..utils import load_env_variables, get_file_local, list_files_local, LazyLogger
 from pathlib import Path
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
-def load_datasets_local(datasets_filenames: dict) -> dict:
+def _get_local_path() -> str:
     """
-    Carrega os datasets que foram persistidos na área de armazenamento local, necessários para o modelo. Os parâmetros
-    de acesso deverão ser fornecidos por um arquivo chamado '.env' que deve ser criado no repositório local e
-    preenchido com a seguinte variável: LOCAL_PATH = "caminho local onde os datasets se encontram". Dica de
-    segurança: Não deixe o arquivo '.env' ser versionado/persistido no repositório remoto do código.
-        :param datasets_filenames: Dicionário contendo os tipos de datasets e os nomes dos respectivos arquivos.
-                                   Exemplo: {'features': 'nome_arquivo_features', 'targets': 'nome_arquivo_targets'}
-        :return: Dicionário com os datasets carregados.
+    Obtém o caminho local onde os datasets se encontram a partir da variável de ambiente 'LOCAL_PATH' (ou do arquivo
+    '.env').
+        :return: Caminho local dos datasets.
     """
-    # Obtém as informações necessárias para carregar os arquivos
     load_env_variables()
     local_path = os.environ.get("LOCAL_PATH")
 
@@ -31,9 +26,34 @@ def load_datasets_local(datasets_filenames: dict) -> dict:
         LOGGER.error(msg)
         raise RuntimeError(msg)
 
+    return local_path
+
+
+def load_datasets_local(datasets_filenames: dict) -> dict:
+    """
+    Carrega os datasets que foram persistidos na área de armazenamento local, necessários para o modelo. Os parâmetros
+    de acesso deverão ser fornecidos por um arquivo chamado '.env' que deve ser criado no repositório local e
+    preenchido com a seguinte variável: LOCAL_PATH = "caminho local onde os datasets se encontram". Dica de
+    segurança: Não deixe o arquivo '.env' ser versionado/persistido no repositório remoto do código.
+        :param datasets_filenames: Dicionário contendo os tipos de datasets e os nomes dos respectivos arquivos.
+                                   Exemplo: {'features': 'nome_arquivo_features', 'targets': 'nome_arquivo_targets'}
+        :return: Dicionário com os datasets carregados.
+    """
+    # Obtém as informações necessárias para carregar os arquivos
+    local_path = _get_local_path()
     datasets = {}
 
     for tipo, nome_arquivo in datasets_filenames.items():
         datasets[tipo] = BytesIO(get_file_local(str(Path(local_path) / nome_arquivo)))
 
     return datasets
+
+
+def list_partitions_local(prefix: str) -> list:
+    """
+    Lista as partições (arquivos) de um dataset persistido na área de armazenamento local, numa pasta relativa ao
+    caminho 'LOCAL_PATH'. Os parâmetros de acesso são os mesmos da função 'load_datasets_local'.
+        :param prefix: Pasta das partições (ex.: 'dados/features').
+        :return: Lista ordenada com os nomes das partições, relativos ao caminho 'LOCAL_PATH'.
+    """
+    return list_files_local(_get_local_path(), prefix)
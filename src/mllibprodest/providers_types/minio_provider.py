@@ -3,24 +3,17 @@
 # ----------------------------------------------------------------------------------------------------
 import os
 from io import BytesIO
-from ..utils import load_env_variables, get_file_s3, make_log
+from ..utils import load_env_variables, get_file_s3, list_files_s3, LazyLogger
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
-def load_datasets_minio(datasets_filenames: dict) -> dict:
+def _get_minio_credentials() -> tuple:
     """
-    Carrega os datasets que foram persistidos utilizando o Minio, necessários para o modelo. Os parâmetros de acesso
-    deverão ser fornecidos por um arquivo chamado '.env' que deve ser criado no repositório local e preenchido com as
-    seguintes variáveis: MINIO = "nome do servidor s3", ACCESS_KEY = "chave de acesso", SECRET_KEY = "senha de acesso"
-    e BUCKET = "nome do bucket". Dica de segurança: Não deixe o arquivo '.env' ser versionado/persistido no repositório
-    remoto do código.
-        :param datasets_filenames: Dicionário contendo os tipos de datasets e os nomes dos respectivos arquivos.
-                                   Exemplo: {'features': 'nome_arquivo_features', 'targets': 'nome_arquivo_targets'}
-        :return: Dicionário com os datasets carregados.
+    Obtém as credenciais e as informações de acesso ao Minio a partir das variáveis de ambiente (ou do arquivo '.env').
+        :return: Tupla com o servidor s3, a chave de acesso, a senha de acesso e o nome do bucket.
     """
-    # Obtém as credenciais e as informações necessárias para baixar os arquivos
     load_env_variables()
     s3_server = os.environ.get("MINIO")
     access_key = os.environ.get("ACCESS_KEY")
@@ -35,9 +28,37 @@ def load_datasets_minio(datasets_filenames: dict) -> dict:
         LOGGER.error(msg)
         raise RuntimeError(msg)
 
+    return s3_server, access_key, secret_key, bucket
+
+
+def load_datasets_minio(datasets_filenames: dict) -> dict:
+    """
+    Carrega os datasets que foram persistidos utilizando o Minio, necessários para o modelo. Os parâmetros de acesso
+    deverão ser fornecidos por um arquivo chamado '.env' que deve ser criado no repositório local e preenchido com as
+    seguintes variáveis: MINIO = "nome do servidor s3", ACCESS_KEY = "chave de acesso", SECRET_KEY = "senha de acesso"
+    e BUCKET = "nome do bucket". Dica de segurança: Não deixe o arquivo '.env' ser versionado/persistido no repositório
+    remoto do código.
+        :param datasets_filenames: Dicionário contendo os tipos de datasets e os nomes dos respectivos arquivos.
+                                   Exemplo: {'features': 'nome_arquivo_features', 'targets': 'nome_arquivo_targets'}
+        :return: Dicionário com os datasets carregados.
+    """
+    # Obtém as credenciais e as informações necessárias para baixar os arquivos
+    s3_server, access_key, secret_key, bucket = _get_minio_credentials()
     datasets = {}
 
     for tipo, nome_arquivo in datasets_filenames.items():
         datasets[tipo] = BytesIO(get_file_s3(nome_arquivo, s3_server, access_key, secret_key, bucket))
 
     return datasets
+
+
+def list_partitions_minio(prefix: str) -> list:
+    """
+    Lista as partições (arquivos) de um dataset persistido no Minio sob um prefixo. Os parâmetros de acesso são os
+    mesmos da função 'load_datasets_minio'.
+        :param prefix: Prefixo das partições (ex.: 'dados/features/').
+        :return: Lista ordenada com os nomes das partições.
+    """
+    s3_server, access_key, secret_key, bucket = _get_minio_credentials()
+
+    return list_files_s3(prefix, s3_server, access_key, secret_key, bucket)
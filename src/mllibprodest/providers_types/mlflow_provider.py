@@ -1,17 +1,18 @@
 # ----------------------------------------------------------------------------------------------------
 # Provider para obtenção de modelos e artefatos registrados no Mlflow
 # ----------------------------------------------------------------------------------------------------
-import mlflow
 import pickle
-import requests
+import time
 from os import getenv
 from pathlib import Path
-from mlflow.exceptions import RestException, MlflowException
-from shutil import rmtree
-from ..utils import make_log
+from shutil import rmtree, copytree
+from .mlflow_snapshot import get_snapshot_entry
+from ..monitors.metrics import MLFLOW_STAGE_SECONDS, TRANSFERRED_BYTES, SNAPSHOT_LOADS
+from ..monitors.tracing import start_span
+from ..utils import LazyLogger
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
 def load_model_mlflow(model_name: str, artifacts_destination_path: str = "temp_area"):
@@ -21,6 +22,10 @@ def load_model_mlflow(model_name: str, artifacts_destination_path: str = "temp_a
         :param artifacts_destination_path: Caminho local para onde os artefatos serão baixados.
         :return: Modelo carregado.
     """
+    # Importados somente quando necessário, pois a importação do MLflow é demorada
+    import mlflow
+    from mlflow.exceptions import RestException, MlflowException
+
     artefatos_obrigatorios = ["TrainingParams.pkl", "TrainingDatasetsNames.pkl", "BaselineMetrics.pkl"]
     caminho_artefatos = Path(artifacts_destination_path) / model_name
 
@@ -40,11 +45,37 @@ def load_model_mlflow(model_name: str, artifacts_destination_path: str = "temp_a
         LOGGER.error(msg)
         raise PermissionError(msg) from None
 
+    # Se houver um snapshot ativo contendo o modelo, carrega a partir dele sem acessar o servidor do MLflow
+    entrada_snapshot = get_snapshot_entry(model_name)
+
+    if entrada_snapshot is not None:
+        try:
+            with start_span("mlflow.load_snapshot", model__name=model_name,
+                            model__version=str(entrada_snapshot['version'])):
+                modelo = mlflow.pyfunc.load_model(model_uri=entrada_snapshot['model_path'])
+                copytree(entrada_snapshot['artifacts_path'], caminho_artefatos, dirs_exist_ok=True)
+        except (MlflowException, OSError) as e:
+            msg = f"Não foi possível carregar o modelo '{model_name}' a partir do snapshot. Mensagem: '{e}'."
+            LOGGER.error(msg)
+            raise RuntimeError(msg) from None
+
+        SNAPSHOT_LOADS.inc(model=model_name)
+        LOGGER.info("Modelo '%s' (versão %s) carregado a partir do snapshot.", model_name, entrada_snapshot['version'],
+                    extra={'model_name': model_name, 'model_version': entrada_snapshot['version']})
+
+        return modelo
+
     alias = 'production'
 
-    # Carrega o modelo que está em produção
+    # Carrega o modelo que está em produção (inclui a resolução do alias e o download do modelo)
+    inicio = time.perf_counter()
+
     try:
-        modelo = mlflow.pyfunc.load_model(model_uri=f"models:/{model_name}@{alias}")
+        with start_span("mlflow.load_model", model__name=model_name, mlflow__alias=alias) as span:
+            modelo = mlflow.pyfunc.load_model(model_uri=f"models:/{model_name}@{alias}")
+
+            if span is not None:
+                span.set_attribute('mlflow.run_id', modelo.metadata.run_id)
     except RestException:
         msg = f"O modelo '{model_name}' com o alias '{alias}' não foi encontrado."
         LOGGER.error(msg)
@@ -54,17 +85,36 @@ def load_model_mlflow(model_name: str, artifacts_destination_path: str = "temp_a
         LOGGER.error(msg)
         raise RuntimeError(msg) from None
 
+    duracao_modelo = time.perf_counter() - inicio
+    MLFLOW_STAGE_SECONDS.observe(duracao_modelo, stage="load_model", model=model_name)
+
     # Baixa todos os artefatos com base no 'run_id' do modelo
     endereco_base_artefatos = f"runs:/{modelo.metadata.run_id}/"
+    inicio = time.perf_counter()
 
     try:
-        mlflow.artifacts.download_artifacts(artifact_uri=endereco_base_artefatos, dst_path=str(caminho_artefatos))
+        with start_span("mlflow.download_artifacts", model__name=model_name,
+                        mlflow__run_id=modelo.metadata.run_id) as span:
+            mlflow.artifacts.download_artifacts(artifact_uri=endereco_base_artefatos, dst_path=str(caminho_artefatos))
+
+            if span is not None:
+                span.set_attribute('bytes', sum(arq.stat().st_size for arq in caminho_artefatos.rglob("*")
+                                                if arq.is_file()))
     except MlflowException as e:
         msg = f"Não foi possível carregar os artefatos no endereço '{endereco_base_artefatos}'. " \
               f"Mensagem do MLFlow: '{e}'."
         LOGGER.error(msg)
         raise RuntimeError(msg) from None
 
+    duracao_artefatos = time.perf_counter() - inicio
+    bytes_artefatos = sum(arq.stat().st_size for arq in caminho_artefatos.rglob("*") if arq.is_file())
+    MLFLOW_STAGE_SECONDS.observe(duracao_artefatos, stage="download_artifacts", model=model_name)
+    TRANSFERRED_BYTES.inc(bytes_artefatos, kind="artifacts", provider="mlflow")
+    LOGGER.info("Modelo '%s' carregado do MLflow em %.3f s e artefatos (%d bytes) baixados em %.3f s.", model_name,
+                duracao_modelo, bytes_artefatos, duracao_artefatos,
+                extra={'model_name': model_name, 'run_id': modelo.metadata.run_id,
+                       'duration': duracao_modelo + duracao_artefatos, 'bytes': bytes_artefatos})
+
     return modelo
 
 
@@ -187,12 +237,80 @@ def load_production_baseline_mlflow(model_name: str) -> dict:
         raise RuntimeError(msg)
 
 
+def _load_optional_artifact_mlflow(model_name: str, file_name: str, description: str):
+    """
+    Carrega um artefato opcional (dicionário persistido com o Pickle) do modelo que está em produção no MLflow.
+        :param model_name: Nome do modelo que está em produção.
+        :param file_name: Nome do arquivo do artefato.
+        :param description: Descrição do artefato, utilizada nas mensagens de log.
+        :return: Dicionário contido no artefato ou None, se o modelo não possuir o artefato.
+    """
+    modelo = load_model_mlflow(model_name, artifacts_destination_path='temp_area')
+    nome_arq = str(Path("temp_area") / model_name / file_name)
+
+    if not Path(nome_arq).is_file():
+        LOGGER.warning(f"O modelo '{model_name}' (run_id: {modelo.metadata.run_id}) não possui o artefato opcional "
+                       f"'{file_name}' ({description}).")
+        return None
+
+    LOGGER.info(f"Utilizando o artefato '{file_name}' ({description}) do modelo '{model_name}' em produção (run_id: "
+                f"{modelo.metadata.run_id})")
+    artefato = None
+    arq = None
+    msg = ""
+
+    try:
+        arq = open(nome_arq, 'rb')
+    except PermissionError:
+        msg += f"Permissão de leitura negada para o arquivo '{nome_arq}'. "
+
+    if arq is not None:
+        try:
+            artefato = pickle.load(arq)
+        except pickle.UnpicklingError as e:
+            msg += f"Não foi possível carregar o arquivo '{nome_arq}' com o Pickle (mensagem Pickle: {e}). "
+
+        arq.close()
+
+    if artefato is not None and type(artefato) is dict:
+        return artefato
+    else:
+        msg += f"Não foi possível carregar o artefato '{file_name}' ({description}) do modelo '{model_name}' em " \
+               f"produção. Certifique-se que o artefato esteja persistido num dicionário, através do Pickle."
+        LOGGER.error(msg)
+        raise RuntimeError(msg)
+
+
+def load_production_latency_baseline_mlflow(model_name: str) -> dict:
+    """
+    Carrega o baseline de desempenho (latência, vazão e tamanho) do modelo que está em produção no MLflow. Como o
+    artefato 'BaselineLatency.pkl' é opcional, a ausência dele não é considerada um erro.
+        :param model_name: Nome do modelo que está em produção.
+        :return: Dicionário contendo o baseline de desempenho ou None, se o modelo não possuir o artefato.
+    """
+    return _load_optional_artifact_mlflow(model_name, "BaselineLatency.pkl", "baseline de desempenho")
+
+
+def load_production_training_partitions_mlflow(model_name: str) -> dict:
+    """
+    Carrega as partições dos datasets utilizadas no treinamento do modelo que está em produção no MLflow. Como o
+    artefato 'TrainingPartitions.pkl' é opcional, a ausência dele não é considerada um erro.
+        :param model_name: Nome do modelo que está em produção.
+        :return: Dicionário com os tipos de datasets como chave e as listas de partições como valor ou None, se o
+                 modelo não possuir o artefato.
+    """
+    return _load_optional_artifact_mlflow(model_name, "TrainingPartitions.pkl", "partições de treinamento")
+
+
 def get_models_versions_mlflow(models_names: list) -> dict:
     """
     Obtém as versões de alguns modelos que estão sendo providos pelo provider.
         :param models_names: Lista com os nomes dos modelos para obtenção das versões.
         :return: Dicionário com o nome de cada modelo como chave e a respectiva versão como valor.
     """
+    # Importado somente quando necessário, para não atrasar a importação da lib
+    import requests
+
     # Obtém as credenciais para acesso ao MLflow
     mlflow_uri = getenv("MLFLOW_TRACKING_URI")
     if not mlflow_uri:
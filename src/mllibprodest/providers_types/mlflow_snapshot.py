@@ -0,0 +1,282 @@
+# ----------------------------------------------------------------------------------------------------
+# Snapshot local dos modelos registrados no MLflow, para iniciar os workers rapidamente e sem depender
+# do servidor do MLflow.
+#
+# O snapshot guarda, para cada modelo, a versão resolvida através do alias 'production', os arquivos
+# do modelo e os artefatos da execução ('run'), além de uma cópia do arquivo 'params.conf'. Com o
+# snapshot ativado, o 'load_model_mlflow' carrega os modelos a partir dele e a reconciliação com o
+# registro do MLflow pode ser feita em segundo plano.
+# ----------------------------------------------------------------------------------------------------
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from ..utils import get_models_params, LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+NOME_MANIFESTO = "manifest.json"
+ALIAS_PRODUCAO = "production"
+
+# Snapshot ativo no processo
+_SNAPSHOT = {'path': None, 'manifest': None}
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def _read_manifest(snapshot_path: str) -> dict:
+    """
+    Lê o manifesto de um snapshot.
+        :param snapshot_path: Caminho da pasta do snapshot.
+        :return: Dicionário com o conteúdo do manifesto.
+    """
+    caminho_manifesto = Path(snapshot_path) / NOME_MANIFESTO
+
+    try:
+        with open(caminho_manifesto, 'r', encoding='utf-8') as arq:
+            return json.load(arq)
+    except FileNotFoundError:
+        msg = f"Não foi possível encontrar o manifesto do snapshot no caminho '{caminho_manifesto}'."
+        LOGGER.error(msg)
+        raise FileNotFoundError(msg) from None
+    except json.JSONDecodeError as e:
+        msg = f"O manifesto do snapshot '{caminho_manifesto}' está corrompido (mensagem JSON: {e})."
+        LOGGER.error(msg)
+        raise ValueError(msg) from None
+
+
+def _write_manifest(snapshot_path: str, manifest: dict):
+    """
+    Grava o manifesto de um snapshot de forma atômica (grava em um arquivo temporário e o renomeia).
+        :param snapshot_path: Caminho da pasta do snapshot.
+        :param manifest: Dicionário com o conteúdo do manifesto.
+    """
+    caminho_manifesto = Path(snapshot_path) / NOME_MANIFESTO
+    caminho_temporario = caminho_manifesto.with_suffix(".tmp")
+
+    with open(caminho_temporario, 'w', encoding='utf-8') as arq:
+        json.dump(manifest, arq, indent=2, ensure_ascii=False)
+
+    os.replace(caminho_temporario, caminho_manifesto)
+
+
+def _resolve_production_version(model_name: str) -> dict:
+    """
+    Obtém, no registro do MLflow, a versão do modelo que possui o alias 'production'.
+        :param model_name: Nome do modelo.
+        :return: Dicionário com a versão ('version') e o identificador da execução ('run_id').
+    """
+    from mlflow import MlflowClient
+    from mlflow.exceptions import MlflowException
+
+    try:
+        versao = MlflowClient().get_model_version_by_alias(model_name, ALIAS_PRODUCAO)
+    except MlflowException as e:
+        msg = f"Não foi possível obter a versão do modelo '{model_name}' com o alias '{ALIAS_PRODUCAO}'. Mensagem " \
+              f"do MLFlow: '{e}'."
+        LOGGER.error(msg)
+        raise RuntimeError(msg) from None
+
+    return {'version': str(versao.version), 'run_id': versao.run_id}
+
+
+def _download_model(snapshot_path: str, model_name: str, version_info: dict) -> dict:
+    """
+    Baixa os arquivos e os artefatos de uma versão do modelo para dentro do snapshot. Cada versão fica em uma pasta
+    própria, para que a atualização de um snapshot em uso não altere os arquivos que estão sendo lidos.
+        :param snapshot_path: Caminho da pasta do snapshot.
+        :param model_name: Nome do modelo.
+        :param version_info: Dicionário com a versão ('version') e o identificador da execução ('run_id').
+        :return: Entrada do manifesto para o modelo.
+    """
+    import mlflow
+    from mlflow.exceptions import MlflowException
+
+    pasta_relativa = Path(model_name) / version_info['version']
+    pasta_versao = Path(snapshot_path) / pasta_relativa
+    shutil.rmtree(pasta_versao, ignore_errors=True)
+    Path.mkdir(pasta_versao / "artifacts", parents=True, exist_ok=True)
+
+    try:
+        mlflow.artifacts.download_artifacts(artifact_uri=f"models:/{model_name}/{version_info['version']}",
+                                            dst_path=str(pasta_versao / "model"))
+        mlflow.artifacts.download_artifacts(artifact_uri=f"runs:/{version_info['run_id']}/",
+                                            dst_path=str(pasta_versao / "artifacts"))
+    except MlflowException as e:
+        msg = f"Não foi possível baixar o modelo '{model_name}' (versão {version_info['version']}) para o " \
+              f"snapshot. Mensagem do MLFlow: '{e}'."
+        LOGGER.error(msg)
+        raise RuntimeError(msg) from None
+
+    return {'version': version_info['version'], 'run_id': version_info['run_id'],
+            'model_path': str(pasta_relativa / "model"), 'artifacts_path': str(pasta_relativa / "artifacts"),
+            'saved_at': datetime.now(timezone.utc).isoformat()}
+
+
+def save_snapshot(snapshot_path: str, path: str = "", models_names: list = None) -> dict:
+    """
+    Gera um snapshot dos modelos configurados no arquivo 'params.conf' que utilizam o provider 'mlflow'. O snapshot
+    contém as versões resolvidas pelo alias 'production', os arquivos dos modelos, os artefatos e uma cópia do arquivo
+    'params.conf'.
+        :param snapshot_path: Caminho da pasta onde o snapshot será gravado.
+        :param path: Caminho onde se encontra o arquivo 'params.conf'.
+        :param models_names: Lista com os nomes dos modelos que farão parte do snapshot. Se não for informada, utiliza
+                             todos os modelos do 'params.conf' que utilizam o provider 'mlflow'.
+        :return: Dicionário com o manifesto do snapshot gerado.
+    """
+    models_params = get_models_params(path)
+
+    if models_names is None:
+        models_names = [nome for nome, params in models_params.items() if params['model_provider_name'] == "mlflow"]
+
+    try:
+        Path.mkdir(Path(snapshot_path), parents=True, exist_ok=True)
+    except PermissionError:
+        msg = f"Não foi possível criar a pasta do snapshot '{snapshot_path}'. Permissão de escrita negada."
+        LOGGER.error(msg)
+        raise PermissionError(msg) from None
+
+    manifesto = {'created_at': datetime.now(timezone.utc).isoformat(), 'models': {}}
+
+    for model_name in models_names:
+        versao = _resolve_production_version(model_name)
+        manifesto['models'][model_name] = _download_model(snapshot_path, model_name, versao)
+        LOGGER.info(f"Modelo '{model_name}' (versão {versao['version']}) adicionado ao snapshot '{snapshot_path}'.")
+
+    shutil.copyfile(Path(path) / "params.conf", Path(snapshot_path) / "params.conf")
+    _write_manifest(snapshot_path, manifesto)
+
+    return manifesto
+
+
+def activate_snapshot(snapshot_path: str) -> dict:
+    """
+    Ativa um snapshot no processo atual. A partir daí, o 'load_model_mlflow' carrega do snapshot os modelos que estão
+    nele, sem acessar o servidor do MLflow.
+        :param snapshot_path: Caminho da pasta do snapshot.
+        :return: Dicionário com o manifesto do snapshot ativado.
+    """
+    manifesto = _read_manifest(snapshot_path)
+
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT['path'] = str(Path(snapshot_path).resolve())
+        _SNAPSHOT['manifest'] = manifesto
+
+    LOGGER.info(f"Snapshot '{snapshot_path}' ativado com os modelos: {list(manifesto['models'].keys())}.")
+
+    return manifesto
+
+
+def deactivate_snapshot():
+    """
+    Desativa o snapshot do processo atual. Os modelos voltam a ser carregados do servidor do MLflow.
+    """
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT['path'] = None
+        _SNAPSHOT['manifest'] = None
+
+
+def get_snapshot_entry(model_name: str) -> dict | None:
+    """
+    Obtém os dados de um modelo no snapshot ativo. Se nenhum snapshot foi ativado, mas a variável de ambiente
+    'STACK_MODEL_SNAPSHOT' possui o caminho de um snapshot, ele é ativado.
+        :param model_name: Nome do modelo.
+        :return: Dicionário com a versão ('version'), o identificador da execução ('run_id') e os caminhos absolutos
+                 dos arquivos do modelo ('model_path') e dos artefatos ('artifacts_path'). None, se não houver
+                 snapshot ativo ou se o modelo não estiver no snapshot.
+    """
+    if _SNAPSHOT['path'] is None:
+        caminho_env = os.environ.get("STACK_MODEL_SNAPSHOT")
+
+        if not caminho_env:
+            return None
+
+        activate_snapshot(caminho_env)
+
+    with _SNAPSHOT_LOCK:
+        entrada = _SNAPSHOT['manifest']['models'].get(model_name)
+        snapshot_path = _SNAPSHOT['path']
+
+    if entrada is None:
+        return None
+
+    return dict(entrada, model_path=str(Path(snapshot_path) / entrada['model_path']),
+                artifacts_path=str(Path(snapshot_path) / entrada['artifacts_path']))
+
+
+def reconcile_snapshot(refresh: bool = True, on_outdated=None) -> dict:
+    """
+    Compara as versões do snapshot ativo com as versões que possuem o alias 'production' no registro do MLflow.
+        :param refresh: Se True, baixa para o snapshot as versões que estão desatualizadas e atualiza o manifesto.
+        :param on_outdated: Função opcional chamada para cada modelo desatualizado, com os parâmetros 'model_name',
+                            'snapshot_version' e 'registry_version' (ex.: para recarregar o modelo no worker).
+        :return: Dicionário com o nome de cada modelo desatualizado como chave e outro dicionário como valor, contendo
+                 'snapshot_version' e 'registry_version'.
+    """
+    if _SNAPSHOT['path'] is None:
+        msg = "Não há snapshot ativo para ser reconciliado."
+        LOGGER.error(msg)
+        raise RuntimeError(msg)
+
+    snapshot_path = _SNAPSHOT['path']
+    desatualizados = {}
+    nao_verificados = []
+
+    for model_name, entrada in list(_SNAPSHOT['manifest']['models'].items()):
+        try:
+            versao_registro = _resolve_production_version(model_name)
+        except RuntimeError:
+            nao_verificados.append(model_name)
+            continue
+
+        if versao_registro['version'] == entrada['version']:
+            continue
+
+        desatualizados[model_name] = {'snapshot_version': entrada['version'],
+                                      'registry_version': versao_registro['version']}
+        LOGGER.warning(f"O modelo '{model_name}' está na versão {entrada['version']} no snapshot, porém a versão em "
+                       f"produção no MLflow é a {versao_registro['version']}.")
+
+        if refresh:
+            nova_entrada = _download_model(snapshot_path, model_name, versao_registro)
+
+            with _SNAPSHOT_LOCK:
+                _SNAPSHOT['manifest']['models'][model_name] = nova_entrada
+                _write_manifest(snapshot_path, _SNAPSHOT['manifest'])
+
+            # Remove a pasta da versão antiga
+            shutil.rmtree(Path(snapshot_path) / model_name / entrada['version'], ignore_errors=True)
+
+        if on_outdated is not None:
+            on_outdated(model_name=model_name, snapshot_version=entrada['version'],
+                        registry_version=versao_registro['version'])
+
+    if nao_verificados:
+        LOGGER.warning(f"Não foi possível verificar no registro do MLflow as versões dos modelos: {nao_verificados}. "
+                       f"Eles continuarão sendo carregados a partir do snapshot '{snapshot_path}'.")
+    elif not desatualizados:
+        LOGGER.info(f"O snapshot '{snapshot_path}' está atualizado em relação ao registro do MLflow.")
+
+    return desatualizados
+
+
+def start_background_reconcile(refresh: bool = True, on_outdated=None) -> threading.Thread:
+    """
+    Executa a reconciliação do snapshot ativo em uma thread em segundo plano, para não atrasar a iniciação do worker.
+    Erros na reconciliação (ex.: MLflow indisponível) são registrados no log e não interrompem o worker.
+        :param refresh: Se True, atualiza o snapshot com as versões que estiverem desatualizadas.
+        :param on_outdated: Função opcional chamada para cada modelo desatualizado (ver 'reconcile_snapshot').
+        :return: Thread iniciada.
+    """
+    def reconciliar():
+        try:
+            reconcile_snapshot(refresh=refresh, on_outdated=on_outdated)
+        except Exception as e:
+            LOGGER.error(f"Não foi possível reconciliar o snapshot com o registro do MLflow: {type(e).__name__}: {e}")
+
+    thread = threading.Thread(target=reconciliar, name="reconcile_snapshot", daemon=True)
+    thread.start()
+
+    return thread
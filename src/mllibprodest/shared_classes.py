@@ -5,15 +5,19 @@
 # Uso: Implemente aqui qualquer classe que puder ser compartilhada entre as interfaces contidas no
 # arquivo 'mllibprodest/interfaces.py'
 # ----------------------------------------------------------------------------------------------------
+import os
 import pickle
+import time
 from logging import Logger
 from typing import Union
 from pathlib import Path
+from shutil import rmtree
 from .provider import Provider
-from .utils import make_log
+from .utils import make_log, log_sampled, LazyLogger
+from .monitors.metrics import ARTIFACT_SECONDS, ARTIFACT_BYTES
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
 class CommonMethods:
@@ -30,6 +34,22 @@ class CommonMethods:
         """
         return make_log(filename)
 
+    @staticmethod
+    def log_sampled(logger: Logger, msg: str, *args, **fields):
+        """
+        Gera um log de alto volume (ex.: um log por predição) respeitando a taxa de amostragem definida na variável de
+        ambiente 'STACK_LOG_SAMPLE_RATE' (entre 0.0 e 1.0; padrão: 1.0). A mensagem só é formatada se o log for
+        gerado. Exemplo: self.log_sampled(self.__logger, "Predição de %d registro(s)", len(dataset),
+        model_name=self.get_model_name(), duration=duracao).
+            :param logger: Logger obtido através do método 'make_log'.
+            :param msg: Mensagem do log, podendo conter marcadores no estilo '%s'.
+            :param args: Valores dos marcadores da mensagem.
+            :param fields: Campos estruturados do log (ex.: 'model_name', 'model_version', 'duration' e 'bytes'), que
+                           aparecem como campos próprios quando 'STACK_LOG_OUTPUT' for 'json' ou 'json_file'. Também
+                           aceita o parâmetro 'level' (padrão: logging.INFO).
+        """
+        log_sampled(logger, msg, *args, stacklevel=3, **fields)
+
     @staticmethod
     def load_datasets(datasets_filenames: dict, provider: str = 'minio') -> dict:
         """
@@ -48,6 +68,40 @@ class CommonMethods:
         """
         return Provider.load_datasets(datasets_filenames=datasets_filenames, provider=provider)
 
+    @staticmethod
+    def list_datasets_partitions(datasets_prefixes: dict, provider: str = 'minio') -> dict:
+        """
+        Lista as partições (arquivos) de cada dataset.
+            :param datasets_prefixes: Dicionário contendo os tipos de datasets e os prefixos (pastas) onde as
+                                      partições se encontram. Exemplo: {'features': 'dados/features/',
+                                      'targets': 'dados/targets/'}
+            :param provider: Nome do provedor que fornecerá os datasets. Tipos de provider: 'minio' e 'local'.
+            :return: Dicionário com os tipos de datasets como chave e as listas ordenadas de partições como valor.
+        """
+        return Provider.list_datasets_partitions(datasets_prefixes=datasets_prefixes, provider=provider)
+
+    @staticmethod
+    def load_new_datasets_partitions(datasets_prefixes: dict, trained_partitions: dict | None,
+                                     provider: str = 'minio') -> dict:
+        """
+        Carrega somente as partições dos datasets que foram adicionadas depois do treinamento do modelo. Utilize no
+        retreinamento incremental (ver o método 'retrain_incremental' da interface ModelPublicationInterfaceRETRAIN).
+            :param datasets_prefixes: Dicionário contendo os tipos de datasets e os prefixos (pastas) onde as
+                                      partições se encontram. Exemplo: {'features': 'dados/features/',
+                                      'targets': 'dados/targets/'}
+            :param trained_partitions: Dicionário com os tipos de datasets como chave e as listas de partições já
+                                       utilizadas no treinamento como valor (ex.: retorno do
+                                       'load_production_training_partitions'). Se for None (o modelo em produção não
+                                       possui o artefato 'TrainingPartitions.pkl'), todas as partições são novas.
+            :param provider: Nome do provedor que fornecerá os datasets. Tipos de provider: 'minio' e 'local'.
+            :return: Dicionário com as chaves 'datasets' (tipos de datasets como chave e, como valor, um dicionário com
+                     os nomes das partições novas como chave e as partições carregadas como valor) e 'partitions'
+                     (tipos de datasets como chave e a lista de todas as partições como valor, para ser persistida no
+                     artefato 'TrainingPartitions.pkl' do modelo retreinado).
+        """
+        return Provider.load_new_datasets_partitions(datasets_prefixes=datasets_prefixes,
+                                                     trained_partitions=trained_partitions, provider=provider)
+
     @staticmethod
     def load_production_params(model_name: str, provider: str = 'mlflow') -> dict:
         """
@@ -82,6 +136,31 @@ class CommonMethods:
         """
         return Provider.load_production_baseline(model_name=model_name, provider=provider)
 
+    @staticmethod
+    def load_production_latency_baseline(model_name: str, provider: str = 'mlflow') -> dict:
+        """
+        Carrega o baseline de desempenho (latência, vazão e tamanho) do modelo que está em produção, gravado no
+        artefato opcional 'BaselineLatency.pkl' (ver 'mllibprodest.evaluators.latency_baseline').
+            :param model_name: Nome do modelo que está em produção.
+            :param provider: Nome do provedor que fornecerá o baseline de desempenho do modelo em produção. Tipos de
+                             provider: 'mlflow'.
+            :return: Dicionário contendo o baseline de desempenho ou None, se o modelo não possuir o artefato.
+        """
+        return Provider.load_production_latency_baseline(model_name=model_name, provider=provider)
+
+    @staticmethod
+    def load_production_training_partitions(model_name: str, provider: str = 'mlflow') -> dict:
+        """
+        Carrega as partições dos datasets utilizadas no treinamento do modelo que está em produção, gravadas no
+        artefato opcional 'TrainingPartitions.pkl'.
+            :param model_name: Nome do modelo que está em produção.
+            :param provider: Nome do provedor que fornecerá as partições do modelo em produção. Tipos de provider:
+                             'mlflow'.
+            :return: Dicionário com os tipos de datasets como chave e as listas de partições como valor ou None, se o
+                     modelo não possuir o artefato.
+        """
+        return Provider.load_production_training_partitions(model_name=model_name, provider=provider)
+
     @staticmethod
     def load_model(model_name: str, provider: str = 'mlflow', artifacts_destination_path: str = 'temp_area'):
         """
@@ -118,13 +197,18 @@ class CommonMethods:
             LOGGER.error(msg)
             raise PermissionError(msg) from None
 
+        inicio = time.perf_counter()
+
         try:
             pickle.dump(artifact, arq)
-        except TypeError as e:
+        except (TypeError, pickle.PicklingError, AttributeError) as e:
+            arq.close()
             msg = f"Não foi possível gerar o artefato '{file_name}' com o Pickle (mensagem Pickle: {e})."
             LOGGER.error(msg)
             raise TypeError(msg) from None
 
+        ARTIFACT_SECONDS.observe(time.perf_counter() - inicio, operation="pickle", model=model_name)
+        ARTIFACT_BYTES.inc(arq.tell(), operation="pickle", model=model_name)
         arq.close()
 
     @staticmethod
@@ -152,6 +236,8 @@ class CommonMethods:
             LOGGER.error(msg)
             raise PermissionError(msg) from None
 
+        inicio = time.perf_counter()
+
         try:
             objeto = pickle.load(arq)
         except pickle.UnpicklingError as e:
@@ -159,6 +245,137 @@ class CommonMethods:
             LOGGER.error(msg)
             raise RuntimeError(msg)
 
+        ARTIFACT_SECONDS.observe(time.perf_counter() - inicio, operation="unpickle", model=model_name)
+        ARTIFACT_BYTES.inc(arq.tell(), operation="unpickle", model=model_name)
         arq.close()
 
         return objeto
+
+    @staticmethod
+    def __get_checkpoint_dir(model_name: str, run_id: str, path: str, stage: str = "checkpoint") -> Path:
+        """
+        Obtém a pasta dos checkpoints de uma execução e valida os nomes informados.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param path: Caminho base dos checkpoints.
+            :param stage: Nome da etapa, se houver.
+            :return: Pasta dos checkpoints da execução.
+        """
+        for nome in (model_name, run_id, stage):
+            if type(nome) is not str or nome.strip() in ("", ".", "..") or "/" in nome or "\\" in nome:
+                msg = f"O nome '{nome}' é inválido para identificar os checkpoints. Utilize um nome não vazio e sem " \
+                      f"separadores de pastas ('/' ou '\\')."
+                LOGGER.error(msg)
+                raise ValueError(msg)
+
+        return Path(path) / model_name / run_id
+
+    @staticmethod
+    def save_checkpoint(model_name: str, run_id: str, stage: str, artifact: object, path: str = "checkpoints"):
+        """
+        Persiste o resultado de uma etapa de um ciclo de retreinamento (ex.: datasets carregados, resultado da
+        avaliação ou estado parcial do treinamento), para que o ciclo possa ser retomado caso o worker seja
+        interrompido. O checkpoint só é considerado gravado depois que o arquivo estiver completo.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução (ex.: nome do modelo em produção e o 'run_id' dele). Utilize a
+                           mesma identificação ao reiniciar o ciclo para retomá-lo.
+            :param stage: Nome da etapa (ex.: 'datasets', 'evaluate' ou 'retrain_epoch_3').
+            :param artifact: Resultado da etapa (qualquer objeto que possa ser serializado com o Pickle).
+            :param path: Caminho base dos checkpoints.
+        """
+        pasta = CommonMethods.__get_checkpoint_dir(model_name, run_id, path, stage)
+        arquivo_temporario = f"{stage}.pkl.{os.getpid()}.tmp"
+
+        try:
+            pasta.mkdir(parents=True, exist_ok=True)
+        except PermissionError:
+            msg = f"Não foi possível criar a pasta dos checkpoints '{pasta}'. Permissão de escrita negada."
+            LOGGER.error(msg)
+            raise PermissionError(msg) from None
+
+        try:
+            CommonMethods.convert_artifact_to_pickle(model_name=run_id, artifact=artifact,
+                                                     file_name=arquivo_temporario, path=str(pasta.parent))
+            os.replace(pasta / arquivo_temporario, pasta / f"{stage}.pkl")
+        finally:
+            Path.unlink(pasta / arquivo_temporario, missing_ok=True)
+
+        LOGGER.info("Modelo: %s. Checkpoint da etapa '%s' gravado (execução '%s').", model_name, stage, run_id,
+                    extra={'model_name': model_name, 'run_id': run_id, 'stage': stage})
+
+    @staticmethod
+    def has_checkpoint(model_name: str, run_id: str, stage: str, path: str = "checkpoints") -> bool:
+        """
+        Verifica se uma etapa de um ciclo de retreinamento já foi concluída e persistida.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param stage: Nome da etapa.
+            :param path: Caminho base dos checkpoints.
+            :return: True, se existe checkpoint da etapa. False, caso contrário.
+        """
+        return (CommonMethods.__get_checkpoint_dir(model_name, run_id, path, stage) / f"{stage}.pkl").is_file()
+
+    @staticmethod
+    def load_checkpoint(model_name: str, run_id: str, stage: str, path: str = "checkpoints") -> object:
+        """
+        Carrega o resultado persistido de uma etapa de um ciclo de retreinamento.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param stage: Nome da etapa.
+            :param path: Caminho base dos checkpoints.
+            :return: Resultado da etapa.
+        """
+        pasta = CommonMethods.__get_checkpoint_dir(model_name, run_id, path, stage)
+
+        return CommonMethods.convert_artifact_to_object(model_name=run_id, file_name=f"{stage}.pkl",
+                                                        path=str(pasta.parent))
+
+    @staticmethod
+    def get_completed_stages(model_name: str, run_id: str, path: str = "checkpoints") -> list:
+        """
+        Obtém as etapas de um ciclo de retreinamento que já foram concluídas e persistidas.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param path: Caminho base dos checkpoints.
+            :return: Lista com os nomes das etapas, na ordem em que foram concluídas.
+        """
+        pasta = CommonMethods.__get_checkpoint_dir(model_name, run_id, path)
+
+        return [arq.stem for arq in sorted(pasta.glob("*.pkl"), key=lambda arq: arq.stat().st_mtime)]
+
+    @staticmethod
+    def run_stage(model_name: str, run_id: str, stage: str, function, resume: bool = True,
+                  path: str = "checkpoints") -> object:
+        """
+        Executa uma etapa de um ciclo de retreinamento e persiste o resultado dela. No modo de retomada, se a etapa já
+        foi concluída numa execução anterior com a mesma identificação, ela não é executada novamente e o resultado
+        persistido é retornado. Exemplo: datasets = self.run_stage(nome_modelo, run_id, "datasets",
+        lambda: self.load_datasets(nomes_datasets)).
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param stage: Nome da etapa.
+            :param function: Função, sem parâmetros, que executa a etapa e retorna o resultado dela.
+            :param resume: Se True, pula a etapa caso ela já tenha sido concluída. Se False, sempre executa a etapa e
+                           substitui o checkpoint existente.
+            :param path: Caminho base dos checkpoints.
+            :return: Resultado da etapa.
+        """
+        if resume and CommonMethods.has_checkpoint(model_name, run_id, stage, path):
+            LOGGER.info("Modelo: %s. A etapa '%s' já foi concluída (execução '%s'). Utilizando o checkpoint.",
+                        model_name, stage, run_id, extra={'model_name': model_name, 'run_id': run_id, 'stage': stage})
+            return CommonMethods.load_checkpoint(model_name, run_id, stage, path)
+
+        resultado = function()
+        CommonMethods.save_checkpoint(model_name, run_id, stage, resultado, path)
+
+        return resultado
+
+    @staticmethod
+    def clear_checkpoints(model_name: str, run_id: str, path: str = "checkpoints"):
+        """
+        Remove os checkpoints de uma execução. Chame ao final de um ciclo de retreinamento concluído com sucesso.
+            :param model_name: Nome do modelo.
+            :param run_id: Identificação da execução.
+            :param path: Caminho base dos checkpoints.
+        """
+        rmtree(CommonMethods.__get_checkpoint_dir(model_name, run_id, path), ignore_errors=True)
@@ -1,9 +1,15 @@
 # ----------------------------------------------------------------------------------------------------
 # Funções úteis que poderão ser utilizadas em qualquer parte do código.
 # ----------------------------------------------------------------------------------------------------
-import minio
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import configparser
 from pathlib import Path
 from os import makedirs
@@ -11,33 +17,77 @@ from dotenv import load_dotenv, find_dotenv
 from os import environ as env
 
 
-def make_log(filename: str) -> logging.Logger:
+# Atributos padrões do 'LogRecord', que não são incluídos como campos estruturados no formato JSON
+_ATRIBUTOS_LOG_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+# Taxa de amostragem dos logs de alto volume (ex.: um log por predição). Lida da variável de ambiente
+# 'STACK_LOG_SAMPLE_RATE' no primeiro uso
+_LOG_SAMPLE_RATE = None
+
+# Loggers já configurados pelo 'make_log' (nome do logger -> logger) e 'listeners' do modo fila em execução
+_LOGGERS = {}
+_LOG_LISTENERS = []
+_LOG_LOCK = threading.Lock()
+
+
+def _restart_log_listeners():
     """
-    Cria um logger para gerar logs na console ou gravar em um arquivo. Se o arquivo já existir, inicia a gravação a
-    partir do final dele.
-        :param filename: Nome do arquivo de logs (caso o log seja gravado em arquivo).
-        :return: Um logger para geração dos logs.
+    Reinicia as threads dos 'listeners' do modo fila após um 'fork'. No processo filho isso é necessário porque as
+    threads do processo pai não são copiadas e os logs ficariam parados na fila.
     """
-    # Para controlar a gravação de logs em arquivo ou não
-    stack_log_output = env.get('STACK_LOG_OUTPUT')
+    for listener in _LOG_LISTENERS:
+        listener._thread = None
+        listener.start()
 
-    if not stack_log_output:
-        stack_log_output = "file"
 
-    # Configurações básicas
-    logger_name = filename.split(".")[0]
-    logging.basicConfig(level=logging.CRITICAL)
-    logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s | %(funcName)s: %(message)s')
-
-    if stack_log_output == "console":
-        logger.propagate = False
-        consolehandler = logging.StreamHandler()
-        consolehandler.setLevel(logging.INFO)
-        consolehandler.setFormatter(formatter)
-        logger.addHandler(consolehandler)
-    elif stack_log_output == "file":
+def stop_log_listeners():
+    """
+    Finaliza os 'listeners' do modo fila, gravando os logs que ainda estiverem na fila. É chamada automaticamente ao
+    final da execução do programa.
+    """
+    with _LOG_LOCK:
+        for listener in _LOG_LISTENERS:
+            if listener._thread is not None:
+                listener.stop()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada log como um objeto JSON em uma única linha, contendo os campos 'timestamp', 'level', 'logger',
+    'function' e 'message', além dos campos estruturados informados através do parâmetro 'extra' (ex.: 'model_name',
+    'model_version', 'duration' e 'bytes').
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        instante = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+        registro = {'timestamp': instante,
+                    'level': record.levelname, 'logger': record.name, 'function': record.funcName,
+                    'message': record.getMessage()}
+
+        for chave, valor in record.__dict__.items():
+            if chave not in _ATRIBUTOS_LOG_RECORD:
+                registro[chave] = valor
+
+        if record.exc_info:
+            registro['exception'] = self.formatException(record.exc_info)
+
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def _make_log_handler(filename: str, stack_log_output: str) -> logging.Handler:
+    """
+    Cria o 'handler' que efetivamente grava os logs na console ou em arquivo.
+        :param filename: Nome do arquivo de logs (caso o log seja gravado em arquivo).
+        :param stack_log_output: Tipo de saída do log: 'console', 'file', 'json' (JSON na console) ou 'json_file'.
+        :return: O 'handler' configurado.
+    """
+    if stack_log_output in ("json", "json_file"):
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s | %(funcName)s: %(message)s')
+
+    if stack_log_output in ("console", "json"):
+        handler = logging.StreamHandler()
+    elif stack_log_output in ("file", "json_file"):
         # Se a pasta de logs não existir, cria
         try:
             makedirs("logs", exist_ok=True)
@@ -49,10 +99,7 @@ def make_log(filename: str) -> logging.Logger:
 
         # Configuração de parâmetros para gravação de logs
         try:
-            rotatehandler = RotatingFileHandler(log_file_path, mode='a', maxBytes=10485760, backupCount=5)
-            rotatehandler.setLevel(logging.INFO)
-            rotatehandler.setFormatter(formatter)
-            logger.addHandler(rotatehandler)
+            handler = RotatingFileHandler(log_file_path, mode='a', maxBytes=10485760, backupCount=5)
         except FileNotFoundError:
             msg = f"Não foi possível encontrar/criar o arquivo de log no caminho '{log_file_path}'."
             raise FileNotFoundError(msg) from None
@@ -62,13 +109,167 @@ def make_log(filename: str) -> logging.Logger:
             raise PermissionError(msg) from None
     else:
         raise ValueError(f"A variável de ambiente 'STACK_LOG_OUTPUT' contém um tipo de saída do log incorreto "
-                         f"('{stack_log_output}'). Os possíveis valores são: 'console' ou 'file'.")
+                         f"('{stack_log_output}'). Os possíveis valores são: 'console', 'file', 'json' ou "
+                         f"'json_file'.")
+
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(formatter)
+
+    return handler
+
+
+def make_log(filename: str, use_queue: bool = None) -> logging.Logger:
+    """
+    Cria um logger para gerar logs na console ou gravar em um arquivo. Se o arquivo já existir, inicia a gravação a
+    partir do final dele. A saída é definida pela variável de ambiente 'STACK_LOG_OUTPUT': 'file' (padrão), 'console',
+    'json' (uma linha JSON por log na console) ou 'json_file' (uma linha JSON por log no arquivo). Chamadas repetidas
+    com o mesmo nome de arquivo retornam o mesmo logger, sem adicionar novos 'handlers' (evitando que as linhas de log
+    sejam gravadas mais de uma vez).
+        :param filename: Nome do arquivo de logs (caso o log seja gravado em arquivo).
+        :param use_queue: Se True, os logs são colocados numa fila e a formatação e a gravação são feitas por uma
+                          thread em segundo plano ('QueueHandler'/'QueueListener'), sem bloquear a thread que gerou o
+                          log. Se não for informado, utiliza o modo fila caso a variável de ambiente 'STACK_LOG_QUEUE'
+                          seja 'true'. Obs.: O modo é definido somente na primeira chamada para cada logger.
+        :return: Um logger para geração dos logs.
+    """
+    logger_name = filename.split(".")[0]
+
+    with _LOG_LOCK:
+        logger = _LOGGERS.get(logger_name)
+
+        if logger is not None:
+            return logger
+
+        # Para controlar a gravação de logs em arquivo ou não
+        stack_log_output = env.get('STACK_LOG_OUTPUT')
+
+        if not stack_log_output:
+            stack_log_output = "file"
+
+        if use_queue is None:
+            use_queue = env.get('STACK_LOG_QUEUE', "").lower() == "true"
+
+        # Configurações básicas
+        logging.basicConfig(level=logging.CRITICAL)
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(logging.INFO)
+        handler = _make_log_handler(filename, stack_log_output)
+
+        if stack_log_output in ("console", "json"):
+            logger.propagate = False
+
+        if use_queue:
+            fila = queue.SimpleQueue()
+            listener = QueueListener(fila, handler, respect_handler_level=True)
+            listener.start()
+
+            if not _LOG_LISTENERS:
+                atexit.register(stop_log_listeners)
+
+                # Esvazia as filas antes do 'fork', para que os logs pendentes não sejam gravados também pelo filho
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(before=stop_log_listeners, after_in_parent=_restart_log_listeners,
+                                        after_in_child=_restart_log_listeners)
+
+            _LOG_LISTENERS.append(listener)
+            handler = QueueHandler(fila)
+
+        logger.addHandler(handler)
+        _LOGGERS[logger_name] = logger
 
     return logger
 
 
-# Para facilitar, define um logger único para todas as funções
-LOGGER = make_log("LOG_MLLIB.log")
+def get_log_sample_rate() -> float:
+    """
+    Obtém a taxa de amostragem dos logs de alto volume. Se não tiver sido definida através da função
+    'set_log_sample_rate', utiliza o valor da variável de ambiente 'STACK_LOG_SAMPLE_RATE' (padrão: 1.0).
+        :return: Taxa de amostragem, entre 0.0 (nenhum log) e 1.0 (todos os logs).
+    """
+    global _LOG_SAMPLE_RATE
+
+    if _LOG_SAMPLE_RATE is None:
+        valor = env.get('STACK_LOG_SAMPLE_RATE', "1.0")
+
+        try:
+            set_log_sample_rate(float(valor))
+        except ValueError:
+            raise ValueError(f"A variável de ambiente 'STACK_LOG_SAMPLE_RATE' deve conter um número entre 0.0 e 1.0, "
+                             f"porém contém '{valor}'.") from None
+
+    return _LOG_SAMPLE_RATE
+
+
+def set_log_sample_rate(rate: float):
+    """
+    Define a taxa de amostragem dos logs de alto volume gerados através da função 'log_sampled'.
+        :param rate: Taxa de amostragem, entre 0.0 (nenhum log) e 1.0 (todos os logs).
+    """
+    global _LOG_SAMPLE_RATE
+
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"A taxa de amostragem dos logs deve estar entre 0.0 e 1.0, porém recebeu '{rate}'.")
+
+    _LOG_SAMPLE_RATE = rate
+
+
+def log_sampled(logger, msg: str, *args, level: int = logging.INFO, stacklevel: int = 2, **fields):
+    """
+    Gera um log de alto volume (ex.: um log por predição) respeitando a taxa de amostragem definida. A mensagem só é
+    formatada se o log for de fato gerado; por isso, informe os valores através de 'args' no estilo do 'logging'
+    (ex.: log_sampled(logger, "Predição de %d registro(s)", qtd, model_name="modelo", duration=0.01)).
+        :param logger: Logger obtido através da função 'make_log'.
+        :param msg: Mensagem do log, podendo conter marcadores no estilo '%s'.
+        :param args: Valores dos marcadores da mensagem.
+        :param level: Nível do log (padrão: logging.INFO).
+        :param stacklevel: Quantidade de chamadas a subir na pilha para obter o nome da função registrada no log. O
+                           padrão (2) registra o nome da função que chamou esta função.
+        :param fields: Campos estruturados do log (ex.: 'model_name', 'model_version', 'duration' e 'bytes'), que
+                       aparecem como campos próprios no formato JSON.
+    """
+    taxa = get_log_sample_rate()
+
+    if taxa < 1.0 and random.random() >= taxa:
+        return
+
+    if taxa < 1.0:
+        fields['sample_rate'] = taxa
+
+    logger.log(level, msg, *args, extra=fields, stacklevel=stacklevel)
+
+
+class LazyLogger:
+    """
+    Logger criado somente no primeiro uso. Evita que a simples importação de um módulo da lib crie a pasta e o arquivo
+    de logs, tornando a importação mais rápida. Pode ser utilizado no lugar de um 'logging.Logger'.
+    """
+    def __init__(self, filename: str):
+        """
+        Guarda o nome do arquivo de logs que será utilizado ao criar o logger.
+            :param filename: Nome do arquivo de logs (caso o log seja gravado em arquivo).
+        """
+        self.__filename = filename
+        self.__logger = None
+        self.__lock = threading.Lock()
+
+    def get_logger(self) -> logging.Logger:
+        """
+        Obtém o logger, criando-o caso ainda não exista.
+            :return: Um logger para geração dos logs.
+        """
+        if self.__logger is None:
+            with self.__lock:
+                if self.__logger is None:
+                    self.__logger = make_log(self.__filename)
+
+        return self.__logger
+
+    def __getattr__(self, name: str):
+        return getattr(self.get_logger(), name)
+
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
 
 
 def load_env_variables(path: str = ""):
@@ -100,6 +301,9 @@ def get_file_s3(file_name: str, s3_server: str, access_key: str, secret_key: str
         :param bucket: Nome do bucket onde o arquivo a ser baixado se encontra.
         :return: Objeto contendo o arquivo baixado.
     """
+    # Importado somente quando necessário, para não atrasar a importação da lib
+    import minio
+
     client = minio.Minio(s3_server, access_key, secret_key)
 
     try:
@@ -112,6 +316,47 @@ def get_file_s3(file_name: str, s3_server: str, access_key: str, secret_key: str
     return obj_arquivo.read()
 
 
+def list_files_s3(prefix: str, s3_server: str, access_key: str, secret_key: str, bucket: str) -> list:
+    """
+    Lista os arquivos que estão sob um prefixo (pasta) através do protocolo s3.
+        :param prefix: Prefixo dos nomes dos arquivos (ex.: 'dados/features/').
+        :param s3_server: Servidor s3 que proverá os arquivos.
+        :param access_key: Chave de acesso para logar no servidor s3.
+        :param secret_key: Senha para logar no servidor s3.
+        :param bucket: Nome do bucket onde os arquivos se encontram.
+        :return: Lista ordenada com os nomes dos arquivos (incluindo o prefixo).
+    """
+    # Importado somente quando necessário, para não atrasar a importação da lib
+    import minio
+
+    client = minio.Minio(s3_server, access_key, secret_key)
+
+    try:
+        return sorted(obj.object_name for obj in client.list_objects(bucket_name=bucket, prefix=prefix,
+                                                                     recursive=True) if not obj.is_dir)
+    except minio.error.S3Error as e:
+        msg = f"Não foi possível listar os arquivos com o prefixo '{prefix}'. Mensagem do servidor S3: {e}"
+        LOGGER.error(msg)
+        raise RuntimeError(msg) from None
+
+
+def list_files_local(base_path: str, prefix: str) -> list:
+    """
+    Lista os arquivos que estão numa pasta do armazenamento local, incluindo as subpastas.
+        :param base_path: Caminho base do armazenamento local.
+        :param prefix: Pasta, relativa ao caminho base, onde os arquivos se encontram (ex.: 'dados/features').
+        :return: Lista ordenada com os nomes dos arquivos relativos ao caminho base (ex.: 'dados/features/p1.csv').
+    """
+    pasta = Path(base_path) / prefix
+
+    if not pasta.is_dir():
+        msg = f"Não foi possível listar os arquivos. A pasta '{pasta}' não foi encontrada."
+        LOGGER.error(msg)
+        raise FileNotFoundError(msg)
+
+    return sorted(arq.relative_to(base_path).as_posix() for arq in pasta.rglob("*") if arq.is_file())
+
+
 def get_file_local(file_path: str):
     """
     Obtém um arquivo através do armazenamento local.
@@ -191,12 +436,17 @@ def get_models_params(path: str = "") -> dict:
     """
     Obtém os parâmetros que serão utilizados para instanciar os modelos. Será buscado um arquivo com o nome
     'params.conf' contendo o nome dos modelos como uma seção [MODEL_NAME] e os parâmetros: 'source_file',
-    'model_class', 'experiment_name', 'model_provider_name' e 'dataset_provider_name'.
+    'model_class', 'experiment_name', 'model_provider_name' e 'dataset_provider_name'. Os parâmetros opcionais
+    de aquecimento ('warmup_iterations' e 'warmup_file'), de orçamento de desempenho ('budget_load_model_seconds',
+    'budget_peak_rss_mb' e 'budget_predict_p95_ms') e de prioridade de retreinamento ('retrain_priority') também são
+    obtidos, caso tenham sido informados.
         :param path: Caminho onde se encontra o arquivo de parâmetros. O padrão é estar na pasta local.
         :return: Dicionário contendo como chave o nome do modelo e como valor outro dicionário com os parâmetros.
     """
     parametros_padroes = ["source_file", "model_class", "experiment_name", "model_provider_name",
                           "dataset_provider_name"]
+    parametros_opcionais = ["warmup_iterations", "warmup_file", "budget_load_model_seconds", "budget_peak_rss_mb",
+                            "budget_predict_p95_ms", "retrain_priority"]
     parametros_faltantes_por_secao = {}
     faltou_parametro = False
     conf = configparser.ConfigParser()
@@ -219,7 +469,7 @@ def get_models_params(path: str = "") -> dict:
         LOGGER.error(msg)
         raise ValueError(msg) from None
 
-    if "params.conf" not in nome_arq_params:
+    if param_file_path not in nome_arq_params:
         msg = "Não foi possível encontrar o arquivo com os parâmetros dos modelos ('params.conf') ou não possui " \
               "permissão para leitura."
         LOGGER.error(msg)
@@ -259,6 +509,10 @@ def get_models_params(path: str = "") -> dict:
         for p in parametros_padroes:
             parametros_valor[p] = conf[s][p]
 
+        for p in parametros_opcionais:
+            if p in conf[s]:
+                parametros_valor[p] = conf[s][p]
+
         parametros_por_modelo[s] = parametros_valor
 
     return parametros_por_modelo
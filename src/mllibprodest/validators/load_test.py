@@ -0,0 +1,236 @@
+# ---------------------------------------------------------------------------------------------------------
+# Teste de carga do método 'predict' dos modelos da classe 'ModeloCLF'.
+#
+# Obs.: Os modelos são iniciados a partir do arquivo 'params.conf' e as predições são feitas em threads,
+# da mesma forma que no ML Worker.
+# ---------------------------------------------------------------------------------------------------------
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from pathlib import Path
+from ..initiators.model_initiator import InitModels
+from ..initiators.model_warmup import get_warmup_dataset
+from ..predictors.stream_predict import read_jsonl
+from ..utils import get_models_params, LazyLogger
+
+# Para facilitar, define um logger único para todas as funções (criado somente no primeiro uso)
+LOGGER = LazyLogger("LOG_MLLIB.log")
+
+# Códigos para impressão de mensagens coloridas no terminal
+BLUE = "\033[1;34m"
+RED = "\033[1;31m"
+BOLD = "\033[;1m"
+RESET = "\033[0;0m"
+
+
+def get_rss() -> int:
+    """
+    Obtém a memória residente (RSS) atual do processo.
+        :return: RSS em bytes. Em sistemas sem o '/proc', retorna o pico de RSS do processo.
+    """
+    try:
+        with open("/proc/self/statm", "r") as arq:
+            return int(arq.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return get_peak_rss()
+
+
+def get_peak_rss() -> int:
+    """
+    Obtém o pico de memória residente (RSS) do processo desde o seu início.
+        :return: Pico de RSS em bytes.
+    """
+    import resource
+
+    # No macOS o 'ru_maxrss' é informado em bytes; no Linux, em kilobytes
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return pico if os.uname().sysname == "Darwin" else pico * 1024
+
+
+def _percentile(sorted_values: list, p: float) -> float:
+    """
+    Calcula um percentil pelo método do 'nearest rank'.
+        :param sorted_values: Lista de valores ordenada.
+        :param p: Percentil desejado (0 a 100).
+        :return: Valor do percentil ou None, se a lista estiver vazia.
+    """
+    if not sorted_values:
+        return None
+
+    return sorted_values[max(ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+class LoadTest:
+    """
+    Reproduz uma amostra de registros contra o método 'predict' dos modelos, com diferentes níveis de concorrência e
+    tamanhos de lote, e informa as latências (p50, p95 e p99), a vazão e o crescimento da memória residente (RSS) de
+    cada modelo.
+    """
+    def __init__(self, path: str = "", sample_file: str = "", models_names: list = None):
+        """
+        Inicia os modelos que serão testados.
+            :param path: Caminho onde se encontra o arquivo 'params.conf'.
+            :param sample_file: Arquivo no formato JSON Lines (um registro por linha) com a amostra utilizada nas
+                                predições. Se não for informado, utiliza a mesma amostra do aquecimento de cada modelo
+                                (parâmetro 'warmup_file' do 'params.conf' ou método 'get_warmup_dataset' do modelo).
+            :param models_names: Lista com os nomes dos modelos que serão testados (padrão: todos os modelos da classe
+                                 'ModeloCLF').
+        """
+        models_params = get_models_params(path)
+        nomes = [model_name for model_name, params in models_params.items() if params['model_class'] == "ModeloCLF"]
+
+        if models_names is not None:
+            nao_encontrados = [model_name for model_name in models_names if model_name not in nomes]
+
+            if nao_encontrados:
+                msg = f"Os modelos {nao_encontrados} não foram encontrados no arquivo 'params.conf' ou não são da " \
+                      f"classe 'ModeloCLF'."
+                LOGGER.error(msg)
+                raise ValueError(msg)
+
+            nomes = list(models_names)
+
+        amostra_arquivo = list(read_jsonl(sample_file)) if sample_file != "" else None
+        self.__models = {}
+        self.__samples = {}
+
+        for model_name in nomes:
+            modelo = InitModels.init_model(model_name, models_params[model_name], path=path, warmup=False)
+            self.__models[model_name] = modelo
+            self.__samples[model_name] = amostra_arquivo if amostra_arquivo is not None else \
+                get_warmup_dataset(model_name, modelo, models_params[model_name], path)
+
+    @staticmethod
+    def __make_batches(sample: list, batch_size: int, quantity: int) -> list:
+        """
+        Monta os lotes que serão enviados ao 'predict', percorrendo a amostra de forma circular.
+            :param sample: Lista com os registros da amostra.
+            :param batch_size: Quantidade de registros por lote.
+            :param quantity: Quantidade de lotes.
+            :return: Lista com os lotes.
+        """
+        lotes = []
+        posicao = 0
+
+        for _ in range(quantity):
+            lote = []
+
+            for _ in range(batch_size):
+                lote.append(sample[posicao])
+                posicao = (posicao + 1) % len(sample)
+
+            lotes.append(lote)
+
+        return lotes
+
+    @staticmethod
+    def __run_scenario(model, batches: list, concurrency: int) -> dict:
+        """
+        Executa um cenário do teste de carga.
+            :param model: Modelo instanciado.
+            :param batches: Lista com os lotes que serão preditos.
+            :param concurrency: Quantidade de predições simultâneas.
+            :return: Dicionário com as estatísticas do cenário.
+        """
+        def prever(lote: list) -> tuple:
+            inicio = time.perf_counter()
+
+            try:
+                retorno = model.predict(lote)
+                erro = type(retorno) is str
+            except Exception:
+                erro = True
+
+            return time.perf_counter() - inicio, erro
+
+        inicio = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load_test") as pool:
+            resultados = list(pool.map(prever, batches))
+
+        duracao = time.perf_counter() - inicio
+        latencias = sorted(latencia for latencia, _ in resultados)
+        erros = sum(1 for _, erro in resultados if erro)
+        qtd_registros = sum(len(lote) for lote in batches)
+
+        return {'requests': len(batches), 'errors': erros, 'duration_s': duracao,
+                'p50_ms': _percentile(latencias, 50) * 1000, 'p95_ms': _percentile(latencias, 95) * 1000,
+                'p99_ms': _percentile(latencias, 99) * 1000, 'requests_per_s': len(batches) / duracao,
+                'records_per_s': qtd_registros / duracao}
+
+    def run(self, concurrency: list = None, batch_sizes: list = None, requests: int = 100) -> dict:
+        """
+        Executa o teste de carga para todos os modelos, combinando cada nível de concorrência com cada tamanho de lote.
+            :param concurrency: Lista com os níveis de concorrência (padrão: [1]).
+            :param batch_sizes: Lista com os tamanhos dos lotes (padrão: [1]).
+            :param requests: Quantidade de chamadas ao 'predict' em cada cenário.
+            :return: Dicionário com o nome de cada modelo como chave e, como valor, um dicionário contendo os cenários
+                     ('scenarios'), o RSS inicial e final em MB ('rss_start_mb' e 'rss_end_mb') e o crescimento do
+                     RSS em MB ('rss_growth_mb').
+        """
+        concurrency = concurrency if concurrency is not None else [1]
+        batch_sizes = batch_sizes if batch_sizes is not None else [1]
+
+        if requests <= 0 or any(c <= 0 for c in concurrency) or any(b <= 0 for b in batch_sizes):
+            msg = "A quantidade de chamadas, os níveis de concorrência e os tamanhos dos lotes devem ser maiores que " \
+                  "0 (zero)."
+            LOGGER.error(msg)
+            raise ValueError(msg)
+
+        relatorio = {}
+
+        for model_name, modelo in self.__models.items():
+            # Uma chamada antes das medições, para que a carga inicial do modelo não seja contada no crescimento do RSS
+            modelo.predict(self.__samples[model_name][:1])
+            rss_inicial = get_rss()
+            cenarios = []
+
+            for tamanho_lote in batch_sizes:
+                lotes = self.__make_batches(self.__samples[model_name], tamanho_lote, requests)
+
+                for nivel in concurrency:
+                    cenario = {'concurrency': nivel, 'batch_size': tamanho_lote}
+                    cenario.update(self.__run_scenario(modelo, lotes, nivel))
+                    cenarios.append(cenario)
+
+            rss_final = get_rss()
+            relatorio[model_name] = {'scenarios': cenarios, 'rss_start_mb': rss_inicial / 2 ** 20,
+                                     'rss_end_mb': rss_final / 2 ** 20,
+                                     'rss_growth_mb': (rss_final - rss_inicial) / 2 ** 20}
+
+        return relatorio
+
+    @staticmethod
+    def print_report(report: dict):
+        """
+        Imprime o relatório do teste de carga no terminal.
+            :param report: Dicionário retornado pelo método 'run'.
+        """
+        for model_name, resultado in report.items():
+            print(f"\n{BOLD}{BLUE}Modelo: {model_name}{RESET}")
+            print(f"  {'concorr.':>8} {'lote':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} "
+                  f"{'req/s':>10} {'reg/s':>12} {'erros':>6}")
+
+            for c in resultado['scenarios']:
+                cor = RED if c['errors'] else ""
+                print(f"{cor}  {c['concurrency']:>8} {c['batch_size']:>6} {c['p50_ms']:>10.3f} {c['p95_ms']:>10.3f} "
+                      f"{c['p99_ms']:>10.3f} {c['requests_per_s']:>10.1f} {c['records_per_s']:>12.1f} "
+                      f"{c['errors']:>6}{RESET if cor else ''}")
+
+            print(f"  RSS: {resultado['rss_start_mb']:.1f} MB -> {resultado['rss_end_mb']:.1f} MB (crescimento: "
+                  f"{resultado['rss_growth_mb']:+.1f} MB)")
+
+    @staticmethod
+    def save_report(report: dict, output_path: str):
+        """
+        Grava o relatório do teste de carga em um arquivo JSON.
+            :param report: Dicionário retornado pelo método 'run'.
+            :param output_path: Caminho do arquivo que será gerado.
+        """
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, "w", encoding="utf-8") as arq:
+            json.dump(report, arq, indent=2, ensure_ascii=False)
@@ -6,10 +6,12 @@
 import hashlib
 import time
 import os
+from math import ceil
 from pathlib import Path
 from shutil import copytree, rmtree
-from ..utils import make_log
+from ..utils import make_log, get_models_params
 from ..initiators.model_initiator import InitModels
+from .load_test import get_peak_rss
 
 # Códigos para impressão de mensagens coloridas no terminal
 BLUE = "\033[1;34m"
@@ -125,11 +127,22 @@ class Test:
             }
         }
 
+        # Orçamentos de desempenho que podem ser informados no arquivo 'params.conf' (parâmetro: unidade)
+        self.__budgets = {
+            'budget_load_model_seconds': "s",
+            'budget_peak_rss_mb': "MB",
+            'budget_predict_p95_ms': "ms"
+        }
+
+        # Quantidade de chamadas ao 'predict' utilizadas na medição da latência
+        self.__predict_runs = 20
+
         # Guarda os modelos instanciados
         self.__modelos = None
 
         # Instancia os scripts de testes personalizados
         self.__validation_function = None
+        self.__sample_function = None
 
         if Path.exists(Path(self.__nome_mytest)):
             try:
@@ -144,6 +157,14 @@ class Test:
                       "\n       Caso deseje criar um teste personalizado, faça o seguinte:\n"
                 self.__logger.info(msg + self.__howto_msg)
                 print(f"\n\n{msg + self.__howto_msg}\n")
+
+            # Função opcional que fornece a amostra utilizada na medição da latência do 'predict'
+            if self.__nome_mytest == "mytest_pub.py":
+                try:
+                    from mytest_pub import get_sample
+                    self.__sample_function = get_sample
+                except ImportError:
+                    pass
         else:
             msg = f"AVISO: O arquivo '{self.__nome_mytest}' não foi encontrado na pasta '{self.__nome_pasta_worker}'" \
                   f". Caso deseje criar um teste personalizado, crie\n       um arquivo chamado " \
@@ -244,6 +265,106 @@ class Test:
 
         return validado
 
+    def __check_budget(self, budget_name: str, measured: float, limit: float) -> bool:
+        """
+        Compara um valor medido com o orçamento de desempenho informado.
+            :param budget_name: Nome do parâmetro do orçamento no arquivo 'params.conf'.
+            :param measured: Valor medido.
+            :param limit: Valor máximo permitido.
+            :return: True, se o valor medido está dentro do orçamento. False, caso contrário.
+        """
+        unidade = self.__budgets[budget_name]
+
+        if measured <= limit:
+            msg = f"Orçamento '{budget_name}' OK: {measured:.2f} {unidade} (máximo: {limit:.2f} {unidade})."
+            self.__logger.info(msg)
+            print(f"   {msg}\n")
+            return True
+
+        msg = f"O orçamento '{budget_name}' foi ultrapassado: {measured:.2f} {unidade} (máximo: {limit:.2f} {unidade})."
+        self.__logger.error(msg)
+        print(f"{RED}***ERRO***: {msg}{RESET}\n")
+
+        return False
+
+    def __validate_budgets(self, model_name: str, model, model_params: dict, class_name: str) -> bool:
+        """
+        Valida os orçamentos de desempenho informados para o modelo no arquivo 'params.conf': tempo do 'load_model',
+        pico de memória residente (RSS) do processo após o carregamento e latência (percentil 95) do 'predict'.
+            :param model_name: Nome do modelo (seção do arquivo 'params.conf').
+            :param model: Modelo de onde os métodos serão chamados.
+            :param model_params: Dicionário com os parâmetros do modelo obtidos do arquivo 'params.conf'.
+            :param class_name: Nome da classe do modelo.
+            :return: True, se o modelo está dentro dos orçamentos. False, caso algum orçamento tenha sido ultrapassado.
+        """
+        orcamentos = {}
+        validado = True
+
+        for nome_orcamento in self.__budgets.keys():
+            if nome_orcamento not in model_params:
+                continue
+
+            try:
+                orcamentos[nome_orcamento] = float(model_params[nome_orcamento])
+            except ValueError:
+                validado = False
+                msg = f"O parâmetro '{nome_orcamento}' do modelo '{model_name}' deve ser um número, porém foi " \
+                      f"informado '{model_params[nome_orcamento]}'."
+                self.__logger.error(msg)
+                print(f"{RED}***ERRO***: {msg}{RESET}\n")
+
+        if not orcamentos:
+            return validado
+
+        msg = "=> Verificando os orçamentos de desempenho..."
+        self.__logger.info(msg)
+        print(f"\n{msg}\n")
+
+        if 'budget_load_model_seconds' in orcamentos or 'budget_peak_rss_mb' in orcamentos:
+            inicio = time.perf_counter()
+            model.load_model(model_name=model.get_model_name(), provider=model.get_model_provider_name())
+            duracao = time.perf_counter() - inicio
+
+            if 'budget_load_model_seconds' in orcamentos:
+                validado &= self.__check_budget('budget_load_model_seconds', duracao,
+                                                orcamentos['budget_load_model_seconds'])
+
+            if 'budget_peak_rss_mb' in orcamentos:
+                validado &= self.__check_budget('budget_peak_rss_mb', get_peak_rss() / 2 ** 20,
+                                                orcamentos['budget_peak_rss_mb'])
+
+        if 'budget_predict_p95_ms' in orcamentos and class_name == "ModeloCLF":
+            amostra = self.__sample_function(model_name) if self.__sample_function is not None else None
+
+            if amostra is None:
+                msg = f"O parâmetro 'budget_predict_p95_ms' foi informado para o modelo '{model_name}', mas a " \
+                      f"função 'get_sample' do script '{self.__nome_mytest}' não retornou uma amostra para ele."
+                self.__logger.error(msg)
+                print(f"{RED}***ERRO***: {msg}{RESET}\n")
+                return False
+
+            # A primeira chamada não é medida, pois costuma ser mais lenta (carga de caches, compilação, etc.)
+            model.predict(amostra)
+            latencias = []
+
+            for _ in range(self.__predict_runs):
+                inicio = time.perf_counter()
+                retorno = model.predict(amostra)
+                latencias.append(time.perf_counter() - inicio)
+
+                if type(retorno) is str:
+                    msg = f"O método 'predict' do modelo '{model_name}' retornou um erro com a amostra da função " \
+                          f"'get_sample': {retorno}"
+                    self.__logger.error(msg)
+                    print(f"{RED}***ERRO***: {msg}{RESET}\n")
+                    return False
+
+            latencias.sort()
+            p95 = latencias[ceil(0.95 * len(latencias)) - 1] * 1000
+            validado &= self.__check_budget('budget_predict_p95_ms', p95, orcamentos['budget_predict_p95_ms'])
+
+        return validado
+
     def __validate_pub(self):
         """
         Valida os scripts para publicação do modelo utilizando a classe ModeloCLF.
@@ -252,6 +373,8 @@ class Test:
         self.__logger.info(msg)
         print(f"\n\n # {msg}")
 
+        models_params = get_models_params()
+
         for nome_modelo, modelo in self.__modelos.items():
             print(f"\n{GREEN} ### MODELO: {nome_modelo} ### {RESET}\n")
 
@@ -262,6 +385,13 @@ class Test:
                 print(f"\n{RED}  *** O TESTE FALHOU! ***{RESET}\n")
                 exit(1)
 
+            if not self.__validate_budgets(nome_modelo, modelo, models_params[nome_modelo], "ModeloCLF"):
+                msg = "O modelo ultrapassou os orçamentos de desempenho. Verifique as mensagens de validação acima."
+                self.__logger.error(msg)
+                print(f"\n\n{RED} *** {msg}{RESET}\n")
+                print(f"\n{RED}  *** O TESTE FALHOU! ***{RESET}\n")
+                exit(1)
+
         msg = "AVISO: Os métodos 'predict', 'evaluate' e 'get_feedback' não serão testados porque necessitam de " \
               "dados que são específicos para cada implementação.\nCaso deseje testar estes métodos, faça o seguinte:\n"
         self.__logger.info(msg + self.__howto_msg)
@@ -274,6 +404,7 @@ class Test:
         msg = "Scripts para publicação do modelo utilizando a classe 'ModeloRETRAIN'..."
         self.__logger.info(msg)
         print(f"\n\n # {msg}")
+        models_params = get_models_params()
 
         for nome_modelo, modelo in self.__modelos.items():
             print(f"\n{GREEN} ### MODELO: {nome_modelo} ### {RESET}\n")
@@ -305,6 +436,13 @@ class Test:
                 print(f"\n{RED}  *** O TESTE FALHOU! ***{RESET}\n")
                 exit(1)
 
+            if not self.__validate_budgets(nome_modelo, modelo, models_params[nome_modelo], "ModeloRETRAIN"):
+                msg = "O modelo ultrapassou os orçamentos de desempenho. Verifique as mensagens de validação acima."
+                self.__logger.error(msg)
+                print(f"\n\n{RED} *** {msg}{RESET}\n")
+                print(f"\n{RED}  *** O TESTE FALHOU! ***{RESET}\n")
+                exit(1)
+
         msg = "AVISO: Os métodos 'evaluate' e 'retrain' não serão testados porque necessitam de dados que " \
               "são específicos para cada implementação.\nCaso deseje testar estes métodos, faça o seguinte:\n"
         self.__logger.info(msg + self.__howto_msg)
@@ -0,0 +1,63 @@
+# ----------------------------------------------------------------------------------------------------
+# Este teste mede o comportamento do método 'predict' dos modelos sob carga: latências (p50, p95 e
+# p99), vazão e crescimento da memória residente (RSS).
+# ----------------------------------------------------------------------------------------------------
+import sys
+from logging import getLogger
+from mllibprodest.utils import validate_params
+from mllibprodest.validators.load_test import LoadTest
+
+
+if __name__ == "__main__":
+    """
+    Inicia os modelos a partir do arquivo 'params.conf' e reproduz uma amostra de registros contra o método 'predict'
+    de cada modelo, combinando os níveis de concorrência com os tamanhos de lote informados. A amostra é lida do
+    arquivo informado em '--sample_file' (formato JSON Lines, um registro por linha) ou, se não for informado, é a
+    mesma amostra utilizada no aquecimento do modelo.
+
+    Uso: python load_test_pub.py [--sample_file=amostra.jsonl] [--concurrency=1,4,8] [--batch_sizes=1,100]
+                                 [--requests=200] [--models=MODELO1,MODELO2] [--output=load_test.json]
+    """
+    # Evita a propagação dos logs na tela ao realizar os testes
+    logger = getLogger("LOG_MLLIB")
+    logger.propagate = False
+
+    params = sys.argv
+    sample_file = ""
+    concorrencia = "1"
+    tamanhos_lotes = "1"
+    qtd_chamadas = 100
+    modelos = ""
+    caminho_saida = ""
+
+    # Se recebeu algum parâmetro, verifica se é o esperado
+    if len(params) > 1:
+        parametros_esperados = {'--sample_file': str, '--concurrency': str, '--batch_sizes': str, '--requests': int,
+                                '--models': str, '--output': str}
+        resultado, retorno = validate_params(params, parametros_esperados)
+
+        if not resultado:
+            print(f"\nERRO: {retorno}")
+            exit(1)
+
+        sample_file = retorno.get('--sample_file', sample_file)
+        concorrencia = retorno.get('--concurrency', concorrencia)
+        tamanhos_lotes = retorno.get('--batch_sizes', tamanhos_lotes)
+        qtd_chamadas = retorno.get('--requests', qtd_chamadas)
+        modelos = retorno.get('--models', modelos)
+        caminho_saida = retorno.get('--output', caminho_saida)
+
+    try:
+        lista_concorrencia = [int(c) for c in concorrencia.split(",")]
+        lista_lotes = [int(b) for b in tamanhos_lotes.split(",")]
+    except ValueError:
+        print("\nERRO: Os parâmetros '--concurrency' e '--batch_sizes' devem ser listas de inteiros separados por "
+              "vírgula. Ex.: --concurrency=1,4,8")
+        exit(1)
+
+    teste = LoadTest(sample_file=sample_file, models_names=modelos.split(",") if modelos != "" else None)
+    relatorio = teste.run(concurrency=lista_concorrencia, batch_sizes=lista_lotes, requests=qtd_chamadas)
+    teste.print_report(relatorio)
+
+    if caminho_saida != "":
+        teste.save_report(relatorio, caminho_saida)
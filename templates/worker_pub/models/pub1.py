@@ -9,6 +9,10 @@ Para gravar os logs, basta salvar as mensagens de log utilizando: 'self.__logger
 pacote 'logging'.
 
 EXEMPLOS: self.__logger.error("Mensagem de erro"); self.__logger.info("Mensagem informativa").
+
+Para logs gerados a cada predição, utilize 'self.log_sampled', que respeita a taxa de amostragem definida na variável
+de ambiente 'STACK_LOG_SAMPLE_RATE' e só formata a mensagem se o log for gerado. EXEMPLO:
+self.log_sampled(self.__logger, "Predição de %d registro(s)", len(dataset), model_name=self.__model_name).
 """
 from .utils import *  # Para importar todas as funções/rotinas definidas no script 'utils.py'
 from mllibprodest.interfaces import ModelPublicationInterfaceCLF
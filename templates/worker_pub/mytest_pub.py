@@ -23,3 +23,13 @@ def test(modelos: dict):
     for nome_modelo, modelo in modelos.items():
         # TODO: Implementar as verificações para cada modelo recebido.
         pass
+
+
+def get_sample(nome_modelo: str) -> list:
+    """
+    (Opcional) Retorne nesta função uma amostra de registros, no formato aceito pelo método 'predict' do modelo, que
+    será utilizada para medir a latência do 'predict' quando o parâmetro 'budget_predict_p95_ms' for informado no
+    arquivo 'params.conf'. Retorne None para os modelos que não possuem amostra.
+    """
+    # TODO: Retornar a amostra de registros para cada modelo.
+    return None
@@ -0,0 +1,68 @@
+# ----------------------------------------------------------------------------------------------------
+# Fixtures compartilhadas pelos testes da lib.
+# ----------------------------------------------------------------------------------------------------
+import sys
+import pytest
+
+MODELO_CLF = '''
+import time
+from mllibprodest.interfaces import ModelPublicationInterfaceCLF
+
+
+class ModeloCLF(ModelPublicationInterfaceCLF):
+    def __init__(self, model_name: str, model_provider_name: str):
+        self.__model_name = model_name
+        self.__model_provider_name = model_provider_name
+
+    def get_model_name(self) -> str:
+        return self.__model_name
+
+    def get_model_provider_name(self) -> str:
+        return self.__model_provider_name
+
+    def get_model_info(self) -> dict:
+        return {}
+
+    def get_model_version(self) -> str:
+        return "1"
+
+    def predict(self, dataset: list) -> list:
+        # Simula uma predição que não termina
+        if dataset == ["travar"]:
+            time.sleep(60)
+
+        return [registro * 2 for registro in dataset]
+
+    def evaluate(self, data_features: list, data_labels: list) -> dict:
+        return {}
+
+    def get_feedback(self, data_predicted: list, data_labels: list) -> dict:
+        return {}
+'''
+
+
+def _clear_models_modules():
+    for nome in [nome for nome in sys.modules if nome == "models" or nome.startswith("models.")]:
+        del sys.modules[nome]
+
+
+@pytest.fixture
+def worker_dir(tmp_path, monkeypatch):
+    """
+    Cria a pasta de um worker com o arquivo 'params.conf' e a pasta 'models' contendo o modelo 'pub1', com os modelos
+    'A' e 'B' configurados.
+    """
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "__init__.py").write_text("")
+    (tmp_path / "models" / "pub1.py").write_text(MODELO_CLF)
+    secoes = [f"[{nome}]\nsource_file = pub1\nmodel_class = ModeloCLF\nexperiment_name = exp\n"
+              f"model_provider_name = local\ndataset_provider_name = local\n" for nome in ("A", "B")]
+    (tmp_path / "params.conf").write_text("\n".join(secoes))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("STACK_LOG_OUTPUT", "console")
+    _clear_models_modules()
+
+    yield tmp_path
+
+    _clear_models_modules()
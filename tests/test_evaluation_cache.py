@@ -0,0 +1,48 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes do cache de avaliações ('evaluators.evaluation_cache').
+# ----------------------------------------------------------------------------------------------------
+from io import BytesIO
+from mllibprodest.evaluators.evaluation_cache import EvaluationCache
+
+
+class Avaliador:
+    def __init__(self, versao: str = "1"):
+        self.versao = versao
+        self.chamadas = 0
+
+    def get_model_name(self) -> str:
+        return "retrain"
+
+    def get_model_version(self) -> str:
+        return self.versao
+
+    def evaluate(self, model, datasets: dict, baseline_metrics: dict, training_params: dict,
+                 artifacts_path: str = "temp_area", batch_size: int = 100000) -> (bool, dict):
+        self.chamadas += 1
+        return True, {'acuracia': 0.9}
+
+
+def avaliar(cache: EvaluationCache, training_params: dict = None, batch_size: int = 100000):
+    return cache.evaluate(None, {'features': BytesIO(b"dados")}, {'acuracia': 0.8}, training_params or {'C': 1},
+                          batch_size=batch_size, model_version="run1")
+
+
+def test_evaluation_cache_key_includes_params_and_evaluator(tmp_path, monkeypatch):
+    monkeypatch.setenv("STACK_LOG_OUTPUT", "console")
+    avaliador = Avaliador()
+    cache = EvaluationCache(avaliador, path=str(tmp_path))
+
+    avaliar(cache)
+    avaliar(cache)
+    assert avaliador.chamadas == 1
+
+    avaliar(cache, training_params={'C': 2})
+    assert avaliador.chamadas == 2
+
+    avaliar(cache, batch_size=10)
+    assert avaliador.chamadas == 3
+
+    # Uma nova versão do código da avaliação não reutiliza os resultados guardados
+    avaliador_novo = Avaliador(versao="2")
+    avaliar(EvaluationCache(avaliador_novo, path=str(tmp_path)))
+    assert avaliador_novo.chamadas == 1
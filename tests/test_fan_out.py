@@ -0,0 +1,25 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes da predição concorrente ('predictors.fan_out').
+# ----------------------------------------------------------------------------------------------------
+import pytest
+from mllibprodest.initiators.model_initiator import InitModels
+from mllibprodest.predictors.fan_out import FanOutPredictor
+
+
+@pytest.mark.parametrize("mp_context", ["spawn", "forkserver"])
+def test_process_restarted_after_timeout(worker_dir, mp_context):
+    modelos = InitModels.init_models()
+
+    with FanOutPredictor(modelos, executor_types={'A': 'process'}, timeouts={'A': 3}, default_timeout=3,
+                         mp_context=mp_context) as preditor:
+        travado = preditor.predict(["travar"], models_names=['A'])
+        seguinte = preditor.predict([1, 2])
+
+    assert travado['A']['status'] == "timeout"
+    assert seguinte['A'] == {'status': 'ok', 'result': [2, 4], 'error': None, 'duration': seguinte['A']['duration']}
+    assert seguinte['B']['result'] == [2, 4]
+
+
+def test_invalid_mp_context(worker_dir):
+    with pytest.raises(ValueError):
+        FanOutPredictor(InitModels.init_models(), mp_context="inexistente")
@@ -0,0 +1,38 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes dos acumuladores de métricas ('evaluators.metric_accumulators').
+# ----------------------------------------------------------------------------------------------------
+import pytest
+from mllibprodest.evaluators.metric_accumulators import RegressionAccumulator
+
+metrics = pytest.importorskip("sklearn.metrics")
+
+# Valores com deslocamento grande em relação à variação, que causam cancelamento catastrófico em sum(y²) - sum(y)²/n
+Y_TRUE = [1e9 + 0.01 * i for i in range(1000)]
+Y_PRED = [y + (0.001 if i % 2 else -0.001) for i, y in enumerate(Y_TRUE)]
+
+
+def test_regression_r2_with_offset_data():
+    acumulador = RegressionAccumulator()
+
+    for inicio in range(0, len(Y_TRUE), 100):
+        acumulador.update(Y_PRED[inicio:inicio + 100], Y_TRUE[inicio:inicio + 100])
+
+    resultado = acumulador.result()
+
+    assert resultado['r2'] == pytest.approx(metrics.r2_score(Y_TRUE, Y_PRED), rel=1e-6)
+    assert resultado['mse'] == pytest.approx(metrics.mean_squared_error(Y_TRUE, Y_PRED), rel=1e-3)
+
+
+def test_regression_merge_matches_single_pass():
+    parciais = [RegressionAccumulator() for _ in range(3)]
+
+    for i, parcial in enumerate(parciais):
+        parcial.update(Y_PRED[i::3], Y_TRUE[i::3])
+
+    combinado = RegressionAccumulator()
+
+    for parcial in parciais:
+        combinado.merge(parcial)
+
+    assert combinado.result()['support'] == len(Y_TRUE)
+    assert combinado.result()['r2'] == pytest.approx(metrics.r2_score(Y_TRUE, Y_PRED), rel=1e-6)
@@ -0,0 +1,28 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes da inicialização dos modelos ('initiators.model_initiator').
+# ----------------------------------------------------------------------------------------------------
+import pickle
+from mllibprodest.initiators.model_initiator import InitModels
+from mllibprodest.monitors.resources import get_models_resources
+
+
+def test_model_can_be_pickled_after_init_models(worker_dir):
+    modelos = InitModels.init_models()
+
+    copia = pickle.loads(pickle.dumps(modelos['A']))
+
+    assert copia.get_model_name() == "A"
+    assert copia.predict([1, 2]) == [2, 4]
+    assert "predict" not in vars(modelos['A'])
+
+
+def test_model_usage_is_tracked(worker_dir):
+    modelos = InitModels.init_models()
+
+    assert get_models_resources(modelos, measure_memory=False)['A']['last_used_at'] is None
+
+    modelos['A'].predict([1])
+    recursos = get_models_resources(modelos, measure_memory=False)
+
+    assert recursos['A']['last_used_at'] is not None
+    assert recursos['B']['last_used_at'] is None
@@ -0,0 +1,28 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes do cache de predições ('predictors.prediction_cache').
+# ----------------------------------------------------------------------------------------------------
+import pytest
+from mllibprodest.predictors.prediction_cache import make_record_key
+
+
+@pytest.mark.parametrize("registro_a, registro_b", [
+    ({1: 'a'}, {'1': 'a'}),
+    ((1, 2), [1, 2]),
+    ([1], [1.0]),
+    ([True], [1]),
+    ({'x': (1,)}, {'x': [1]}),
+    ({'x': None}, {'x': "None"}),
+    ({'__tuple__': [1]}, (1,)),
+])
+def test_record_key_preserves_types(registro_a, registro_b):
+    assert make_record_key(registro_a) != make_record_key(registro_b)
+
+
+def test_record_key_ignores_dict_order():
+    assert make_record_key({'a': 1, 'b': [1, {'c': 2, 'd': 3}]}) == make_record_key({'b': [1, {'d': 3, 'c': 2}],
+                                                                                      'a': 1})
+
+
+def test_record_key_falls_back_to_pickle():
+    assert make_record_key({'x': {1, 2}}) == make_record_key({'x': {1, 2}})
+    assert make_record_key({'x': {1, 2}}) != make_record_key({'x': [1, 2]})
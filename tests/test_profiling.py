@@ -0,0 +1,19 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes do perfilamento ('monitors.profiling').
+# ----------------------------------------------------------------------------------------------------
+import pickle
+from mllibprodest.initiators.model_initiator import InitModels
+
+
+def test_profiled_model_can_be_pickled(worker_dir, monkeypatch):
+    monkeypatch.setenv("STACK_PROFILE", "cprofile")
+    monkeypatch.setenv("STACK_PROFILE_SAMPLE_RATE", "1.0")
+    monkeypatch.setenv("STACK_PROFILE_DIR", str(worker_dir / "profiles"))
+    modelos = InitModels.init_models()
+
+    assert modelos['A'].predict([1]) == [2]
+    assert list((worker_dir / "profiles" / "A" / "1").glob("predict_*.prof"))
+
+    copia = pickle.loads(pickle.dumps(modelos['A']))
+
+    assert copia.predict([3]) == [6]
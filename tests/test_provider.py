@@ -0,0 +1,32 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes do Provider ('provider').
+# ----------------------------------------------------------------------------------------------------
+import pytest
+from mllibprodest.provider import Provider
+
+
+@pytest.fixture
+def partitions_dir(tmp_path, monkeypatch):
+    for nome in ("p1.csv", "p2.csv"):
+        (tmp_path / "features").mkdir(exist_ok=True)
+        (tmp_path / "features" / nome).write_text(nome)
+
+    monkeypatch.setenv("LOCAL_PATH", str(tmp_path))
+    monkeypatch.setenv("STACK_LOG_OUTPUT", "console")
+
+    return tmp_path
+
+
+def test_load_new_partitions_without_training_partitions(partitions_dir):
+    retorno = Provider.load_new_datasets_partitions({'features': "features"}, None, provider="local")
+
+    assert list(retorno['datasets']['features'].keys()) == ["features/p1.csv", "features/p2.csv"]
+    assert retorno['partitions'] == {'features': ["features/p1.csv", "features/p2.csv"]}
+
+
+def test_load_new_partitions_skips_trained(partitions_dir):
+    retorno = Provider.load_new_datasets_partitions({'features': "features"}, {'features': ["features/p1.csv"]},
+                                                    provider="local")
+
+    assert list(retorno['datasets']['features'].keys()) == ["features/p2.csv"]
+    assert retorno['datasets']['features']["features/p2.csv"].read() == b"p2.csv"
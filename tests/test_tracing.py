@@ -0,0 +1,50 @@
+# ----------------------------------------------------------------------------------------------------
+# Testes do rastreamento ('monitors.tracing').
+# ----------------------------------------------------------------------------------------------------
+import pickle
+import pytest
+from mllibprodest.initiators.model_initiator import InitModels
+from mllibprodest.monitors import tracing
+
+
+@pytest.fixture
+def exporter():
+    exportador = tracing.InMemorySpanExporter()
+    tracing.set_span_exporter(exportador)
+
+    yield exportador
+
+    tracing.set_span_exporter(None)
+
+
+def test_traced_model_can_be_pickled(worker_dir, exporter):
+    modelos = InitModels.init_models()
+    modelos['A'].predict([1])
+
+    nomes = [span.name for span in exporter.get_finished_spans()]
+    copia = pickle.loads(pickle.dumps(modelos['A']))
+
+    assert "ModeloCLF.predict" in nomes
+    assert copia.predict([1]) == [2]
+
+
+def test_exporter_disabled_during_call(worker_dir, exporter, monkeypatch):
+    modelos = InitModels.init_models()
+    start_span_original = tracing.start_span
+
+    def start_span_desabilitado(name, **attributes):
+        # Simula outra thread desabilitando o rastreamento entre a verificação e a criação do span
+        tracing.set_span_exporter(None)
+        return start_span_original(name, **attributes)
+
+    monkeypatch.setattr(tracing, "start_span", start_span_desabilitado)
+
+    assert modelos['A'].predict([1]) == [2]
+
+    tracing.set_span_exporter(exporter)
+
+    @tracing.traced_provider_call("load_model")
+    def carregar(model_name: str, provider: str = "mlflow"):
+        return model_name
+
+    assert carregar("A") == "A"